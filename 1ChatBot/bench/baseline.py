@@ -0,0 +1,160 @@
+"""Implementations from before the performance work, kept verbatim as benchmark and test references."""
+import asyncio
+import base64
+import importlib
+import io
+
+
+def split_text(text, max_length=1900):
+    chunks = []
+    current_chunk = ''
+    lines = text.split('\n')
+    in_code_block = False
+    current_language = ''
+
+    for line in lines:
+        trimmed_line = line.strip()
+
+        if trimmed_line.startswith('```'):
+            if not in_code_block:
+                current_language = trimmed_line.replace('```', '')
+                in_code_block = True
+            else:
+                in_code_block = False
+            current_chunk += ('\n' if current_chunk else '') + line
+            continue
+
+        if in_code_block:
+            if len(current_chunk) + len(line) + 1 > max_length:
+                current_chunk += '\n```'
+                chunks.append(current_chunk.strip())
+                current_chunk = f"```{current_language}\n{line}"
+            else:
+                current_chunk += ('\n' if current_chunk else '') + line
+        else:
+            if len(line) > max_length:
+                parts = [line[i:i+max_length] for i in range(0, len(line), max_length)]
+                for part in parts:
+                    if len(current_chunk) + len(part) + 1 > max_length:
+                        chunks.append(current_chunk.strip())
+                        current_chunk = part
+                    else:
+                        current_chunk += ('\n' if current_chunk else '') + part
+            elif len(current_chunk) + len(line) + 1 > max_length:
+                chunks.append(current_chunk.strip())
+                current_chunk = line
+            else:
+                current_chunk += ('\n' if current_chunk else '') + line
+
+    if current_chunk:
+        if in_code_block and not current_chunk.endswith('```'):
+            current_chunk += '\n```'
+        chunks.append(current_chunk.strip())
+
+    return chunks
+
+
+async def download_bytes(url):
+    import requests
+
+    loop = asyncio.get_event_loop()
+    response = await loop.run_in_executor(None, lambda: requests.get(url))
+    return response.content
+
+
+def encode_media(buffer, mime_type):
+    base64_data = base64.b64encode(buffer).decode('utf-8')
+    return {'mime_type': mime_type, 'base64': base64_data}
+
+
+async def build_contents(client, types, prompt, media_data=None):
+    contents = [prompt]
+
+    if media_data:
+        if media_data['mime_type'] == 'application/pdf':
+            pdf_buffer = base64.b64decode(media_data['base64'])
+            pdf_file = await client.aio.files.upload(file=io.BytesIO(pdf_buffer), config=dict(mime_type='application/pdf'))
+            contents.append(pdf_file)
+        else:
+            contents.append(types.Part.from_bytes(
+                data=base64.b64decode(media_data['base64']),
+                mime_type=media_data['mime_type']
+            ))
+
+    return contents
+
+
+def parse_html(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    content = ""
+    for elem in soup.select('p, h1, h2, h3'):
+        content += elem.get_text().strip() + '\n'
+    return content[:5000]
+
+
+async def translate_text(session, api_key, url, text, target_language='en'):
+    try:
+        payload = {
+            'q': text,
+            'target': target_language,
+            'format': 'text'
+        }
+        
+        async with session.post(url, params={'key': api_key}, json=payload) as response:
+            response.raise_for_status()
+            result = await response.json()
+        
+        translated_text = result['data']['translations'][0]['translatedText']
+        return translated_text
+    except Exception as error:
+        print(f'Error di translateText: {error}')
+        return text
+
+
+def route_message(content):
+    """The dispatch conditions of the old handle_message, with the handler bodies reduced to the command name."""
+    if content.lower() == '!reset':
+        return '!reset'
+    
+    if content.lower() == '!statcache':
+        return '!statcache'
+
+    if content.lower() == '!statantrian':
+        return '!statantrian'
+
+    if content.lower() == '!resetgambar':
+        return '!resetgambar'
+
+    if content.lower().startswith('!gambar'):
+        return '!gambar'
+        
+    if content.lower().startswith('!gambar_en'):
+        return '!gambar_en'
+    
+    if content.lower().startswith('!editgambar'):
+        return '!editgambar'
+    
+    if content.lower().startswith('!editgambar_en'):
+        return '!editgambar_en'
+
+    if content.lower().startswith('!think'):
+        return '!think'
+
+    if content.lower().startswith('!gift'):
+        return '!gift'
+
+    if content.startswith('!cari'):
+        return '!cari'
+    elif content.startswith('!chat'):
+        return '!chat'
+    return None
+
+
+EAGER_MODULES = ('google.genai', 'google.genai.types', 'PIL.Image', 'bs4', 'requests')
+
+
+def eager_startup(api_key='bench'):
+    modules = [importlib.import_module(name) for name in EAGER_MODULES]
+    return modules[0].Client(api_key=api_key)
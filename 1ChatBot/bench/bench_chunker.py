@@ -0,0 +1,64 @@
+import argparse
+import random
+import timeit
+
+from bench import baseline
+from chunker import TextChunker, split_text
+
+
+def sample_reply(rng, size):
+    lines = []
+    length = 0
+    while length < size:
+        choice = rng.random()
+        if choice < 0.1:
+            block = ['```python'] + [f"    nilai_{index} = hitung({index}) * {rng.randint(1, 9)}" for index in range(rng.randint(3, 40))] + ['```']
+        elif choice < 0.2:
+            block = ['x' * rng.randint(2000, 5000)]
+        else:
+            block = [' '.join('kata' for _ in range(rng.randint(3, 60))), '']
+        lines.extend(block)
+        length += sum(len(line) + 1 for line in block)
+    return '\n'.join(lines)
+
+
+def stream_resplit(pieces):
+    text = ''
+    for piece in pieces:
+        text += piece
+        baseline.split_text(text)
+
+
+def stream_incremental(pieces):
+    chunker = TextChunker()
+    for piece in pieces:
+        chunker.feed(piece)
+        chunker.preview()
+    chunker.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bandingkan split_text lama dan TextChunker.')
+    parser.add_argument('--sizes', default='2000,20000,200000')
+    parser.add_argument('--piece', type=int, default=120, help='ukuran potongan stream')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    for size in map(int, args.sizes.split(',')):
+        text = sample_reply(rng, size)
+        pieces = [text[index:index + args.piece] for index in range(0, len(text), args.piece)]
+        number = max(1, 200000 // size)
+        old = min(timeit.repeat(lambda: baseline.split_text(text), number=number, repeat=3)) / number
+        new = min(timeit.repeat(lambda: split_text(text), number=number, repeat=3)) / number
+        stream_number = max(1, number // 20)
+        old_stream = min(timeit.repeat(lambda: stream_resplit(pieces), number=stream_number, repeat=3)) / stream_number
+        new_stream = min(timeit.repeat(lambda: stream_incremental(pieces), number=stream_number, repeat=3)) / stream_number
+        print(
+            f"{len(text):>7} karakter: split lama {old * 1e3:8.2f}ms baru {new * 1e3:8.2f}ms | "
+            f"stream {len(pieces)} potongan lama {old_stream * 1e3:9.2f}ms baru {new_stream * 1e3:8.2f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
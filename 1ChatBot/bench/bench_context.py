@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+os.environ.setdefault('METRICS_PORT', '0')
+
+import main
+from bench.fakes import FakeGateway, FakeGenAI, Latency
+from conversation_store import ConversationStore
+
+
+def message(rng, low, high):
+    return ' '.join('kata' for _ in range(rng.randint(low, high)))
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+async def run_mode(args, keep_turns):
+    rng = random.Random(args.seed)
+    image = bytes(rng.getrandbits(8) for _ in range(args.image_kb * 1024))
+    media_data = {'mime_type': 'image/png', 'data': image, 'size': len(image), 'sha256': hashlib.sha256(image).hexdigest()}
+    search_results = '**Hasil Pencarian dari Google**\n\n' + message(rng, args.search_words, args.search_words)
+
+    async def google_search(query):
+        return search_results
+
+    main.google_search = google_search
+    main.gemini_scheduler.model_rpm = {}
+    main.gemini_scheduler.default_rpm = 60000
+    main.gemini_scheduler.model_buckets.clear()
+    main.LIVE_EXTRA_TURNS = keep_turns
+    main.live_chats.clear()
+    main.conversation_history = ConversationStore(
+        max_turns=args.max_turns, token_budget=args.budget,
+        summary_min_turns=args.min_turns, summary_min_tokens=args.min_tokens
+    )
+    counted = []
+    latency = []
+    for turn in range(args.turns):
+        extras = turn % args.extra_every == 0
+        summary, turns = await main.conversation_history.get_context('bench')
+        counted.append(sum(turn['tokens'] for turn in turns))
+        started = time.perf_counter()
+        await main.generate_response(
+            'bench', message(rng, 5, 80),
+            media_data if extras else None,
+            'cari sesuatu' if extras else None
+        )
+        latency.append(time.perf_counter() - started)
+        await asyncio.gather(*main.background_tasks)
+    return counted, latency
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Ukur prompt nyata yang dikirim chat live dan latensi balasannya.')
+    parser.add_argument('--turns', type=int, default=60)
+    parser.add_argument('--extra-every', type=int, default=3, help='setiap N giliran membawa hasil pencarian dan gambar')
+    parser.add_argument('--image-kb', type=int, default=512)
+    parser.add_argument('--search-words', type=int, default=1500)
+    parser.add_argument('--keep-turns', type=int, default=main.LIVE_EXTRA_TURNS, help='LIVE_EXTRA_TURNS yang diuji')
+    parser.add_argument('--latency', type=float, default=0.02, help='latensi dasar model (detik)')
+    parser.add_argument('--prompt-scale', type=float, default=0.01, help='detik per 1000 token prompt')
+    parser.add_argument('--budget', type=int, default=6000)
+    parser.add_argument('--max-turns', type=int, default=10)
+    parser.add_argument('--min-turns', type=int, default=4)
+    parser.add_argument('--min-tokens', type=int, default=1500)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    main.print = lambda *values, **kwargs: None
+    main.types.Part
+
+    for label, keep_turns in (('simpan', args.turns), (f"buang>{args.keep_turns}", args.keep_turns)):
+        genai = FakeGenAI(Latency(args.latency), reply_chars=1200, prompt_scale=args.prompt_scale)
+        gateway = FakeGateway(main).install(genai)
+        counted, latency = gateway.run(run_mode(args, keep_turns))
+        chat_requests = genai.requests
+        tokens = [tokens for tokens, _ in chat_requests]
+        sizes = [size for _, size in chat_requests]
+        print(
+            f"{label:<9} token prompt p50/maks={percentile(tokens, 0.5)}/{max(tokens)} "
+            f"(terhitung {percentile(counted, 0.5)}/{max(counted)}) "
+            f"byte p50/maks={percentile(sizes, 0.5) / 1024:.0f}/{max(sizes) / 1024:.0f}KiB "
+            f"balasan p50/p95={percentile(latency, 0.5) * 1000:.0f}/{percentile(latency, 0.95) * 1000:.0f}ms "
+            f"chat dibuat={genai.calls['chats_create']} ringkasan={genai.calls['generate_content']}"
+        )
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+
+import main
+from bench import baseline
+from bench.fakes import StubServer
+from html_extract import TextExtractor
+
+WORDS = ['data', 'sistem', 'jaringan', 'belajar', 'rumah', 'kota', 'budaya', 'sejarah', 'ilmu', 'teknologi',
+         'air', 'hutan', 'energi', 'pasar', 'harga', 'sekolah', 'murid', 'guru', 'berita', 'olahraga']
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def generate_page(rng, paragraphs, script_kb=40, nav_links=150):
+    """Build a page shaped like a news article: heavy head scripts, long nav, body text, footer."""
+    head = ''.join(
+        f"<script>var data{index} = {{{', '.join(f'k{key}: {key}' for key in range(script_kb * 8))}}};</script>"
+        for index in range(4)
+    ) + "<style>" + "p { margin: 0 } " * 200 + "</style>"
+    nav = '<nav><ul>' + ''.join(f"<li><a href='/l/{index}'>{sentence(rng, 2)}</a></li>" for index in range(nav_links)) + '</ul></nav>'
+    body = []
+    for index in range(paragraphs):
+        if index % 6 == 0:
+            body.append(f"<h2>{sentence(rng, 5)}</h2>")
+        body.append(
+            f"<div class='row'><p>{sentence(rng, rng.randint(20, 60))} <a href='#'>{sentence(rng, 3)}</a> "
+            f"{sentence(rng, rng.randint(10, 40))} &amp; &quot;kutipan&quot;</p></div>"
+        )
+    footer = '<footer>' + ''.join(f"<p>{sentence(rng, 8)}</p>" for _ in range(20)) + '</footer>'
+    return f"<!doctype html><html><head><title>{sentence(rng, 4)}</title>{head}</head><body>{nav}<h1>{sentence(rng, 6)}</h1>{''.join(body)}{footer}</body></html>"
+
+
+def extract_whole(html):
+    extractor = TextExtractor(main.SEARCH_CONTENT_BUDGET)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
+
+
+def extract_streaming(html, chunk_size=main.DOWNLOAD_CHUNK_SIZE):
+    extractor = TextExtractor(main.SEARCH_CONTENT_BUDGET)
+    consumed = 0
+    for offset in range(0, len(html), chunk_size):
+        extractor.feed(html[offset:offset + chunk_size])
+        consumed = offset + chunk_size
+        if extractor.done:
+            break
+    extractor.close()
+    return extractor.text(), min(consumed, len(html))
+
+
+def time_call(func, pages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - started) / (repeat * len(pages))
+
+
+async def scrape_bytes(pages):
+    server = StubServer()
+    for index, page in enumerate(pages):
+        server.page(f"/page{index}", page)
+    async with server:
+        for index in range(len(pages)):
+            main.page_cache.clear()
+            await main.scrape_page(server.link(f"/page{index}"))
+        await main.close_http_session()
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Bandingkan ekstraksi teks inkremental dengan BeautifulSoup.')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--paragraphs', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [generate_page(rng, args.paragraphs) for _ in range(args.pages)]
+    average_kb = sum(len(page) for page in pages) / len(pages) / 1024
+    print(f"korpus: {len(pages)} halaman, rata-rata {average_kb:.0f} KB")
+
+    variants = [('extractor penuh', extract_whole), ('extractor berhenti dini', lambda page: extract_streaming(page)[0])]
+    try:
+        import bs4  # noqa: F401
+        variants.insert(0, ('beautifulsoup', baseline.parse_html))
+        mismatched = sum(baseline.parse_html(page) != extract_whole(page) for page in pages)
+        print(f"hasil berbeda dari BeautifulSoup: {mismatched}/{len(pages)} halaman")
+    except ImportError:
+        print('beautifulsoup4 tidak terpasang, baseline dilewati')
+
+    for name, func in variants:
+        print(f"{name:<24} {time_call(func, pages, args.repeat) * 1000:7.2f}ms/halaman")
+    consumed = sum(extract_streaming(page)[1] for page in pages) / sum(len(page) for page in pages)
+    print(f"bagian halaman yang dibaca sebelum berhenti: {consumed:.0%}")
+
+    started = time.perf_counter()
+    asyncio.run(scrape_bytes(pages))
+    print(f"scrape_page lewat stub: {(time.perf_counter() - started) / len(pages) * 1000:.2f}ms/halaman")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+
+import main
+from bench import baseline
+from bench.fakes import StubServer
+
+
+async def measure(download, urls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(url):
+        async with semaphore:
+            started = time.perf_counter()
+            await download(url)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(url) for url in urls))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return elapsed, samples
+
+
+async def run(args):
+    server = StubServer()
+    server.page('/blob', 'a' * args.size, args.delay, content_type='application/octet-stream')
+    variants = [('pooled', main.download_bytes)]
+    try:
+        import requests  # noqa: F401
+        variants.insert(0, ('requests', baseline.download_bytes))
+    except ImportError:
+        print('requests tidak terpasang, baseline dilewati')
+
+    async with server:
+        urls = [server.link('/blob')] * args.requests
+        for name, download in variants:
+            server.peers.clear()
+            elapsed, samples = await measure(download, urls, args.concurrency)
+            print(
+                f"{name:<9} {args.requests / elapsed:.0f} req/s p50={samples[len(samples) // 2] * 1000:.1f}ms "
+                f"p95={samples[int(len(samples) * 0.95)] * 1000:.1f}ms koneksi={len(server.peers)}"
+            )
+        await main.close_http_session()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bandingkan requests di executor dengan sesi aiohttp bersama.')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--size', type=int, default=32 * 1024)
+    parser.add_argument('--delay', type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(run(args))
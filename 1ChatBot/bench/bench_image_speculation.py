@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+os.environ.setdefault('METRICS_PORT', '0')
+
+import main
+from bench.fakes import FakeGateway, FakeGenAI, Latency
+
+PROMPTS = ['kucing di bulan', 'kota masa depan', 'hutan berkabut', 'naga di gunung', 'pantai saat senja',
+           'robot membaca buku', 'pasar tradisional', 'kapal layar di badai', 'taman bunga', 'kereta uap']
+
+
+async def run_mode(args, requests):
+    main.enrichment_cache.clear()
+    main.gemini_scheduler.model_rpm = {}
+    main.gemini_scheduler.default_rpm = 60000
+    main.gemini_scheduler.model_buckets.clear()
+    main.gemini_scheduler.concurrency = args.concurrency
+    hits, misses = main.enrichment_cache.hits, main.enrichment_cache.misses
+    samples = []
+    failures = 0
+
+    async def one(prompt, delay):
+        nonlocal failures
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        image, _ = await main.generate_image('bench', prompt)
+        samples.append(time.perf_counter() - started)
+        failures += image is None
+
+    await asyncio.gather(*(one(prompt, delay) for prompt, delay in requests))
+    await asyncio.gather(*main.background_tasks)
+    samples.sort()
+    hits, misses = main.enrichment_cache.hits - hits, main.enrichment_cache.misses - misses
+    return samples, failures, hits / (hits + misses)
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Bandingkan mode IMAGE_SPECULATION dengan model palsu.')
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--unique', type=int, default=20, help='jumlah prompt berbeda (sisanya berulang)')
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--enrich-latency', type=float, default=0.15, help='latensi enrichment (detik)')
+    parser.add_argument('--image-latency', type=float, default=0.6, help='latensi pembuatan gambar (detik)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='jitter relatif terhadap latensi')
+    parser.add_argument('--budget', type=float, default=0.2, help='ENRICH_BUDGET untuk mode budget')
+    parser.add_argument('--concurrency', type=int, default=32, help='GEMINI_CONCURRENCY selama benchmark')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [f"{rng.choice(PROMPTS)} {index}" for index in range(args.unique)]
+    requests = [(rng.choice(pool), rng.uniform(0, args.duration)) for _ in range(args.requests)]
+    main.ENRICH_BUDGET = args.budget
+    main.print = lambda *values, **kwargs: None
+
+    for mode in ('', 'keep', 'budget'):
+        genai = FakeGenAI(
+            Latency(args.enrich_latency, args.enrich_latency * args.jitter, 0.0, args.seed),
+            image_scale=args.image_latency / args.enrich_latency
+        )
+        gateway = FakeGateway(main).install(genai)
+        main.IMAGE_SPECULATION = mode
+        samples, failures, hit_rate = gateway.run(run_mode(args, requests))
+        calls = genai.calls
+        enrich_calls = calls['generate_content'] - calls['image_started']
+        print(
+            f"{mode or 'off':<7} p50={samples[len(samples) // 2]:.3f}s p95={samples[int(len(samples) * 0.95)]:.3f}s "
+            f"enrich={enrich_calls} render={calls['image_started']} batal={calls['image_cancelled']} "
+            f"gagal={failures} hit cache={hit_rate:.0%}"
+        )
+
+
+if __name__ == '__main__':
+    run()
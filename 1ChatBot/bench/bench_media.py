@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+
+from aiohttp import web
+
+import main
+from bench import baseline
+from bench.fakes import FakeAttachment, FakeGenAI, StubServer
+
+
+async def old_path(attachment):
+    buffer = await main.download_bytes(attachment.url)
+    media_data = baseline.encode_media(buffer, attachment.content_type)
+    del buffer
+    return await baseline.build_contents(main.client, main.types, 'jelaskan', media_data)
+
+
+async def new_path(attachment):
+    media_data = await main.download_media(attachment)
+    try:
+        return await main.build_contents('jelaskan', media_data)
+    finally:
+        main.close_media(media_data)
+
+
+async def measure(path, attachment, repeat):
+    main.upload_cache.clear()
+    await path(attachment)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        main.upload_cache.clear()
+        await path(attachment)
+    elapsed = (time.perf_counter() - started) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+async def run(args):
+    main.client = FakeGenAI()
+    main.types.load()
+    server = StubServer()
+    sizes = [int(size) * 1024 * 1024 for size in args.sizes.split(',')]
+    blobs = {str(size): b'a' * size for size in sizes}
+
+    async def media(request):
+        blob = memoryview(blobs[request.match_info['size']])
+        response = web.StreamResponse()
+        response.content_length = len(blob)
+        await response.prepare(request)
+        for offset in range(0, len(blob), 64 * 1024):
+            await response.write(blob[offset:offset + 64 * 1024])
+        return response
+
+    server.route('GET', '/media/{size}', media)
+
+    async with server:
+        for mime_type in ('image/png', 'application/pdf'):
+            for size in sizes:
+                attachment = FakeAttachment(server.link(f"/media/{size}"), mime_type, size)
+                for name, path in (('base64', old_path), ('bytes', new_path)):
+                    elapsed, peak = await measure(path, attachment, args.repeat)
+                    print(
+                        f"{mime_type:<16} {size / 1e6:6.1f} MB {name:<7} "
+                        f"{elapsed * 1000:7.1f}ms puncak={peak / 1e6:6.1f} MB ({peak / size:.1f}x)"
+                    )
+        await main.close_http_session()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bandingkan jalur lampiran base64 lama dengan bytes dan spool.')
+    parser.add_argument('--sizes', default='1,3,8,16', help='ukuran lampiran dalam MB, dipisah koma')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,56 @@
+import argparse
+import os
+import random
+import timeit
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+os.environ.setdefault('METRICS_PORT', '0')
+
+import main
+from bench import baseline
+
+COMMAND_SAMPLES = ['!chat apa kabar', '!cari berita hari ini', '!gambar kucing lucu', '!gambar_en a cute cat',
+                   '!editgambar jadi malam', '!think kenapa langit biru', '!gift ulang tahun', '!reset', '!statcache']
+
+
+def corpus(rng, size, command_ratio):
+    messages = []
+    for _ in range(size):
+        if rng.random() < command_ratio:
+            messages.append(rng.choice(COMMAND_SAMPLES))
+        else:
+            messages.append(' '.join(rng.choice(['halo', 'apa', 'kabar', 'bot', 'tolong', 'jelaskan', 'ini'])
+                                     for _ in range(rng.randint(1, 30))))
+    return messages
+
+
+def route_router(messages):
+    for content in messages:
+        main.router.match(content)
+
+
+def route_chain(messages):
+    for content in messages:
+        baseline.route_message(content)
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Bandingkan CommandRouter dengan rantai if/startswith lama.')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for ratio in (0.0, 0.3, 1.0):
+        messages = corpus(rng, args.messages, ratio)
+        results = {}
+        for name, route in (('if/elif', route_chain), ('router', route_router)):
+            best = min(timeit.repeat(lambda: route(messages), number=1, repeat=args.repeat))
+            results[name] = best / len(messages) * 1e9
+        print(f"perintah {ratio:>4.0%}: " + '  '.join(f"{name} {value:6.0f} ns/pesan" for name, value in results.items()))
+
+
+if __name__ == '__main__':
+    run()
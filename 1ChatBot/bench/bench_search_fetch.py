@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+
+import main
+from bench.fakes import StubServer, html_page
+
+
+async def fetch_sequential(items):
+    contents = []
+    for item in items[:main.SEARCH_FETCH_TOP_K]:
+        try:
+            contents.append(await main.scrape_page(item['link']))
+        except Exception:
+            pass
+    return contents
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    server = StubServer()
+    delays = {}
+    for index in range(args.pages):
+        path = f"/page{index}"
+        delays[path] = args.slow if rng.random() < args.slow_ratio else rng.uniform(0.01, args.fast)
+        server.page(path, html_page(path, [f"paragraf {index} " * 200]), delays[path])
+
+    async with server:
+        paths = list(delays)
+        queries = [[{'link': server.link(path)} for path in rng.sample(paths, 5)] for _ in range(args.queries)]
+        for name, fetch in (('sequential', fetch_sequential), ('concurrent', main.fetch_search_contents)):
+            samples = []
+            for items in queries:
+                main.page_cache.clear()
+                started = time.perf_counter()
+                await fetch(items)
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            print(
+                f"{name:<11} p50={samples[len(samples) // 2] * 1000:.0f}ms "
+                f"p95={samples[int(len(samples) * 0.95)] * 1000:.0f}ms max={samples[-1] * 1000:.0f}ms"
+            )
+        await main.close_http_session()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bandingkan pengambilan hasil pencarian berurutan dan paralel.')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--fast', type=float, default=0.3)
+    parser.add_argument('--slow', type=float, default=8.0)
+    parser.add_argument('--slow-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    main.SEARCH_FETCH_DEADLINE = min(main.SEARCH_FETCH_DEADLINE, args.slow / 2)
+    asyncio.run(run(args))
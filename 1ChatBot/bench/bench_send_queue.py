@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+
+from chunker import split_text
+from send_queue import ChannelSender
+
+
+class RateLimitedChannel:
+    """Channel that enforces Discord's per-channel limit and charges a retry delay like a 429 would."""
+
+    def __init__(self, channel_id, burst, per, latency):
+        self.id = channel_id
+        self.burst = burst
+        self.per = per
+        self.latency = latency
+        self.history = deque()
+        self.sent = 0
+        self.limited = 0
+
+    async def send(self, content):
+        while True:
+            now = time.monotonic()
+            while self.history and now - self.history[0] >= self.per:
+                self.history.popleft()
+            if len(self.history) < self.burst:
+                break
+            self.limited += 1
+            await asyncio.sleep(self.per - (now - self.history[0]) + self.latency)
+        self.history.append(now)
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+        return content
+
+
+async def send_sequential(channel, chunks, pause):
+    for chunk in chunks:
+        await channel.send(chunk)
+        await asyncio.sleep(pause)
+
+
+async def send_queued(sender, channel, chunks):
+    await asyncio.gather(*sender.send(channel, chunks))
+
+
+def make_reply(rng, max_chars):
+    lines = []
+    for _ in range(rng.randint(3, 40)):
+        lines.append(' '.join('kata' for _ in range(rng.randint(5, 60))))
+        lines.append('')
+    return '\n'.join(lines)[:max_chars]
+
+
+async def run_variant(name, args, replies):
+    channels = {channel_id: RateLimitedChannel(channel_id, args.burst, args.per, args.latency) for channel_id in range(args.channels)}
+    sender = ChannelSender(2000, args.burst, args.per, args.concurrency)
+    durations = []
+
+    async def deliver(channel, reply, delay):
+        await asyncio.sleep(delay)
+        started = time.monotonic()
+        chunks = split_text(reply)
+        if name == 'sleep':
+            await send_sequential(channel, chunks, args.per / args.burst)
+        else:
+            await send_queued(sender, channel, chunks)
+        durations.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    await asyncio.gather(*(deliver(channels[channel_id], reply, delay) for channel_id, reply, delay in replies))
+    elapsed = time.monotonic() - started
+    durations.sort()
+    print(
+        f"{name:<6} selesai={elapsed:.2f}s p50={durations[len(durations) // 2]:.2f}s "
+        f"p95={durations[int(len(durations) * 0.95)]:.2f}s pesan={sum(channel.sent for channel in channels.values())} "
+        f"429={sum(channel.limited for channel in channels.values())}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bandingkan kirim-lalu-tidur dengan ChannelSender pada kanal ber-rate-limit.')
+    parser.add_argument('--channels', type=int, default=10)
+    parser.add_argument('--replies', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=5.0, help='rentang kedatangan balasan dalam detik')
+    parser.add_argument('--max-chars', type=int, default=6000)
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--per', type=float, default=0.5, help='jendela rate limit (5 detik di Discord, diperkecil di sini)')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    replies = [
+        (rng.randrange(args.channels), make_reply(rng, args.max_chars), rng.uniform(0, args.duration))
+        for _ in range(args.replies)
+    ]
+    for name in ('sleep', 'queue'):
+        asyncio.run(run_variant(name, args, replies))
+
+
+if __name__ == '__main__':
+    main()
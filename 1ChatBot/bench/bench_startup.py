@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(mode, gap):
+    started = time.perf_counter()
+    if mode == 'eager':
+        from bench.baseline import eager_startup
+        eager_startup()
+    import main
+    imported = time.perf_counter() - started
+
+    from bench.fakes import FakeGateway, FakeGenAI
+
+    async def sync():
+        return []
+
+    main.bot.tree.sync = sync
+    main.print = lambda *values, **kwargs: None
+    genai = FakeGenAI(reply_chars=200)
+    gateway = FakeGateway(main).install(genai)
+    main.client = main.LazyObject(lambda: genai)
+
+    async def scenario():
+        await main.on_ready()
+        ready = time.perf_counter() - started
+        await main.set_channel_active('1', True)
+        await asyncio.sleep(gap)
+        reply = gateway.first_reply(1)
+        sent_at = time.perf_counter()
+        await gateway.dispatch(gateway.message(1, 1, 'halo, apa kabar?'))
+        first_reply = await asyncio.wait_for(reply, 30) - sent_at
+        await gateway.settle(30)
+        return ready, first_reply
+
+    ready, first_reply = gateway.run(scenario())
+    print(json.dumps({'import': imported, 'ready': ready, 'first_reply': first_reply}))
+
+
+def measure(mode, args):
+    env = dict(
+        os.environ, CONVERSATION_DB='', IMAGE_SPILL_DIR='', METRICS_PORT='0', COALESCE_WINDOW='0',
+        PREWARM='0' if args.no_prewarm else '1'
+    )
+    result = subprocess.run(
+        [sys.executable, '-m', 'bench.bench_startup', '--child', mode, '--gap', str(args.gap)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Ukur waktu import main dan waktu sampai on_ready di proses baru.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--no-prewarm', action='store_true', help='jalankan dengan PREWARM=0')
+    parser.add_argument('--gap', type=float, default=1.0, help='jeda antara on_ready dan pesan pertama (detik)')
+    parser.add_argument('--child', choices=('lazy', 'eager'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.gap)
+        return
+
+    samples = {'eager': [], 'lazy': []}
+    for _ in range(args.runs):
+        for mode in samples:
+            samples[mode].append(measure(mode, args))
+
+    for mode, runs in samples.items():
+        print(f"{mode:<6}", end='')
+        for phase in ('import', 'ready', 'first_reply'):
+            values = sorted(run[phase] for run in runs)
+            print(f" {phase} p50={values[len(values) // 2] * 1000:.0f}ms maks={values[-1] * 1000:.0f}ms", end='')
+        print()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault('CONVERSATION_DB', '')
+os.environ.setdefault('IMAGE_SPILL_DIR', '')
+
+import main
+from bench import baseline
+from bench.fakes import StubServer
+
+PHRASES = ['apa kabar', 'terima kasih banyak', 'di mana stasiun terdekat', 'saya suka belajar', 'cuaca hari ini cerah',
+           'tolong bantu saya', 'berapa harganya', 'selamat pagi semua', 'jam berapa sekarang', 'sampai jumpa lagi']
+
+
+async def translate_single(text):
+    return await baseline.translate_text(main.get_http_session(), main.GOOGLE_API_KEY, main.TRANSLATE_URL, text)
+
+
+async def measure(translate, workload):
+    samples = []
+    failures = 0
+
+    async def one(text, delay):
+        nonlocal failures
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        translated_text = await translate(text)
+        samples.append(time.perf_counter() - started)
+        failures += translated_text == text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text, delay) for text, delay in workload))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return elapsed, samples, failures
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    pool = [f"{rng.choice(PHRASES)} {index}" for index in range(args.unique)]
+    workload = [(rng.choice(pool), rng.uniform(0, args.duration)) for _ in range(args.texts)]
+    main.GOOGLE_API_KEY = main.GOOGLE_API_KEY or 'bench'
+    baseline.print = main.print = lambda *values, **kwargs: None
+
+    server = StubServer()
+    server.translation(delay=args.latency)
+    async with server:
+        main.TRANSLATE_URL = server.link('/translate')
+        for name, translate in (('per teks', translate_single), ('batch+cache', main.translate_text)):
+            main.translation_cache.clear()
+            server.payloads.clear()
+            elapsed, samples, failures = await measure(translate, workload)
+            batches = server.payloads.get('/translate', [])
+            print(
+                f"{name:<12} selesai={elapsed:.2f}s p50={samples[len(samples) // 2] * 1000:.1f}ms "
+                f"p95={samples[int(len(samples) * 0.95)] * 1000:.1f}ms permintaan={len(batches)} "
+                f"teks terkirim={sum(len(batch) for batch in batches)} gagal={failures}"
+            )
+        await main.close_http_session()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bandingkan terjemahan per teks dengan BatchTranslator.')
+    parser.add_argument('--texts', type=int, default=600)
+    parser.add_argument('--unique', type=int, default=150)
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--latency', type=float, default=0.08)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
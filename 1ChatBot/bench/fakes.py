@@ -0,0 +1,469 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from aiohttp import web
+
+
+class StubServer:
+    def __init__(self):
+        self.app = web.Application()
+        self.runner = None
+        self.url = None
+        self.hits = {}
+        self.peers = set()
+        self.payloads = {}
+        self.loop = None
+        self.thread = None
+
+    def route(self, method, path, handler):
+        async def counted(request):
+            self.hits[path] = self.hits.get(path, 0) + 1
+            self.peers.add(request.transport.get_extra_info('peername'))
+            return await handler(request)
+
+        self.app.router.add_route(method, path, counted)
+
+    def page(self, path, body, delay=0.0, status=200, content_type='text/html'):
+        async def handler(request):
+            if delay:
+                await asyncio.sleep(delay)
+            return web.Response(text=body, status=status, content_type=content_type)
+
+        self.route('GET', path, handler)
+
+    def translation(self, path='/translate', delay=0.0, status=200):
+        """Mimic the Cloud Translation v2 endpoint, answering ``[target] text`` for every ``q``."""
+        async def handler(request):
+            payload = await request.json()
+            texts = payload['q'] if isinstance(payload['q'], list) else [payload['q']]
+            self.payloads.setdefault(path, []).append(texts)
+            if delay:
+                await asyncio.sleep(delay)
+            if status != 200:
+                return web.Response(status=status, text='fake upstream error')
+            translations = [{'translatedText': f"[{payload['target']}] {text}"} for text in texts]
+            return web.json_response({'data': {'translations': translations}})
+
+        self.route('POST', path, handler)
+
+    def link(self, path):
+        return f"{self.url}{path}"
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def start_thread(self):
+        """Serve from a separate thread and loop so stub work does not load the loop under test."""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='stub-server', daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self.loop).result()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def html_page(title, paragraphs):
+    body = ''.join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    return f"<html><head><title>{title}</title><script>var x = 1;</script></head><body>{body}</body></html>"
+
+
+PNG_PIXEL = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89'
+    b'\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code=503, message='fake upstream error'):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class Latency:
+    def __init__(self, mean=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.mean = mean
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+    async def wait(self, scale=1.0, fail=True):
+        delay = max(0.0, self.mean + self.random.uniform(-self.jitter, self.jitter)) * scale
+        if delay:
+            await asyncio.sleep(delay)
+        if fail and self.error_rate and self.random.random() < self.error_rate:
+            raise FakeAPIError()
+
+
+def content_text(contents):
+    if isinstance(contents, str):
+        return contents
+    texts = []
+    for item in contents if isinstance(contents, list) else [contents]:
+        if isinstance(item, str):
+            texts.append(item)
+        elif getattr(item, 'text', None):
+            texts.append(item.text)
+    return '\n'.join(texts)
+
+
+MEDIA_TOKENS = 258
+
+
+def request_size(contents):
+    """Estimated prompt tokens and payload bytes of everything sent in one request."""
+    tokens = 0
+    size = 0
+    for item in contents if isinstance(contents, list) else [contents]:
+        parts = [item] if isinstance(item, str) else getattr(item, 'parts', None) or [item]
+        for part in parts:
+            text = part if isinstance(part, str) else getattr(part, 'text', None)
+            inline = getattr(part, 'inline_data', None)
+            if text:
+                tokens += (len(text) + 3) // 4
+                size += len(text.encode())
+            elif inline is not None:
+                tokens += MEDIA_TOKENS
+                size += len(getattr(inline, 'data', inline) or b'')
+            elif getattr(part, 'file_data', None) is not None or getattr(part, 'uri', None):
+                tokens += MEDIA_TOKENS
+    return tokens, size
+
+
+def fake_response(text, parts=None, prompt_tokens=10):
+    parts = parts or [SimpleNamespace(text=text, inline_data=None)]
+    output_tokens = max(1, len(text) // 4)
+    return SimpleNamespace(
+        text=text,
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))],
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens
+        )
+    )
+
+
+def fake_content(role, contents):
+    items = contents if isinstance(contents, list) else [contents]
+    parts = [SimpleNamespace(text=item) if isinstance(item, str) else item for item in items]
+    return SimpleNamespace(role=role, parts=parts)
+
+
+class FakeChat:
+    def __init__(self, genai, model, config=None, history=None):
+        self.genai = genai
+        self.model = model
+        self.config = config
+        self.history = list(history or [])
+
+    def get_history(self, curated=False):
+        return self.history
+
+    def reply(self, contents):
+        prompt = content_text(contents)
+        self.genai.prompts.append(prompt)
+        turn = sum(content.role == 'user' for content in self.history)
+        return self.genai.reply_text(prompt, turn)
+
+    async def prefill(self, contents):
+        instruction = getattr(self.config, 'system_instruction', None) or ''
+        items = list(contents) if isinstance(contents, list) else [contents]
+        tokens, size = request_size([instruction] + self.history + items)
+        self.genai.requests.append((tokens, size))
+        if self.genai.prompt_scale:
+            await asyncio.sleep(tokens / 1000 * self.genai.prompt_scale)
+        return tokens
+
+    async def send_message(self, contents, config=None):
+        self.genai.calls['send_message'] += 1
+        await self.genai.latency.wait()
+        prompt_tokens = await self.prefill(contents)
+        text = self.reply(contents)
+        self.history.extend([fake_content('user', contents), fake_content('model', text)])
+        return fake_response(text, prompt_tokens=prompt_tokens)
+
+    async def send_message_stream(self, contents, config=None):
+        self.genai.calls['send_message_stream'] += 1
+
+        async def stream():
+            genai = self.genai
+            genai.active_streams += 1
+            genai.max_active_streams = max(genai.max_active_streams, genai.active_streams)
+            try:
+                await genai.latency.wait()
+                prompt_tokens = await self.prefill(contents)
+                text = self.reply(contents)
+                pieces = [text[index:index + genai.stream_chunk] for index in range(0, len(text), genai.stream_chunk)]
+                for index, piece in enumerate(pieces):
+                    if index:
+                        await genai.latency.wait(genai.stream_scale, fail=False)
+                    chunk = fake_response(piece)
+                    if index < len(pieces) - 1:
+                        chunk.usage_metadata = None
+                    else:
+                        chunk.usage_metadata = fake_response(text, prompt_tokens=prompt_tokens).usage_metadata
+                    yield chunk
+                self.history.append(fake_content('user', contents))
+                self.history.extend(fake_content('model', piece) for piece in pieces)
+            finally:
+                genai.active_streams -= 1
+
+        return stream()
+
+
+class FakeChats:
+    def __init__(self, genai):
+        self.genai = genai
+
+    def create(self, model, config=None, history=None):
+        self.genai.calls['chats_create'] += 1
+        return FakeChat(self.genai, model, config, history)
+
+
+class FakeModels:
+    def __init__(self, genai):
+        self.genai = genai
+
+    async def generate_content(self, model, contents, config=None):
+        self.genai.calls['generate_content'] += 1
+        modalities = getattr(config, 'response_modalities', None) or []
+        if 'Image' in modalities:
+            self.genai.calls['image_started'] += 1
+            try:
+                await self.genai.latency.wait(self.genai.image_scale)
+            except asyncio.CancelledError:
+                self.genai.calls['image_cancelled'] += 1
+                raise
+        else:
+            await self.genai.latency.wait()
+        prompt = content_text(contents)
+        if 'Image' in modalities:
+            parts = [
+                SimpleNamespace(text='Gambar selesai.', inline_data=None),
+                SimpleNamespace(text=None, inline_data=SimpleNamespace(mime_type='image/png', data=PNG_PIXEL))
+            ]
+            return fake_response('Gambar selesai.', parts)
+        return fake_response(self.genai.reply_text(prompt, 0))
+
+
+class FakeFiles:
+    def __init__(self, genai):
+        self.genai = genai
+        self.uploaded = {}
+
+    async def upload(self, file, config=None):
+        self.genai.calls['files_upload'] += 1
+        await self.genai.latency.wait()
+        size = 0
+        while chunk := file.read(64 * 1024):
+            size += len(chunk)
+        name = f"files/{len(self.uploaded) + 1}"
+        uploaded = SimpleNamespace(
+            name=name, state='ACTIVE', size=size, expiration_time=None,
+            mime_type=(config or {}).get('mime_type'), uri=f"https://example.invalid/{name}"
+        )
+        self.uploaded[name] = uploaded
+        return uploaded
+
+    async def get(self, name):
+        self.genai.calls['files_get'] += 1
+        return self.uploaded[name]
+
+
+class FakeGenAI:
+    """Stand-in for google.genai.Client exposing only the async ``aio`` surface the bots use."""
+
+    def __init__(self, latency=None, reply_chars=600, stream_chunk=120, stream_scale=0.1, image_scale=1.0, prompt_scale=0.0):
+        self.latency = latency or Latency()
+        self.prompt_scale = prompt_scale
+        self.reply_chars = reply_chars
+        self.image_scale = image_scale
+        self.stream_chunk = stream_chunk
+        self.stream_scale = stream_scale
+        self.calls = Counter()
+        self.prompts = []
+        self.requests = []
+        self.active_streams = 0
+        self.max_active_streams = 0
+        self.aio = SimpleNamespace(chats=FakeChats(self), models=FakeModels(self), files=FakeFiles(self))
+
+    def reply_text(self, prompt, turn):
+        head = ' '.join(prompt.split())[:80]
+        body = f"Jawaban ke-{turn + 1} untuk: {head}. "
+        filler = 'Ini paragraf penjelasan yang cukup panjang. '
+        while len(body) < self.reply_chars:
+            body += filler
+        return body[:self.reply_chars]
+
+
+class FakeAuthor:
+    def __init__(self, user_id, name=None, bot=False):
+        self.id = user_id
+        self.name = name or f"user{user_id}"
+        self.display_name = self.name
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+
+
+class FakeSentMessage:
+    def __init__(self, channel, content, file=None):
+        self.channel = channel
+        self.content = content
+        self.file = file
+        self.id = next(channel.gateway.ids)
+        self.deleted = False
+
+    async def edit(self, content=None, **kwargs):
+        await self.channel.gateway.latency.wait()
+        self.content = content
+        self.channel.record('edit', content)
+        return self
+
+    async def delete(self):
+        await self.channel.gateway.latency.wait()
+        self.deleted = True
+        self.channel.record('delete', None)
+
+
+class FakeChannel:
+    def __init__(self, gateway, channel_id):
+        self.gateway = gateway
+        self.id = channel_id
+        self.sent = []
+        self.events = []
+
+    def record(self, kind, content):
+        self.events.append((time.perf_counter(), kind, content))
+        self.gateway.on_event(self, kind)
+
+    async def send(self, content=None, file=None, **kwargs):
+        await self.gateway.latency.wait()
+        message = FakeSentMessage(self, content, file)
+        self.sent.append(message)
+        self.record('send', content)
+        return message
+
+    def typing(self):
+        return _AsyncNull()
+
+
+class _AsyncNull:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeAttachment:
+    def __init__(self, url, content_type, size, filename='lampiran'):
+        self.url = url
+        self.content_type = content_type
+        self.size = size
+        self.filename = filename
+
+
+class FakeMessage:
+    def __init__(self, gateway, channel, author, content, attachments=None):
+        self.id = next(gateway.ids)
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.attachments = attachments or []
+        self.guild = None
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeGateway:
+    """Feeds fake Discord messages straight into ``main.on_message`` and tracks replies."""
+
+    def __init__(self, bot, latency=None):
+        self.bot = bot
+        self.latency = latency or Latency()
+        self.ids = itertools.count(1000)
+        self.channels = {}
+        self.authors = {}
+        self.waiters = []
+
+    def install(self, genai):
+        self.bot.client = genai
+        self.bot.model_client.client = genai
+
+        async def process_commands(message):
+            return None
+
+        self.bot.bot.process_commands = process_commands
+        return self
+
+    def run(self, coro):
+        self.bot.gemini_scheduler.wakeup = None
+        self.bot.gemini_scheduler.dispatcher = None
+        self.bot.outbound.semaphore = None
+        return asyncio.run(coro)
+
+    def channel(self, channel_id):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id)
+        return self.channels[channel_id]
+
+    def author(self, user_id):
+        if user_id not in self.authors:
+            self.authors[user_id] = FakeAuthor(user_id)
+        return self.authors[user_id]
+
+    def message(self, channel_id, user_id, content, attachments=None):
+        return FakeMessage(self, self.channel(channel_id), self.author(user_id), content, attachments)
+
+    def on_event(self, channel, kind):
+        for waiter in list(self.waiters):
+            if waiter[0] is channel and kind == 'send' and not waiter[1].done():
+                waiter[1].set_result(time.perf_counter())
+
+    async def dispatch(self, message):
+        await self.bot.on_message(message)
+
+    def first_reply(self, channel_id):
+        future = asyncio.get_event_loop().create_future()
+        waiter = (self.channel(channel_id), future)
+        self.waiters.append(waiter)
+        future.add_done_callback(lambda _: self.waiters.remove(waiter))
+        return future
+
+    async def settle(self, timeout=30.0, ignore=()):
+        deadline = time.monotonic() + timeout
+        ignored = {asyncio.current_task(), *ignore}
+        while time.monotonic() < deadline:
+            dispatcher = self.bot.gemini_scheduler.dispatcher
+            if all(task.done() or task in ignored or task is dispatcher for task in asyncio.all_tasks()):
+                return True
+            await asyncio.sleep(0.01)
+        return False
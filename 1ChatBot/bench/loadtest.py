@@ -0,0 +1,285 @@
+"""Offline load test that drives ``main.on_message`` with fake Discord, Gemini and Google APIs.
+
+Jalankan dari direktori 1ChatBot, misalnya::
+
+    python -m bench.loadtest --messages 500 --rate 50 --model-latency 0.8 --model-error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from aiohttp import web
+
+from bench.fakes import FakeAttachment, FakeGateway, FakeGenAI, Latency, PNG_PIXEL, StubServer, html_page
+
+DEFAULT_MIX = 'chat=30,active=30,attachment=15,cari=15,gambar=10'
+PDF_BYTES = b'%PDF-1.4\n' + b'0' * 4096 + b'\n%%EOF\n'
+QUESTIONS = [
+    'apa itu fotosintesis', 'jelaskan hukum newton', 'resep nasi goreng', 'cara belajar python',
+    'sejarah candi borobudur', 'tips tidur nyenyak', 'apa bedanya ram dan rom', 'kenapa langit biru'
+]
+
+
+def parse_mix(value):
+    mix = []
+    for item in value.split(','):
+        kind, weight = item.split('=', 1)
+        mix.append((kind.strip(), float(weight)))
+    return mix
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def build_stub_server(latency, pages):
+    server = StubServer()
+
+    async def delayed(build):
+        try:
+            await latency.wait()
+        except Exception:
+            return web.Response(status=503, text='fake upstream error')
+        return build()
+
+    async def search(request):
+        query = request.query.get('q', '')
+        items = [
+            {'title': f"{query} {index}", 'snippet': f"Cuplikan tentang {query}", 'link': server.link(f"/page/{index}")}
+            for index in random.sample(range(pages), 5)
+        ]
+        return await delayed(lambda: web.json_response({'items': items}))
+
+    async def page(request):
+        index = request.match_info['index']
+        body = html_page(f"Halaman {index}", [f"Paragraf {index} berisi penjelasan. " * 40] * 5)
+        return await delayed(lambda: web.Response(text=body, content_type='text/html'))
+
+    async def attachment(request):
+        data = PDF_BYTES if request.match_info['name'].endswith('.pdf') else PNG_PIXEL
+        return await delayed(lambda: web.Response(body=data))
+
+    async def translate(request):
+        payload = await request.json()
+        translations = [{'translatedText': f"[en] {text}"} for text in payload['q']]
+        return await delayed(lambda: web.json_response({'data': {'translations': translations}}))
+
+    server.route('GET', '/customsearch', search)
+    server.route('GET', '/page/{index}', page)
+    server.route('GET', '/attachment/{name}', attachment)
+    server.route('POST', '/translate', translate)
+    return server
+
+
+def make_message(kind, rng, gateway, server, args):
+    user_id = rng.randrange(args.users) + 1
+    question = rng.choice(QUESTIONS)
+    if kind == 'active':
+        channel_id = rng.randrange(args.active_channels) + 1
+        return gateway.message(channel_id, user_id, f"{question}?")
+
+    channel_id = rng.randrange(args.channels) + 1
+    if kind == 'chat':
+        return gateway.message(channel_id, user_id, f"!chat {question}")
+    if kind == 'cari':
+        return gateway.message(channel_id, user_id, f"!cari {question}")
+    if kind == 'gambar':
+        return gateway.message(channel_id, user_id, f"!gambar {question} bergaya lukisan")
+    if kind == 'attachment':
+        if rng.random() < 0.5:
+            attachment = FakeAttachment(server.link('/attachment/lampiran.png'), 'image/png', len(PNG_PIXEL))
+        else:
+            attachment = FakeAttachment(server.link('/attachment/lampiran.pdf'), 'application/pdf', len(PDF_BYTES))
+        return gateway.message(channel_id, user_id, f"!chat jelaskan lampiran ini: {question}", [attachment])
+    raise ValueError(f'Jenis pesan tidak dikenali: {kind}')
+
+
+async def sample_loop_lag(samples, interval):
+    loop = asyncio.get_event_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(loop.time() - expected, 0.0))
+
+
+async def run(args, bot):
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    server = build_stub_server(Latency(args.http_latency, args.http_jitter, args.http_error_rate, args.seed), args.pages)
+    server.start_thread()
+    bot.SEARCH_URL = server.link('/customsearch')
+    bot.GOOGLE_API_KEY = bot.GOOGLE_API_KEY or 'loadtest'
+    bot.GOOGLE_CSE_ID = bot.GOOGLE_CSE_ID or 'loadtest'
+    bot.TRANSLATE_URL = server.link('/translate')
+
+    genai = FakeGenAI(
+        Latency(args.model_latency, args.model_jitter, args.model_error_rate, args.seed),
+        reply_chars=args.reply_chars
+    )
+    gateway = FakeGateway(bot, Latency(args.discord_latency, args.discord_latency / 2, 0.0, args.seed)).install(genai)
+    if args.rpm:
+        bot.gemini_scheduler.model_rpm = {}
+        bot.gemini_scheduler.default_rpm = args.rpm
+        bot.gemini_scheduler.model_buckets.clear()
+    if bot.PREWARM:
+        await asyncio.to_thread(bot.types.load)
+    for channel_id in range(1, args.active_channels + 1):
+        await bot.set_channel_active(str(channel_id), True)
+
+    lag_samples = []
+    lag_task = asyncio.create_task(sample_loop_lag(lag_samples, args.lag_interval))
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    mix = parse_mix(args.mix)
+    kinds = [kind for kind, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies = {kind: [] for kind in kinds}
+    outcome = {'timeouts': 0, 'exceptions': 0}
+
+    async def one(kind, message):
+        reply = gateway.first_reply(message.channel.id)
+        sent_at = time.perf_counter()
+        try:
+            await gateway.dispatch(message)
+        except Exception as error:
+            outcome['exceptions'] += 1
+            print(f'Error di loadtest: {error!r}')
+        try:
+            replied_at = await asyncio.wait_for(reply, max(0.0, args.timeout - (time.perf_counter() - sent_at)))
+        except asyncio.TimeoutError:
+            outcome['timeouts'] += 1
+            return
+        latencies[kind].append(replied_at - sent_at)
+
+    started = time.perf_counter()
+    tasks = []
+    for _ in range(args.messages):
+        kind = rng.choices(kinds, weights)[0]
+        tasks.append(asyncio.create_task(one(kind, make_message(kind, rng, gateway, server, args))))
+        if args.rate:
+            await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    await gateway.settle(args.timeout, ignore={lag_task})
+    elapsed = time.perf_counter() - started
+
+    lag_task.cancel()
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+    await bot.close_http_session()
+    server.stop_thread()
+
+    sent = [message for channel in gateway.channels.values() for message in channel.sent]
+    every_latency = [value for values in latencies.values() for value in values]
+    return {
+        'messages': args.messages,
+        'seconds': elapsed,
+        'throughput': args.messages / elapsed if elapsed else 0.0,
+        'replies': len(sent),
+        'error_replies': sum('**Error**' in (message.content or '') for message in sent),
+        'timeouts': outcome['timeouts'],
+        'exceptions': outcome['exceptions'],
+        'latency': {
+            kind: {
+                'count': len(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'p99': percentile(values, 0.99),
+                'max': max(values, default=0.0)
+            }
+            for kind, values in [('all', every_latency), *latencies.items()]
+        },
+        'loop_lag': {
+            'p50': percentile(lag_samples, 0.5),
+            'p99': percentile(lag_samples, 0.99),
+            'max': max(lag_samples, default=0.0)
+        },
+        'tracemalloc_peak_bytes': traced_peak,
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None,
+        'model_calls': dict(genai.calls),
+        'http_requests': dict(server.hits),
+        'scheduler': {key: value for key, value in bot.gemini_scheduler.stats().items() if key != 'depth'}
+    }
+
+
+def print_report(report):
+    print(f"pesan        : {report['messages']} dalam {report['seconds']:.1f}s ({report['throughput']:.1f} pesan/s)")
+    print(f"balasan      : {report['replies']} terkirim, {report['error_replies']} error, "
+          f"{report['timeouts']} timeout, {report['exceptions']} exception")
+    print("latensi balasan pertama (detik):")
+    for kind, stats in report['latency'].items():
+        print(f"  {kind:<11} n={stats['count']:<5} p50={stats['p50']:.3f} p95={stats['p95']:.3f} "
+              f"p99={stats['p99']:.3f} maks={stats['max']:.3f}")
+    lag = report['loop_lag']
+    print(f"lag event loop: p50={lag['p50'] * 1000:.1f}ms p99={lag['p99'] * 1000:.1f}ms maks={lag['max'] * 1000:.1f}ms")
+    if report['tracemalloc_peak_bytes'] is not None:
+        print(f"puncak tracemalloc: {report['tracemalloc_peak_bytes'] / 1e6:.1f} MB")
+    if report['max_rss_bytes'] is not None:
+        print(f"puncak RSS   : {report['max_rss_bytes'] / 1e6:.1f} MB")
+    print(f"panggilan model: {report['model_calls']}")
+    print(f"permintaan HTTP: {report['http_requests']}")
+    print(f"penjadwal    : {report['scheduler']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Uji beban offline untuk 1ChatBot.')
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=30.0, help='pesan per detik (kedatangan Poisson), 0 = sekaligus')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='bobot jenis pesan: chat, active, attachment, cari, gambar')
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--active-channels', type=int, default=10)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--model-latency', type=float, default=0.5)
+    parser.add_argument('--model-jitter', type=float, default=0.2)
+    parser.add_argument('--model-error-rate', type=float, default=0.0)
+    parser.add_argument('--http-latency', type=float, default=0.05)
+    parser.add_argument('--http-jitter', type=float, default=0.02)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    parser.add_argument('--discord-latency', type=float, default=0.02)
+    parser.add_argument('--reply-chars', type=int, default=1500)
+    parser.add_argument('--rpm', type=float, default=60000, help='batas RPM per model, 0 = pakai konfigurasi bot')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--lag-interval', type=float, default=0.01)
+    parser.add_argument('--tracemalloc', action='store_true', help='ukur puncak alokasi Python (memperlambat)')
+    parser.add_argument('--stream', choices=('0', '1'), help='paksa STREAM_RESPONSES')
+    parser.add_argument('--json', action='store_true', help='cetak laporan sebagai JSON')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    os.environ.setdefault('CONVERSATION_DB', '')
+    os.environ.setdefault('IMAGE_SPILL_DIR', tempfile.mkdtemp(prefix='loadtest-images-'))
+    os.environ['METRICS_PORT'] = '0'
+    if args.stream:
+        os.environ['STREAM_RESPONSES'] = args.stream
+
+    import main as bot
+
+    report = asyncio.run(run(args, bot))
+    bot.image_history.close()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
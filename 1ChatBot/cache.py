@@ -0,0 +1,194 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TTLCache:
+    def __init__(self, maxsize=256, ttl=3600, max_weight=None, path=None, table='cache'):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weight = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.table = table
+        self.path = path
+        self.db = None
+        self.executor = None
+
+        if path:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'cache-{table}')
+            self._write(self._open)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        entry = self.entries.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        return self._hit(key, entry, default)
+
+    async def get_async(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None and self.executor is not None:
+            row = await asyncio.get_event_loop().run_in_executor(self.executor, self._select, key)
+            entry = self.entries.get(key)
+            if entry is None and row is not None:
+                entry = self._insert(key, row)
+                if key not in self.entries:
+                    self.hits += 1
+                    return entry[0]
+        if entry is None:
+            self.misses += 1
+            return default
+        return self._hit(key, entry, default)
+
+    def set(self, key, value, ttl=None, weight=0):
+        if key in self.entries:
+            self._remove(key)
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self.entries[key] = (value, time.monotonic() + ttl, weight)
+        self.weight += weight
+        self._evict()
+        if key in self.entries and self.executor is not None:
+            self._write(self._upsert, key, json.dumps(value), weight, time.time() + ttl)
+
+    def pop(self, key, default=None):
+        self._write(self._delete, [key])
+        if key not in self.entries:
+            return default
+        return self._remove(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.weight = 0
+        self._write(self._delete_all)
+
+    def close(self):
+        if self.executor is not None:
+            self._write(self._close)
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def _hit(self, key, entry, default):
+        if entry[1] <= time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _insert(self, key, row):
+        value, weight, expires_at = row
+        entry = (value, time.monotonic() + expires_at - time.time(), weight)
+        self.entries[key] = entry
+        self.weight += weight
+        self._evict()
+        return entry
+
+    def _remove(self, key):
+        value, _, weight = self.entries.pop(key)
+        self.weight -= weight
+        return value
+
+    def _discard(self, key):
+        self._write(self._delete, [key])
+        return self._remove(key)
+
+    def _evict(self):
+        now = time.monotonic()
+        evicted = []
+        while self.entries and (
+            len(self.entries) > self.maxsize
+            or (self.max_weight is not None and self.weight > self.max_weight)
+        ):
+            key, entry = next(iter(self.entries.items()))
+            self._remove(key)
+            evicted.append(key)
+            if entry[1] <= now:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+        if evicted:
+            self._write(self._delete, evicted)
+
+    def _write(self, func, *args):
+        if self.executor is None:
+            return
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(self._report)
+
+    def _report(self, future):
+        error = future.exception()
+        if error is not None:
+            print(f'Error di cache {self.table}: {error}')
+
+    def _open(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, weight INTEGER NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self.db.execute(f'DELETE FROM {self.table} WHERE expires_at <= ?', (time.time(),))
+        self.db.commit()
+
+    def _close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _select(self, key):
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            f'SELECT value, weight, expires_at FROM {self.table} WHERE key = ? AND expires_at > ?',
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _upsert(self, key, value, weight, expires_at):
+        self.db.execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, weight, expires_at) VALUES (?, ?, ?, ?)',
+            (key, value, weight, expires_at)
+        )
+        self.db.commit()
+
+    def _delete(self, keys):
+        self.db.executemany(f'DELETE FROM {self.table} WHERE key = ?', [(key,) for key in keys])
+        self.db.commit()
+
+    def _delete_all(self):
+        self.db.execute(f'DELETE FROM {self.table}')
+        self.db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'weight': self.weight,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,97 @@
+class TextChunker:
+    def __init__(self, max_length=1900):
+        self.max_length = max_length
+        self.parts = []
+        self.length = 0
+        self.pending = []
+        self.in_code_block = False
+        self.current_language = ''
+
+    def _append(self, line):
+        if self.length:
+            self.parts.append('\n')
+            self.length += 1
+        self.parts.append(line)
+        self.length += len(line)
+
+    def _restart(self, text):
+        self.parts = [text]
+        self.length = len(text)
+
+    def _current(self):
+        return ''.join(self.parts)
+
+    def _process_line(self, line, chunks):
+        max_length = self.max_length
+        trimmed_line = line.strip()
+
+        if trimmed_line.startswith('```'):
+            if not self.in_code_block:
+                self.current_language = trimmed_line.replace('```', '')
+                self.in_code_block = True
+            else:
+                self.in_code_block = False
+            self._append(line)
+            return
+
+        if self.in_code_block:
+            if self.length + len(line) + 1 > max_length:
+                self.parts.append('\n```')
+                chunks.append(self._current().strip())
+                self._restart(f"```{self.current_language}\n{line}")
+            else:
+                self._append(line)
+        elif len(line) > max_length:
+            for i in range(0, len(line), max_length):
+                part = line[i:i + max_length]
+                if self.length + len(part) + 1 > max_length:
+                    chunks.append(self._current().strip())
+                    self._restart(part)
+                else:
+                    self._append(part)
+        elif self.length + len(line) + 1 > max_length:
+            chunks.append(self._current().strip())
+            self._restart(line)
+        else:
+            self._append(line)
+
+    def feed(self, text):
+        chunks = []
+        if '\n' not in text:
+            self.pending.append(text)
+            return chunks
+
+        lines = text.split('\n')
+        self.pending.append(lines[0])
+        lines[0] = ''.join(self.pending)
+        self.pending = [lines.pop()]
+        for line in lines:
+            self._process_line(line, chunks)
+        return chunks
+
+    def preview(self):
+        text = self._current()
+        partial = ''.join(self.pending)
+        if partial:
+            text += ('\n' if text else '') + partial
+        if self.in_code_block and not text.endswith('```'):
+            text += '\n```'
+        return text.strip()[:self.max_length]
+
+    def close(self):
+        chunks = []
+        self._process_line(''.join(self.pending), chunks)
+        self.pending = []
+
+        if self.length:
+            current_chunk = self._current()
+            if self.in_code_block and not current_chunk.endswith('```'):
+                current_chunk += '\n```'
+            chunks.append(current_chunk.strip())
+            self._restart('')
+        return chunks
+
+
+def split_text(text, max_length=1900):
+    chunker = TextChunker(max_length)
+    return chunker.feed(text) + chunker.close()
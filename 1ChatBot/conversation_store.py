@@ -0,0 +1,128 @@
+import json
+import time
+from collections import OrderedDict
+
+from state_backend import MemoryBackend
+
+
+def estimate_tokens(text):
+    return max(1, (len(text) + 3) // 4)
+
+
+class ConversationStore:
+    def __init__(self, backend=None, max_channels=500, idle_ttl=6 * 3600, max_turns=10, token_budget=6000, retention=7 * 24 * 3600,
+                 summary_min_turns=4, summary_min_tokens=None):
+        self.backend = backend or MemoryBackend()
+        self.max_channels = max_channels
+        self.idle_ttl = idle_ttl
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.retention = retention
+        self.summary_min_turns = summary_min_turns
+        self.summary_min_tokens = token_budget // 4 if summary_min_tokens is None else summary_min_tokens
+        self.sessions = OrderedDict()
+        self.summarizing = set()
+        self.dropped_turns = 0
+
+    def __contains__(self, channel_id):
+        return channel_id in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @staticmethod
+    def key(channel_id):
+        return f"session:{channel_id}"
+
+    def evict(self):
+        now = time.monotonic()
+        while self.sessions:
+            channel_id, session = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_channels and now - session['last_used'] < self.idle_ttl:
+                break
+            self.sessions.pop(channel_id)
+
+    async def get(self, channel_id):
+        session = self.sessions.get(channel_id)
+        if session is None:
+            stored = await self.backend.get(self.key(channel_id))
+            session = self.sessions.get(channel_id)
+            if session is None:
+                stored = json.loads(stored) if stored else {}
+                session = {
+                    'turns': stored.get('turns', []),
+                    'pending': stored.get('pending', []),
+                    'summary': stored.get('summary', '')
+                }
+                for turn in session['turns']:
+                    turn.setdefault('tokens', estimate_tokens(turn['user']) + estimate_tokens(turn['model']))
+                self.sessions[channel_id] = session
+        session['last_used'] = time.monotonic()
+        self.sessions.move_to_end(channel_id)
+        self.evict()
+        return session
+
+    async def get_context(self, channel_id):
+        session = await self.get(channel_id)
+        return session['summary'], list(session['turns'])
+
+    async def save(self, channel_id, session):
+        data = json.dumps({
+            'turns': session['turns'],
+            'pending': session['pending'],
+            'summary': session['summary']
+        })
+        await self.backend.set(self.key(channel_id), data, self.retention)
+
+    def trim(self, session):
+        turns = session['turns']
+        total = sum(turn['tokens'] for turn in turns)
+        while len(turns) > 1 and (len(turns) > self.max_turns or total > self.token_budget):
+            turn = turns.pop(0)
+            total -= turn['tokens']
+            session['pending'].append(turn)
+        overflow = len(session['pending']) - self.max_turns * 4
+        if overflow > 0:
+            del session['pending'][:overflow]
+            self.dropped_turns += overflow
+            print(f'Peringatan: {overflow} giliran lama dibuang sebelum sempat diringkas')
+
+    def needs_summary(self, session):
+        pending = session['pending']
+        if not pending:
+            return False
+        return (
+            len(pending) >= self.summary_min_turns
+            or sum(turn['tokens'] for turn in pending) >= self.summary_min_tokens
+        )
+
+    async def append_turn(self, channel_id, user_text, model_text):
+        session = await self.get(channel_id)
+        tokens = estimate_tokens(user_text) + estimate_tokens(model_text)
+        session['turns'].append({'user': user_text, 'model': model_text, 'tokens': tokens})
+        self.trim(session)
+        await self.save(channel_id, session)
+        return self.needs_summary(session)
+
+    async def summarize(self, channel_id, summarizer):
+        if channel_id in self.summarizing:
+            return
+        self.summarizing.add(channel_id)
+        try:
+            session = await self.get(channel_id)
+            pending = list(session['pending'])
+            if not pending:
+                return
+            summary = await summarizer(session['summary'], pending)
+            if summary and self.sessions.get(channel_id) is session:
+                done = {id(turn) for turn in pending}
+                session['summary'] = summary
+                session['pending'] = [turn for turn in session['pending'] if id(turn) not in done]
+                await self.save(channel_id, session)
+        finally:
+            self.summarizing.discard(channel_id)
+
+    async def reset(self, channel_id):
+        session = self.sessions.pop(channel_id, None)
+        deleted = await self.backend.delete(self.key(channel_id))
+        return bool(session and session['turns']) or deleted
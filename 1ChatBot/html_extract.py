@@ -0,0 +1,66 @@
+from html.parser import HTMLParser
+
+CONTENT_TAGS = {'p', 'h1', 'h2', 'h3'}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self, max_chars=5000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.current = []
+        self.current_length = 0
+        self.current_trailing = 0
+        self.in_content = False
+        self.skip_depth = 0
+
+    @property
+    def done(self):
+        return self.length + self.current_length - self.current_trailing >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in CONTENT_TAGS:
+            if self.in_content:
+                self.flush()
+            self.in_content = True
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in CONTENT_TAGS and self.in_content:
+            self.flush()
+            self.in_content = False
+
+    def handle_data(self, data):
+        if self.in_content and not self.skip_depth and not self.done:
+            if not self.current_length:
+                data = data.lstrip()
+            if not data:
+                return
+            self.current.append(data)
+            self.current_length += len(data)
+            kept = len(data.rstrip())
+            self.current_trailing = len(data) - kept if kept else self.current_trailing + len(data)
+
+    def flush(self):
+        text = ''.join(self.current).strip() + '\n'
+        self.current = []
+        self.current_length = 0
+        self.current_trailing = 0
+        if self.length >= self.max_chars:
+            return
+        self.parts.append(text)
+        self.length += len(text)
+
+    def close(self):
+        super().close()
+        if self.in_content:
+            self.flush()
+            self.in_content = False
+
+    def text(self):
+        return ''.join(self.parts)[:self.max_chars]
@@ -0,0 +1,220 @@
+import asyncio
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif')
+)
+
+IMAGE_EXTENSIONS = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp'
+}
+
+PIL_FORMATS = {
+    'image/png': 'PNG',
+    'image/jpeg': 'JPEG',
+    'image/webp': 'WEBP'
+}
+
+
+def detect_mime_type(data, default='image/png'):
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return default
+
+
+def image_filename(name, buffer):
+    position = buffer.tell()
+    header = buffer.read(16)
+    buffer.seek(position)
+    return f"{name}.{IMAGE_EXTENSIONS.get(detect_mime_type(header), 'png')}"
+
+
+def scan_spill_dir(spill_dir):
+    os.makedirs(spill_dir, exist_ok=True)
+    entries = []
+    for name in os.listdir(spill_dir):
+        if name.endswith('.img'):
+            path = os.path.join(spill_dir, name)
+            entries.append((os.path.getmtime(path), name[:-4], path, os.path.getsize(path)))
+    return entries
+
+
+def write_file(path, data):
+    try:
+        with open(path, 'wb') as file:
+            file.write(data)
+    except OSError as error:
+        return error
+    return None
+
+
+def read_file(path):
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def compact_image(data, max_side=0, mime_type=None, quality=85):
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    target_mime = mime_type or detect_mime_type(data)
+    resize = max_side and max(image.size) > max_side
+    if not resize and target_mime == detect_mime_type(data):
+        return data
+
+    if resize:
+        image.thumbnail((max_side, max_side))
+    if target_mime == 'image/jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    output = io.BytesIO()
+    image.save(output, format=PIL_FORMATS.get(target_mime, 'PNG'), quality=quality)
+    compacted = output.getvalue()
+    return compacted if len(compacted) < len(data) or resize else data
+
+
+class ImageStore:
+    def __init__(self, max_bytes=64 * 1024 * 1024, spill_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_dir = spill_dir
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.disk = OrderedDict()
+        self.disk_bytes = 0
+        self.spills = 0
+        self.evictions = 0
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-store')
+        self.indexed = not spill_dir
+
+    def __contains__(self, channel_id):
+        self.index()
+        return channel_id in self.memory or channel_id in self.disk
+
+    def __len__(self):
+        self.index()
+        return len(self.memory) + len(self.disk)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def index(self, entries=None):
+        if self.indexed:
+            return
+        self.indexed = True
+        for _, channel_id, path, size in sorted(scan_spill_dir(self.spill_dir) if entries is None else entries):
+            if channel_id not in self.disk and channel_id not in self.memory:
+                self.disk[channel_id] = (path, size)
+                self.disk_bytes += size
+        self._evict_disk()
+
+    async def index_async(self):
+        if not self.indexed:
+            self.index(await self.run(scan_spill_dir, self.spill_dir))
+
+    async def put(self, channel_id, data):
+        await self.index_async()
+        self.pop(channel_id)
+        self.memory[channel_id] = data
+        self.memory_bytes += len(data)
+        writes = []
+        while self.memory_bytes > self.max_bytes and len(self.memory) > 1:
+            old_channel_id, old_data = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old_data)
+            path = self._spill(old_channel_id, old_data)
+            if path:
+                writes.append((old_channel_id, path, self.run(write_file, path, old_data)))
+        for old_channel_id, path, write in writes:
+            error = await write
+            if error is not None:
+                print(f'Error di ImageStore: {error}')
+                self.evictions += 1
+                if self.disk.get(old_channel_id, (None,))[0] == path:
+                    self.disk_bytes -= self.disk.pop(old_channel_id)[1]
+
+    async def get(self, channel_id):
+        await self.index_async()
+        data = self.memory.get(channel_id)
+        if data is not None:
+            self.memory.move_to_end(channel_id)
+            return data
+
+        entry = self.disk.get(channel_id)
+        if entry is None:
+            return None
+        data = await self.run(read_file, entry[0])
+        if data is None:
+            if self.disk.get(channel_id) == entry:
+                self._remove_disk(channel_id)
+            return None
+        await self.put(channel_id, data)
+        return data
+
+    def pop(self, channel_id):
+        self.index()
+        found = False
+        data = self.memory.pop(channel_id, None)
+        if data is not None:
+            self.memory_bytes -= len(data)
+            found = True
+        if channel_id in self.disk:
+            self._remove_disk(channel_id)
+            found = True
+        return found
+
+    def _spill(self, channel_id, data):
+        if not self.spill_dir or len(data) > self.max_disk_bytes:
+            self.evictions += 1
+            return None
+        path = os.path.join(self.spill_dir, f"{channel_id}.img")
+        self.disk[channel_id] = (path, len(data))
+        self.disk_bytes += len(data)
+        self.spills += 1
+        self._evict_disk()
+        return path
+
+    def _remove_disk(self, channel_id):
+        path, size = self.disk.pop(channel_id)
+        self.disk_bytes -= size
+        self.executor.submit(remove_file, path)
+
+    def _evict_disk(self):
+        while self.disk and self.disk_bytes > self.max_disk_bytes:
+            self._remove_disk(next(iter(self.disk)))
+            self.evictions += 1
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory_bytes,
+            'disk_entries': len(self.disk),
+            'disk_bytes': self.disk_bytes,
+            'spills': self.spills,
+            'evictions': self.evictions
+        }
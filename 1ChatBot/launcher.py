@@ -0,0 +1,47 @@
+import os
+import signal
+import subprocess
+import sys
+
+from dotenv import load_dotenv
+
+
+def shard_groups(shard_count, processes):
+    return [list(range(index, shard_count, processes)) for index in range(processes)]
+
+
+def main():
+    load_dotenv()
+    shard_count = int(os.getenv('SHARD_COUNT', '1'))
+    processes = max(1, min(int(os.getenv('SHARD_PROCESSES', '1')), shard_count))
+    metrics_port = int(os.getenv('METRICS_PORT', '0'))
+
+    if processes > 1 and os.getenv('STATE_BACKEND', '').startswith('memory'):
+        print('Peringatan: STATE_BACKEND memory tidak dibagi antar proses, gunakan sqlite:/// atau redis://')
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    children = []
+    for index, shard_ids in enumerate(shard_groups(shard_count, processes)):
+        env = dict(os.environ, SHARD_COUNT=str(shard_count), SHARD_IDS=','.join(map(str, shard_ids)))
+        if metrics_port:
+            env['METRICS_PORT'] = str(metrics_port + index)
+        print(f'Menjalankan proses {index} untuk shard {shard_ids}')
+        children.append(subprocess.Popen([sys.executable, script], env=env))
+
+    def stop(signum, frame):
+        for child in children:
+            if child.poll() is None:
+                child.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    exit_code = 0
+    for child in children:
+        exit_code = child.wait() or exit_code
+        stop(None, None)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
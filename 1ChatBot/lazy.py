@@ -0,0 +1,28 @@
+import importlib
+import threading
+
+
+class LazyObject:
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_value', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def load(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    object.__setattr__(self, '_value', self._factory())
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+class LazyModule(LazyObject):
+    def __init__(self, name):
+        super().__init__(lambda: importlib.import_module(name))
@@ -1,20 +1,45 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import os
-import base64
+import sys
 import asyncio
 import io
+import re
+import hashlib
+import codecs
+import tempfile
+try:
+    import resource
+except ImportError:
+    resource = None
 from dotenv import load_dotenv
-from discord import Client, Intents, Interaction, File, app_commands, Attachment
+import aiohttp
+from discord import Client, Intents, Interaction, File, app_commands, Attachment, utils
 from discord.ext import commands
-import google.genai as genai
-import google.genai.types as types
-import requests
-from bs4 import BeautifulSoup
 import pathlib
-from PIL import Image
+from lazy import LazyModule, LazyObject
+from conversation_store import ConversationStore
+from cache import TTLCache
+from html_extract import TextExtractor
+from chunker import TextChunker, split_text
+from send_queue import ChannelSender
+from image_store import ImageStore, compact_image, detect_mime_type, image_filename
+from translator import BatchTranslator
+from router import CommandRouter
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+from model_client import ModelClient
+from metrics import Metrics
+from state_backend import create_backend
+from scheduler import GeminiScheduler, PRIORITY_CHAT, PRIORITY_THINK, PRIORITY_IMAGE, PRIORITY_BACKGROUND
 
 load_dotenv()
 
-client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
+genai = LazyModule('google.genai')
+types = LazyModule('google.genai.types')
+client = LazyObject(lambda: genai.Client(api_key=os.getenv('GEMINI_API_KEY')))
+PREWARM = os.getenv('PREWARM', '1') == '1'
+startup_times = {}
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GOOGLE_CSE_ID = os.getenv('GOOGLE_CSE_ID')
 
@@ -28,13 +53,134 @@ Jawab dengan bahasa Indonesia. Pastikan output rapi dan mudah dibaca di Discord
 - Batasi pesan agar tidak melebihi 2000 karakter.
 """
 
-conversation_history = {}
-image_history = {}
-command_cooldowns = {}
-channel_activity = {}
 MAX_HISTORY = 10
 COOLDOWN_TIME = 30000
 
+CONVERSATION_DB = os.getenv('CONVERSATION_DB', 'conversations.sqlite3')
+STATE_BACKEND = os.getenv('STATE_BACKEND') or (f"sqlite:///{CONVERSATION_DB}" if CONVERSATION_DB else 'memory')
+state = create_backend(STATE_BACKEND)
+MAX_CHANNELS = int(os.getenv('MAX_CHANNELS', '500'))
+SESSION_IDLE_TTL = float(os.getenv('SESSION_IDLE_TTL', str(6 * 3600)))
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '6000'))
+SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '600'))
+SUMMARY_MIN_TURNS = int(os.getenv('SUMMARY_MIN_TURNS', '4'))
+SUMMARY_MIN_TOKENS = int(os.getenv('SUMMARY_MIN_TOKENS', str(CONTEXT_TOKEN_BUDGET // 4)))
+conversation_history = ConversationStore(
+    state, MAX_CHANNELS, SESSION_IDLE_TTL, MAX_HISTORY, CONTEXT_TOKEN_BUDGET,
+    summary_min_turns=SUMMARY_MIN_TURNS, summary_min_tokens=SUMMARY_MIN_TOKENS
+)
+live_chats = TTLCache(MAX_CHANNELS, SESSION_IDLE_TTL)
+LIVE_EXTRA_TURNS = int(os.getenv('LIVE_EXTRA_TURNS', '1'))
+ACTIVE_CACHE_TTL = float(os.getenv('ACTIVE_CACHE_TTL', '5'))
+active_cache = TTLCache(int(os.getenv('ACTIVE_CACHE_SIZE', '10000')), ACTIVE_CACHE_TTL)
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0'))
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
+background_tasks = set()
+
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '20'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '100'))
+HTTP_POOL_PER_HOST = int(os.getenv('HTTP_POOL_PER_HOST', '10'))
+HTTP_KEEPALIVE = float(os.getenv('HTTP_KEEPALIVE', '30'))
+SCRAPE_TIMEOUT = float(os.getenv('SCRAPE_TIMEOUT', '10'))
+SCRAPE_MAX_BYTES = int(os.getenv('SCRAPE_MAX_BYTES', str(2 * 1024 * 1024)))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+MAX_ATTACHMENT_BYTES = int(os.getenv('MAX_ATTACHMENT_BYTES', str(20 * 1024 * 1024)))
+MEDIA_SPOOL_THRESHOLD = int(os.getenv('MEDIA_SPOOL_THRESHOLD', str(4 * 1024 * 1024)))
+FILE_ACTIVE_TIMEOUT = float(os.getenv('FILE_ACTIVE_TIMEOUT', '60'))
+
+UPLOAD_CACHE_MAX_FILES = int(os.getenv('UPLOAD_CACHE_MAX_FILES', '200'))
+UPLOAD_CACHE_MAX_BYTES = int(os.getenv('UPLOAD_CACHE_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))
+UPLOAD_DEFAULT_TTL = 47 * 3600
+UPLOAD_EXPIRY_MARGIN = 600
+upload_cache = TTLCache(UPLOAD_CACHE_MAX_FILES, UPLOAD_DEFAULT_TTL, UPLOAD_CACHE_MAX_BYTES)
+
+SEARCH_URL = os.getenv('SEARCH_URL', 'https://www.googleapis.com/customsearch/v1')
+SEARCH_CACHE_DB = os.getenv('SEARCH_CACHE_DB') or None
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '900'))
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '500'))
+PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_TTL', str(24 * 3600)))
+PAGE_FRESH_TTL = float(os.getenv('PAGE_FRESH_TTL', '3600'))
+PAGE_CACHE_SIZE = int(os.getenv('PAGE_CACHE_SIZE', '1000'))
+PAGE_CACHE_MAX_CHARS = int(os.getenv('PAGE_CACHE_MAX_CHARS', str(5 * 1024 * 1024)))
+SEARCH_FETCH_TOP_K = int(os.getenv('SEARCH_FETCH_TOP_K', '3'))
+SEARCH_FETCH_DEADLINE = float(os.getenv('SEARCH_FETCH_DEADLINE', '6'))
+SEARCH_CONTENT_BUDGET = 5000
+search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, path=SEARCH_CACHE_DB, table='search_results')
+page_cache = TTLCache(PAGE_CACHE_SIZE, PAGE_CACHE_TTL, PAGE_CACHE_MAX_CHARS, path=SEARCH_CACHE_DB, table='page_contents')
+
+TRANSLATE_URL = os.getenv('TRANSLATE_URL', 'https://translation.googleapis.com/language/translate/v2')
+TRANSLATE_BATCH_WINDOW = float(os.getenv('TRANSLATE_BATCH_WINDOW', '0.01'))
+TRANSLATE_BATCH_SIZE = int(os.getenv('TRANSLATE_BATCH_SIZE', '128'))
+TRANSLATE_CACHE_SIZE = int(os.getenv('TRANSLATE_CACHE_SIZE', '2000'))
+TRANSLATE_CACHE_TTL = float(os.getenv('TRANSLATE_CACHE_TTL', str(7 * 24 * 3600)))
+translation_cache = TTLCache(TRANSLATE_CACHE_SIZE, TRANSLATE_CACHE_TTL, path=SEARCH_CACHE_DB, table='translations')
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', '0.5'))
+metrics = Metrics()
+
+STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '1') == '1'
+STREAM_EDIT_INTERVAL = float(os.getenv('STREAM_EDIT_INTERVAL', '1.2'))
+
+SEND_BURST = int(os.getenv('SEND_BURST', '5'))
+SEND_BURST_WINDOW = float(os.getenv('SEND_BURST_WINDOW', '5'))
+SEND_CONCURRENCY = int(os.getenv('SEND_CONCURRENCY', '10'))
+outbound = ChannelSender(2000, SEND_BURST, SEND_BURST_WINDOW, SEND_CONCURRENCY, metrics)
+
+def parse_model_limits(value):
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            model, rpm = item.split('=', 1)
+            limits[model.strip()] = float(rpm)
+    return limits
+
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '8'))
+GEMINI_MODEL_RPM = parse_model_limits(os.getenv(
+    'GEMINI_MODEL_RPM',
+    'gemini-2.0-flash=15,gemini-2.0-flash-thinking-exp=10,gemini-2.0-flash-exp=10'
+))
+GEMINI_DEFAULT_RPM = float(os.getenv('GEMINI_DEFAULT_RPM', '15'))
+GEMINI_USER_SHARE = int(os.getenv('GEMINI_USER_SHARE', '2'))
+GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '30'))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '3'))
+IMAGE_STORE_MAX_BYTES = int(os.getenv('IMAGE_STORE_MAX_BYTES', str(64 * 1024 * 1024)))
+IMAGE_SPILL_DIR = os.getenv('IMAGE_SPILL_DIR', 'image_cache')
+if IMAGE_SPILL_DIR and SHARD_IDS is not None:
+    IMAGE_SPILL_DIR = os.path.join(IMAGE_SPILL_DIR, 'shards-' + '-'.join(map(str, SHARD_IDS)))
+IMAGE_SPILL_MAX_BYTES = int(os.getenv('IMAGE_SPILL_MAX_BYTES', str(512 * 1024 * 1024)))
+IMAGE_STORE_FORMAT = os.getenv('IMAGE_STORE_FORMAT', '')
+IMAGE_EDIT_MAX_SIDE = int(os.getenv('IMAGE_EDIT_MAX_SIDE', '0'))
+image_history = ImageStore(IMAGE_STORE_MAX_BYTES, IMAGE_SPILL_DIR or None, IMAGE_SPILL_MAX_BYTES)
+
+ENRICH_CACHE_SIZE = int(os.getenv('ENRICH_CACHE_SIZE', '500'))
+ENRICH_CACHE_TTL = float(os.getenv('ENRICH_CACHE_TTL', str(24 * 3600)))
+IMAGE_SPECULATION = os.getenv('IMAGE_SPECULATION', '')
+ENRICH_BUDGET = float(os.getenv('ENRICH_BUDGET', '2'))
+enrichment_cache = TTLCache(ENRICH_CACHE_SIZE, ENRICH_CACHE_TTL)
+enrichment_tasks = {}
+
+COALESCE_WINDOW = float(os.getenv('COALESCE_WINDOW', '1.5'))
+CHANNEL_MAX_INFLIGHT = int(os.getenv('CHANNEL_MAX_INFLIGHT', '1'))
+channel_batches = {}
+coalesce_stats = {'messages': 0, 'turns': 0, 'superseded': 0}
+
+gemini_scheduler = GeminiScheduler(
+    GEMINI_CONCURRENCY,
+    GEMINI_MODEL_RPM,
+    GEMINI_DEFAULT_RPM,
+    GEMINI_USER_SHARE,
+    GEMINI_QUEUE_TIMEOUT,
+    GEMINI_MAX_RETRIES
+)
+
+MODEL_DEADLINE = float(os.getenv('MODEL_DEADLINE', '90'))
+MODEL_HEDGE_AFTER = float(os.getenv('MODEL_HEDGE_AFTER', '0'))
+model_client = ModelClient(client, metrics, MODEL_DEADLINE, MODEL_HEDGE_AFTER, gemini_scheduler.charge)
+
 SUPPORTED_MIME_TYPES = {
     'image/jpeg': 'image',
     'image/png': 'image',
@@ -48,181 +194,793 @@ SUPPORTED_MIME_TYPES = {
     'image/jpg': 'image'
 }
 
-async def fetch_web_content(url):
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; DiscordBot/1.0)'}
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(url, headers=headers))
+http_session = None
+
+def get_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE
+        )
+        http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        )
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+def http_timeout(total):
+    return aiohttp.ClientTimeout(total=total, connect=min(total, HTTP_CONNECT_TIMEOUT))
+
+@metrics.timed('download')
+async def stream_download(url, write, max_bytes=None, timeout=HTTP_TIMEOUT):
+    async with get_http_session().get(url, timeout=http_timeout(timeout)) as response:
         response.raise_for_status()
-        html = response.text
-        
-        def parse_html():
-            soup = BeautifulSoup(html, 'html.parser')
-            content = ""
-            for elem in soup.select('p, h1, h2, h3'):
-                content += elem.get_text().strip() + '\n'
-            return content[:5000]
-            
-        content = await loop.run_in_executor(None, parse_html)
-        return content
-    except Exception as error:
-        print(f'Error di fetchWebContent: {error}')
-        return f"**Error Scraping**\nGagal mengambil konten dari {url}."
+        if max_bytes and (response.content_length or 0) > max_bytes:
+            raise ValueError(f'Ukuran unduhan melebihi {max_bytes} byte')
+        received = 0
+        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                raise ValueError(f'Ukuran unduhan melebihi {max_bytes} byte')
+            write(chunk)
+        return received
+
+async def download_bytes(url, timeout=HTTP_TIMEOUT, max_bytes=None):
+    chunks = []
+    await stream_download(url, chunks.append, max_bytes, timeout)
+    return b''.join(chunks)
+
+async def download_media(attachment):
+    mime_type = attachment.content_type
+    if attachment.size <= MEDIA_SPOOL_THRESHOLD:
+        data = await download_bytes(attachment.url, max_bytes=MAX_ATTACHMENT_BYTES)
+        return {'mime_type': mime_type, 'data': data, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+    spool = tempfile.TemporaryFile()
+    digest = hashlib.sha256()
+
+    def write(chunk):
+        digest.update(chunk)
+        spool.write(chunk)
+
+    try:
+        size = await stream_download(attachment.url, write, MAX_ATTACHMENT_BYTES)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    return {'mime_type': mime_type, 'file': spool, 'size': size, 'sha256': digest.hexdigest()}
+
+def close_media(media_data):
+    if media_data and 'file' in media_data:
+        media_data['file'].close()
+
+RESPONSE_ERROR_TEXT = "**Error**\nTerjadi kesalahan saat menghasilkan respons. Silakan coba lagi."
+
+async def reject_large_attachment(message, attachment, use_english=False):
+    if attachment.size <= MAX_ATTACHMENT_BYTES:
+        return False
+    limit_mb = MAX_ATTACHMENT_BYTES // (1024 * 1024)
+    if use_english:
+        await message.reply(f'**Error**\nThe file exceeds the {limit_mb} MB limit.')
+    else:
+        await message.reply(f'**Error**\nUkuran file melebihi batas {limit_mb} MB.')
+    return True
+
+async def download_attachment(message, download, error_text=RESPONSE_ERROR_TEXT):
+    try:
+        return await download()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+        metrics.inc('stage_errors_total', stage='download_attachment')
+        print(f'Error di downloadAttachment: {error}')
+        await message.reply(error_text)
+        return None
+
+def get_decoder(charset):
+    try:
+        return codecs.getincrementaldecoder(charset or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+async def extract_text(response):
+    extractor = TextExtractor(SEARCH_CONTENT_BUDGET)
+    decoder = get_decoder(response.charset)
+    received = 0
+    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+        received += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or received >= SCRAPE_MAX_BYTES:
+            break
+    else:
+        extractor.feed(decoder.decode(b'', final=True))
+    extractor.close()
+    return extractor.text()
+
+async def scrape_page(url):
+    cached = await page_cache.get_async(url)
+    if cached and time.time() - cached['fetched_at'] < PAGE_FRESH_TTL:
+        return cached['content']
+
+    headers = {'User-Agent': 'Mozilla/5.0 (compatible; DiscordBot/1.0)'}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+
+    session = get_http_session()
+    with metrics.span('scrape'):
+        async with session.get(url, headers=headers, timeout=http_timeout(SCRAPE_TIMEOUT)) as response:
+            if cached and response.status == 304:
+                cached['fetched_at'] = time.time()
+                page_cache.set(url, cached, weight=len(cached['content']))
+                return cached['content']
+            response.raise_for_status()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            content = await extract_text(response)
+    
+    page_cache.set(url, {
+        'content': content,
+        'etag': etag,
+        'last_modified': last_modified,
+        'fetched_at': time.time()
+    }, weight=len(content))
+    return content
+
+async def request_translations(texts, target_language):
+    payload = {
+        'q': texts,
+        'target': target_language,
+        'format': 'text'
+    }
+
+    session = get_http_session()
+    with metrics.span('translate'):
+        async with session.post(TRANSLATE_URL, params={'key': GOOGLE_API_KEY}, json=payload) as response:
+            response.raise_for_status()
+            result = await response.json()
+
+    return [translation['translatedText'] for translation in result['data']['translations']]
+
+translator = BatchTranslator(request_translations, translation_cache, TRANSLATE_BATCH_WINDOW, TRANSLATE_BATCH_SIZE)
 
 async def translate_text(text, target_language='en'):
     try:
-        url = f"https://translation.googleapis.com/language/translate/v2?key={GOOGLE_API_KEY}"
-        payload = {
-            'q': text,
-            'target': target_language,
-            'format': 'text'
-        }
-        
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None, 
-            lambda: requests.post(url, json=payload)
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        translated_text = result['data']['translations'][0]['translatedText']
-        return translated_text
+        return await translator.translate(text, target_language)
     except Exception as error:
         print(f'Error di translateText: {error}')
         return text
 
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+async def search_items(query):
+    cache_key = normalize_query(query)
+    items = await search_cache.get_async(cache_key)
+    if items is not None:
+        return items
+
+    params = {
+        'key': GOOGLE_API_KEY,
+        'cx': GOOGLE_CSE_ID,
+        'q': query,
+        'num': 5,
+        'lr': 'lang_id',
+        'gl': 'id'
+    }
+    session = get_http_session()
+    with metrics.span('search'):
+        async with session.get(SEARCH_URL, params=params) as response:
+            response.raise_for_status()
+            data = await response.json()
+
+    items = [
+        {'title': item.get('title', ''), 'snippet': item.get('snippet', ''), 'link': item['link']}
+        for item in data.get('items', [])
+    ]
+    search_cache.set(cache_key, items)
+    return items
+
+def share_budget(contents, budget):
+    shares = {}
+    remaining = budget
+    ordered = sorted(range(len(contents)), key=lambda index: len(contents[index]))
+    for position, index in enumerate(ordered):
+        share = min(len(contents[index]), remaining // (len(ordered) - position))
+        shares[index] = share
+        remaining -= share
+    return [contents[index][:shares[index]] for index in range(len(contents))]
+
+async def fetch_search_contents(items):
+    urls = [item['link'] for item in items[:SEARCH_FETCH_TOP_K]]
+    fetched = []
+    tasks = [asyncio.create_task(scrape_page(url)) for url in urls]
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=SEARCH_FETCH_DEADLINE)
+        for task in pending:
+            task.cancel()
+
+    for url, task in zip(urls, tasks):
+        if task not in done:
+            print(f'Error di fetchSearchContents: batas waktu habis untuk {url}')
+        elif task.exception() is not None:
+            print(f'Error di fetchSearchContents: {task.exception()}')
+        elif task.result().strip():
+            fetched.append((url, task.result()))
+
+    if not fetched:
+        return "**Konten Web**\nTidak ada konten yang berhasil diambil dalam batas waktu.\n"
+
+    contents = share_budget([content for _, content in fetched], SEARCH_CONTENT_BUDGET)
+    return ''.join(
+        f"**Konten dari {url}**\n{content}\n\n"
+        for (url, _), content in zip(fetched, contents)
+    )
+
+@metrics.timed('google_search')
 async def google_search(query):
     try:
-        url = f"https://www.googleapis.com/customsearch/v1?key={GOOGLE_API_KEY}&cx={GOOGLE_CSE_ID}&q={query}&num=5&lr=lang_id&gl=id"
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(url))
-        response.raise_for_status()
-        
-        data = response.json()
-        if not data.get('items'):
+        items = await search_items(query)
+        if not items:
             return "**Hasil Pencarian**\nMaaf, tidak ada hasil yang ditemukan untuk pencarian ini."
 
-        first_url = data['items'][0]['link']
-        web_content = await fetch_web_content(first_url)
+        web_contents = await fetch_search_contents(items)
 
         search_results = "**Hasil Pencarian dari Google**\n\n"
-        for index, item in enumerate(data['items']):
+        for index, item in enumerate(items):
             search_results += f"- **{index + 1}. {item['title']}**\n"
             search_results += f"  {item['snippet']}\n"
             search_results += f"  Sumber: [Klik di sini]({item['link']})\n\n"
 
-        search_results += f"**Konten dari {first_url}**\n{web_content}\n"
+        search_results += web_contents
         return search_results
     except Exception as error:
+        metrics.inc('stage_errors_total', stage='google_search')
         print(f'Error di googleSearch: {error}')
         return "**Error**\nTerjadi kesalahan saat melakukan pencarian Google."
 
+YOUTUBE_PATTERN = re.compile(r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[^\s]+')
+
 def extract_youtube_url(text):
-    import re
-    youtube_pattern = r'(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[^\s]+)'
-    match = re.search(youtube_pattern, text)
+    if 'http' not in text:
+        return None
+    match = YOUTUBE_PATTERN.search(text)
     return match.group(0) if match else None
 
-async def generate_response(channel_id, prompt, media_data=None, search_query=None, use_thinking=False, youtube_url=None):
-    try:
-        model_name = "gemini-2.0-flash-thinking-exp" if use_thinking else "gemini-2.0-flash"
-        
-        if channel_id not in conversation_history:
-            conversation_history[channel_id] = client.chats.create(
-                model=model_name,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    temperature=0.9,
-                    max_output_tokens=4000
-                )
+async def submit_gemini(call, model, priority=PRIORITY_CHAT, user_id=None):
+    with metrics.span('gemini', model=model):
+        return await gemini_scheduler.submit(call, model, priority, user_id)
+
+def chat_model(use_thinking=False):
+    return "gemini-2.0-flash-thinking-exp" if use_thinking else "gemini-2.0-flash"
+
+def chat_turns(history):
+    turns = []
+    for content in history:
+        if content.role == 'user' or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+def live_history(chat, turns):
+    groups = chat_turns(chat.get_history(curated=True))
+    if len(groups) < len(turns):
+        return None
+    groups = groups[len(groups) - len(turns):]
+    for group, turn in zip(groups, turns):
+        parts = group[0].parts or []
+        if group[0].role != 'user' or not parts or parts[0].text != turn['user']:
+            return None
+    return [content for group in groups for content in group]
+
+def strip_turn_extras(history, turns, keep_turns):
+    groups = chat_turns(history)
+    stripped = False
+    for index in range(len(groups) - keep_turns):
+        if len(groups[index][0].parts or []) > 1:
+            groups[index][0] = types.Content(role='user', parts=[types.Part(text=turns[index]['user'])])
+            stripped = True
+    return [content for group in groups for content in group], stripped
+
+async def get_chat(channel_id, use_thinking=False):
+    model_name = chat_model(use_thinking)
+    
+    summary, turns = await conversation_history.get_context(channel_id)
+    live = live_chats.get(channel_id)
+    history = None
+    if live is not None:
+        chat, live_model, live_summary = live
+        history = live_history(chat, turns)
+        if history is not None:
+            history, stripped = strip_turn_extras(history, turns, LIVE_EXTRA_TURNS)
+            if not stripped and live_model == model_name and live_summary == summary and len(history) == len(chat.get_history(curated=True)):
+                return chat
+
+    instruction = system_prompt
+    if summary:
+        instruction += f"\nRingkasan percakapan sebelumnya di channel ini:\n{summary}\n"
+    
+    if history is None:
+        history = []
+        for turn in turns:
+            history.append(types.Content(role='user', parts=[types.Part(text=turn['user'])]))
+            history.append(types.Content(role='model', parts=[types.Part(text=turn['model'])]))
+    
+    chat = client.aio.chats.create(
+        model=model_name,
+        config=types.GenerateContentConfig(
+            system_instruction=instruction,
+            temperature=0.9,
+            max_output_tokens=4000
+        ),
+        history=history
+    )
+    live_chats.set(channel_id, (chat, model_name, summary))
+    return chat
+
+async def summarize_turns(summary, turns):
+    transcript = '\n'.join(f"Pengguna: {turn['user']}\nAsisten: {turn['model']}" for turn in turns)
+    summary_prompt = (
+        "Perbarui ringkasan percakapan berikut secara singkat dalam bahasa Indonesia. "
+        "Pertahankan fakta, nama, keputusan, dan pertanyaan yang belum terjawab.\n\n"
+        f"Ringkasan sebelumnya:\n{summary or '-'}\n\nPercakapan baru:\n{transcript}"
+    )
+    model_name = "gemini-2.0-flash"
+    response = await submit_gemini(
+        lambda: model_client.generate(
+            model_name,
+            summary_prompt,
+            config=types.GenerateContentConfig(
+                temperature=0.3,
+                max_output_tokens=SUMMARY_MAX_TOKENS
             )
-        
-        chat = conversation_history[channel_id]
-        contents = [prompt]
-
-        if search_query:
-            search_results = await google_search(search_query)
-            contents.append(search_results)
-
-        if media_data:
-            if media_data['mime_type'] == 'application/pdf':
-                pdf_buffer = base64.b64decode(media_data['base64'])
-                pdf_file = client.files.upload(file=io.BytesIO(pdf_buffer), config=dict(mime_type='application/pdf'))
-                contents.append(pdf_file)
-            else:
-                contents.append(types.Part.from_bytes(
-                    data=base64.b64decode(media_data['base64']),
-                    mime_type=media_data['mime_type']
-                ))
-
-        if youtube_url:
-            contents.append(types.Part(
-                file_data=types.FileData(file_uri=youtube_url)
+        ),
+        model_name,
+        PRIORITY_BACKGROUND
+    )
+    return (response.text or '').strip()
+
+async def refresh_summary(channel_id):
+    try:
+        await conversation_history.summarize(channel_id, summarize_turns)
+    except Exception as error:
+        print(f'Error di refreshSummary: {error}')
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def record_turn(channel_id, prompt, response_text):
+    if await conversation_history.append_turn(channel_id, prompt, response_text):
+        run_in_background(refresh_summary(channel_id))
+
+async def wait_for_file_active(uploaded_file):
+    deadline = time.monotonic() + FILE_ACTIVE_TIMEOUT
+    while uploaded_file.state == 'PROCESSING' and time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        uploaded_file = await client.aio.files.get(name=uploaded_file.name)
+    return uploaded_file
+
+def upload_ttl(uploaded_file):
+    expiration_time = getattr(uploaded_file, 'expiration_time', None)
+    if expiration_time is None:
+        return UPLOAD_DEFAULT_TTL
+    return expiration_time.timestamp() - time.time() - UPLOAD_EXPIRY_MARGIN
+
+async def upload_media(media_data):
+    mime_type = media_data['mime_type']
+    cache_key = (media_data['sha256'], mime_type)
+    cached_file = upload_cache.get(cache_key)
+    if cached_file is not None:
+        return cached_file
+
+    upload = media_data.get('file') or io.BytesIO(media_data['data'])
+    with metrics.span('upload'):
+        uploaded_file = await client.aio.files.upload(file=upload, config=dict(mime_type=mime_type))
+        uploaded_file = await wait_for_file_active(uploaded_file)
+    if uploaded_file.state == 'ACTIVE':
+        ttl = upload_ttl(uploaded_file)
+        if ttl > 0:
+            upload_cache.set(cache_key, uploaded_file, ttl=ttl, weight=media_data['size'])
+    return uploaded_file
+
+async def build_contents(prompt, media_data=None, search_query=None, youtube_url=None):
+    contents = [prompt]
+
+    if search_query:
+        search_results = await google_search(search_query)
+        contents.append(search_results)
+
+    if media_data:
+        mime_type = media_data['mime_type']
+        if 'file' in media_data or mime_type == 'application/pdf':
+            contents.append(await upload_media(media_data))
+        else:
+            contents.append(types.Part.from_bytes(
+                data=media_data['data'],
+                mime_type=mime_type
             ))
 
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: chat.send_message(contents)
+    if youtube_url:
+        contents.append(types.Part(
+            file_data=types.FileData(file_uri=youtube_url)
+        ))
+
+    return contents
+
+def format_response(response_text):
+    if not any(marker in response_text for marker in ['#', '-', '```']):
+        paragraphs = [p.strip() for p in response_text.split('\n\n')]
+        response_text = '\n\n' + '\n\n'.join(paragraphs)
+    return response_text
+
+def chat_priority(use_thinking=False):
+    return PRIORITY_THINK if use_thinking else PRIORITY_CHAT
+
+@metrics.timed('generate_response')
+async def generate_response(channel_id, prompt, media_data=None, search_query=None, use_thinking=False, youtube_url=None, user_id=None, reply_state=None):
+    try:
+        chat = await get_chat(channel_id, use_thinking)
+        contents = await build_contents(prompt, media_data, search_query, youtube_url)
+        if reply_state is not None:
+            reply_state['submitted'] = True
+        response = await submit_gemini(
+            lambda: model_client.call(chat_model(use_thinking), lambda: chat.send_message(contents)),
+            chat_model(use_thinking),
+            chat_priority(use_thinking),
+            user_id
         )
-        
-        response_text = response.text
-        if not any(marker in response_text for marker in ['#', '-', '```']):
-            paragraphs = [p.strip() for p in response_text.split('\n\n')]
-            response_text = '\n\n' + '\n\n'.join(paragraphs)
-        
-        return response_text
+        await record_turn(channel_id, prompt, response.text)
+        return format_response(response.text)
     except Exception as error:
+        metrics.inc('stage_errors_total', stage='generate_response')
         print(f'Error di generateResponse: {error}')
-        return "**Error**\nTerjadi kesalahan saat menghasilkan respons. Silakan coba lagi."
+        return RESPONSE_ERROR_TEXT
+
+@metrics.timed('stream_response')
+async def stream_response(channel, channel_id, prompt, media_data=None, search_query=None, use_thinking=False, youtube_url=None, user_id=None, reply_state=None):
+    started = time.perf_counter()
+    messages = []
+    sent_chunks = []
+
+    async def sync(chunks):
+        chunks = [chunk for chunk in chunks if chunk]
+        for index, chunk in enumerate(chunks):
+            if index < len(messages):
+                if sent_chunks[index] != chunk:
+                    await outbound.acquire(channel.id)
+                    with metrics.span('discord_edit'):
+                        await messages[index].edit(content=chunk)
+                    sent_chunks[index] = chunk
+            else:
+                await outbound.acquire(channel.id)
+                if not messages:
+                    if reply_state is not None:
+                        reply_state['replying'] = True
+                    metrics.observe('first_chunk_seconds', time.perf_counter() - started)
+                with metrics.span('discord_send'):
+                    messages.append(await channel.send(chunk))
+                sent_chunks.append(chunk)
+        while len(messages) > len(chunks):
+            await outbound.acquire(channel.id)
+            with metrics.span('discord_edit'):
+                await messages.pop().delete()
+            sent_chunks.pop()
+
+    try:
+        chat = await get_chat(channel_id, use_thinking)
+        contents = await build_contents(prompt, media_data, search_query, youtube_url)
+        loop = asyncio.get_event_loop()
+        chunker = TextChunker()
+        completed = []
+        response_parts = []
+        last_sync = 0.0
+        chunks = asyncio.Queue()
+        if reply_state is not None:
+            reply_state['submitted'] = True
+        job = asyncio.create_task(submit_gemini(
+            lambda: model_client.stream(chat_model(use_thinking), lambda: chat.send_message_stream(contents), chunks.put_nowait),
+            chat_model(use_thinking),
+            chat_priority(use_thinking),
+            user_id
+        ))
+        job.add_done_callback(lambda _: chunks.put_nowait(None))
+        try:
+            while True:
+                response = await chunks.get()
+                if response is None:
+                    break
+                if not response.text:
+                    continue
+                response_parts.append(response.text)
+                completed.extend(chunker.feed(response.text))
+                if not messages or loop.time() - last_sync >= STREAM_EDIT_INTERVAL:
+                    await sync(completed + [chunker.preview()])
+                    last_sync = loop.time()
+            await job
+        finally:
+            job.cancel()
+        if not response_parts:
+            raise ValueError('Stream Gemini tidak menghasilkan teks')
+        response_text = ''.join(response_parts)
+        await sync(split_text(format_response(response_text)))
+        await record_turn(channel_id, prompt, response_text)
+    except Exception as error:
+        metrics.inc('stage_errors_total', stage='stream_response')
+        print(f'Error di streamResponse: {error}')
+        await channel.send(RESPONSE_ERROR_TEXT)
+
+async def send_ai_response(channel, channel_id, prompt, media_data=None, search_query=None, use_thinking=False, youtube_url=None, user_id=None, reply_state=None):
+    if STREAM_RESPONSES:
+        await stream_response(channel, channel_id, prompt, media_data, search_query, use_thinking, youtube_url, user_id, reply_state)
+        return
+
+    ai_response = await generate_response(channel_id, prompt, media_data, search_query, use_thinking, youtube_url, user_id, reply_state)
+    if reply_state is not None:
+        reply_state['replying'] = True
+    outbound.send(channel, split_text(ai_response))
+
+def merge_channel_messages(messages):
+    authors = {message.author.id for message in messages}
+    if len(authors) == 1:
+        return '\n'.join(message.content.strip() for message in messages)
+    return '\n'.join(f"{message.author.display_name}: {message.content.strip()}" for message in messages)
+
+def get_channel_batch(channel_id):
+    batch = channel_batches.get(channel_id)
+    if batch is None:
+        batch = channel_batches[channel_id] = {
+            'messages': [],
+            'timer': None,
+            'turns': [],
+            'semaphore': asyncio.Semaphore(CHANNEL_MAX_INFLIGHT)
+        }
+    return batch
+
+def queue_channel_message(message):
+    channel_id = str(message.channel.id)
+    batch = get_channel_batch(channel_id)
+    coalesce_stats['messages'] += 1
 
-async def enrich_prompt(prompt, use_english=False):
+    for turn in batch['turns']:
+        if not turn['state'].get('replying') and not turn['task'].done():
+            turn['task'].cancel()
+
+    batch['messages'].append(message)
+    if batch['timer'] is not None:
+        batch['timer'].cancel()
+    batch['timer'] = asyncio.create_task(flush_channel_batch(message.channel, channel_id))
+
+async def flush_channel_batch(channel, channel_id):
+    await asyncio.sleep(COALESCE_WINDOW)
+    batch = channel_batches[channel_id]
+    batch['timer'] = None
+    turn = {'messages': batch['messages'], 'state': {}}
+    batch['messages'] = []
+    turn['task'] = asyncio.create_task(run_channel_turn(channel, channel_id, turn))
+    batch['turns'].append(turn)
+
+async def run_channel_turn(channel, channel_id, turn):
+    batch = channel_batches[channel_id]
+    try:
+        async with batch['semaphore']:
+            messages = turn['messages']
+            prompt = merge_channel_messages(messages)
+            async with channel.typing():
+                await send_ai_response(
+                    channel,
+                    channel_id,
+                    prompt,
+                    youtube_url=extract_youtube_url(prompt),
+                    user_id=str(messages[-1].author.id),
+                    reply_state=turn['state']
+                )
+    except asyncio.CancelledError:
+        coalesce_stats['superseded'] += 1
+        batch['messages'][:0] = turn['messages']
+    finally:
+        if turn['state'].get('submitted'):
+            coalesce_stats['turns'] += 1
+        batch['turns'].remove(turn)
+        if not batch['turns'] and not batch['messages'] and batch['timer'] is None:
+            channel_batches.pop(channel_id, None)
+
+def enrichment_key(prompt, use_english=False):
+    return f"{'en' if use_english else 'id'}:{normalize_query(prompt)}"
+
+async def enrich_prompt(prompt, use_english=False, user_id=None):
+    cache_key = enrichment_key(prompt, use_english)
+    enriched_prompt = enrichment_cache.get(cache_key)
+    if enriched_prompt is not None:
+        return enriched_prompt
+
+    task = enrichment_tasks.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(request_enrichment(cache_key, prompt, use_english, user_id))
+        enrichment_tasks[cache_key] = task
+        task.add_done_callback(lambda _: enrichment_tasks.pop(cache_key, None))
+    return await asyncio.shield(task)
+
+async def request_enrichment(cache_key, prompt, use_english=False, user_id=None):
     try:
         model_name = "gemini-2.0-flash"
         language_instruction = "Jawab dengan bahasa Indonesia." if not use_english else "Answer in English."
         enrichment_prompt = f"{language_instruction} Bagusin promptnya tanpa mengubah intinya, agar generate gambar bisa lebih bagus (mohon langsung jawabannya saja formatnya): {prompt}"
         
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: client.models.generate_content(
-                model=model_name,
-                contents=enrichment_prompt,
+        response = await submit_gemini(
+            lambda: model_client.generate(
+                model_name,
+                enrichment_prompt,
                 config=types.GenerateContentConfig(
                     temperature=0.9,
                     max_output_tokens=200
                 )
-            )
+            ),
+            model_name,
+            PRIORITY_IMAGE,
+            user_id
         )
         
-        enriched_prompt = response.candidates[0].content.parts[0].text
-        return enriched_prompt.strip()
+        enriched_prompt = response.candidates[0].content.parts[0].text.strip()
+        enrichment_cache.set(cache_key, enriched_prompt)
+        return enriched_prompt
     except Exception as error:
         print(f'Error di enrichPrompt: {error}')
         return prompt
 
-async def generate_image(channel_id, prompt, use_english=False):
-    try:
-        enriched_prompt = await enrich_prompt(prompt, use_english)
-        print(f"Enriched Prompt: {enriched_prompt}")
-        
-        model_name = "gemini-2.0-flash-exp"
-        
-        image_prompt = enriched_prompt
-        
+def format_cache_stats(name, cache):
+    stats = cache.stats()
+    return (
+        f"- **{name}**: {stats['hits']} hit / {stats['misses']} miss "
+        f"({stats['hit_rate'] * 100:.0f}%), {stats['size']} entri"
+    )
+
+def cache_report():
+    lines = [
+        "**Statistik Cache**",
+        format_cache_stats("Pencarian Google", search_cache),
+        format_cache_stats("Konten Web", page_cache),
+        format_cache_stats("Upload File", upload_cache),
+        format_cache_stats("Prompt Gambar", enrichment_cache),
+        format_cache_stats("Terjemahan", translation_cache),
+        format_cache_stats("Status Channel", active_cache)
+    ]
+    return '\n'.join(lines)
+
+def queue_report():
+    stats = gemini_scheduler.stats()
+    depth = ', '.join(f"{name}: {count}" for name, count in stats['depth'].items())
+    lines = [
+        "**Statistik Antrian Gemini**",
+        f"- Berjalan: {stats['running']}, antri: {stats['queued']} ({depth})",
+        f"- Waktu tunggu p50/p95/maks: {stats['wait_p50']:.2f}s / {stats['wait_p95']:.2f}s / {stats['wait_max']:.2f}s",
+        f"- Selesai: {stats['completed']}, gagal: {stats['failed']}, kedaluwarsa: {stats['expired']}, retry: {stats['retries']}",
+        f"- Penggabungan pesan: {coalesce_stats['messages']} pesan, {coalesce_stats['turns']} panggilan model, "
+        f"{coalesce_stats['superseded']} dibatalkan, {coalesce_stats['messages'] - coalesce_stats['turns']} panggilan dihemat"
+    ]
+    return '\n'.join(lines)
+
+def collect_runtime_metrics():
+    caches = {
+        'search': search_cache,
+        'page': page_cache,
+        'upload': upload_cache,
+        'enrichment': enrichment_cache,
+        'translation': translation_cache,
+        'active': active_cache
+    }
+    for name, cache in caches.items():
+        stats = cache.stats()
+        yield 'cache_hits_total', 'counter', {'cache': name}, stats['hits']
+        yield 'cache_misses_total', 'counter', {'cache': name}, stats['misses']
+        yield 'cache_evictions_total', 'counter', {'cache': name}, stats['evictions'] + stats['expirations']
+        yield 'cache_entries', 'gauge', {'cache': name}, stats['size']
+        yield 'cache_hit_ratio', 'gauge', {'cache': name}, stats['hit_rate']
+
+    stats = gemini_scheduler.stats()
+    yield 'gemini_running', 'gauge', {}, stats['running']
+    for priority, count in stats['depth'].items():
+        yield 'gemini_queued', 'gauge', {'priority': priority}, count
+    for quantile, key in (('0.5', 'wait_p50'), ('0.95', 'wait_p95'), ('1', 'wait_max')):
+        yield 'gemini_queue_wait_seconds', 'gauge', {'quantile': quantile}, stats[key]
+    for result in ('submitted', 'completed', 'failed', 'expired', 'retries'):
+        yield 'gemini_jobs_total', 'counter', {'result': result}, stats[result]
+
+    yield 'outbound_pending', 'gauge', {}, outbound.pending()
+    yield 'outbound_sent_total', 'counter', {}, outbound.sent
+    yield 'outbound_coalesced_total', 'counter', {}, outbound.coalesced
+    for name, value in coalesce_stats.items():
+        yield 'coalesce_total', 'counter', {'kind': name}, value
+    yield 'conversation_dropped_turns_total', 'counter', {}, conversation_history.dropped_turns
+    for name, value in image_history.stats().items():
+        yield 'image_store', 'gauge', {'kind': name}, value
+    for name, value in translator.stats().items():
+        yield 'translator', 'gauge', {'kind': name}, value
+    model_stats = model_client.stats()
+    for name in ('calls', 'errors', 'hedges', 'hedge_wins'):
+        yield f'model_{name}_total', 'counter', {}, model_stats[name]
+    for name, value in startup_times.items():
+        yield 'startup_seconds', 'gauge', {'phase': name}, value
+    if resource is not None:
+        yield 'process_max_rss_bytes', 'gauge', {}, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+metrics.add_collector(collect_runtime_metrics)
+
+async def monitor_loop_lag():
+    loop = asyncio.get_event_loop()
+    while True:
+        expected = loop.time() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        metrics.observe('event_loop_lag_seconds', max(loop.time() - expected, 0.0))
+
+async def remember_image(channel_id, image_data):
+    if IMAGE_STORE_FORMAT:
         loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: client.models.generate_content(
-                model=model_name,
-                contents=image_prompt,
-                config=types.GenerateContentConfig(
-                    response_modalities=['Text', 'Image'],
-                    temperature=0.9
-                )
-            )
-        )
+        try:
+            image_data = await loop.run_in_executor(None, compact_image, image_data, 0, IMAGE_STORE_FORMAT)
+        except Exception as error:
+            print(f'Error di rememberImage: {error}')
+    await image_history.put(channel_id, image_data)
+
+async def prepare_edit_image(image_data):
+    if IMAGE_EDIT_MAX_SIDE:
+        loop = asyncio.get_event_loop()
+        try:
+            image_data = await loop.run_in_executor(None, compact_image, image_data, IMAGE_EDIT_MAX_SIDE)
+        except Exception as error:
+            print(f'Error di prepareEditImage: {error}')
+    return image_data, detect_mime_type(image_data)
+
+async def render_image(image_prompt, user_id=None):
+    model_name = "gemini-2.0-flash-exp"
+    return await submit_gemini(
+        lambda: model_client.generate(
+            model_name,
+            image_prompt,
+            config=types.GenerateContentConfig(
+                response_modalities=['Text', 'Image'],
+                temperature=0.9
+            ),
+            hedge=False
+        ),
+        model_name,
+        PRIORITY_IMAGE,
+        user_id
+    )
+
+async def speculative_render(prompt, use_english=False, user_id=None):
+    enrich_task = run_in_background(enrich_prompt(prompt, use_english, user_id))
+    raw_task = asyncio.create_task(render_image(prompt, user_id))
+
+    if IMAGE_SPECULATION == 'budget':
+        done, _ = await asyncio.wait({enrich_task}, timeout=ENRICH_BUDGET)
+        if enrich_task in done and enrich_task.result() != prompt:
+            raw_task.cancel()
+            enriched_prompt = enrich_task.result()
+            return await render_image(enriched_prompt, user_id), enriched_prompt
+
+    return await raw_task, prompt
+
+@metrics.timed('generate_image')
+async def generate_image(channel_id, prompt, use_english=False, user_id=None):
+    try:
+        enriched_prompt = enrichment_cache.get(enrichment_key(prompt, use_english))
+        if enriched_prompt is None and IMAGE_SPECULATION:
+            response, image_prompt = await speculative_render(prompt, use_english, user_id)
+        else:
+            image_prompt = enriched_prompt or await enrich_prompt(prompt, use_english, user_id)
+            response = await render_image(image_prompt, user_id)
+        print(f"Enriched Prompt: {image_prompt}")
         
         image_data = None
         image_response_text = None
@@ -234,7 +992,7 @@ async def generate_image(channel_id, prompt, use_english=False):
                 image_data = part.inline_data.data
         
         if image_data:
-            image_history[channel_id] = image_data
+            await remember_image(channel_id, image_data)
             
             img_buffer = io.BytesIO(image_data)
             img_buffer.seek(0)
@@ -249,13 +1007,15 @@ async def generate_image(channel_id, prompt, use_english=False):
             return None, error_text
         
     except Exception as error:
+        metrics.inc('stage_errors_total', stage='generate_image')
         print(f'Error di generateImage: {error}')
         error_text = f"**Error**\nTerjadi kesalahan saat menghasilkan gambar: {str(error)} opções"
         if use_english:
             error_text = f"**Error**\nAn error occurred while generating the image: {str(error)}"
         return None, error_text
 
-async def edit_image(channel_id, prompt, image_data, use_english=False):
+@metrics.timed('edit_image')
+async def edit_image(channel_id, prompt, image_data, use_english=False, user_id=None):
     try:
         model_name = "gemini-2.0-flash-exp"
         
@@ -263,20 +1023,21 @@ async def edit_image(channel_id, prompt, image_data, use_english=False):
         if use_english:
             edit_prompt = prompt
         
-        image_buffer = io.BytesIO(image_data)
-        pil_image = Image.open(image_buffer)
+        image_data, mime_type = await prepare_edit_image(image_data)
         
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: client.models.generate_content(
-                model=model_name,
-                contents=[edit_prompt, types.Part.from_bytes(data=image_data, mime_type="image/png")],
+        response = await submit_gemini(
+            lambda: model_client.generate(
+                model_name,
+                [edit_prompt, types.Part.from_bytes(data=image_data, mime_type=mime_type)],
                 config=types.GenerateContentConfig(
                     response_modalities=['Text', 'Image'],
                     temperature=0.9
-                )
-            )
+                ),
+                hedge=False
+            ),
+            model_name,
+            PRIORITY_IMAGE,
+            user_id
         )
         
         edited_image_data = None
@@ -289,7 +1050,7 @@ async def edit_image(channel_id, prompt, image_data, use_english=False):
                 edited_image_data = part.inline_data.data
         
         if edited_image_data:
-            image_history[channel_id] = edited_image_data
+            await remember_image(channel_id, edited_image_data)
             
             img_buffer = io.BytesIO(edited_image_data)
             img_buffer.seek(0)
@@ -304,67 +1065,66 @@ async def edit_image(channel_id, prompt, image_data, use_english=False):
             return None, error_text
         
     except Exception as error:
+        metrics.inc('stage_errors_total', stage='edit_image')
         print(f'Error di editImage: {error}')
         error_text = f"**Error**\nTerjadi kesalahan saat mengedit gambar: {str(error)}"
         if use_english:
             error_text = f"**Error**\nAn error occurred while editing the image: {str(error)}"
         return None, error_text
 
-def split_text(text, max_length=1900):
-    chunks = []
-    current_chunk = ''
-    lines = text.split('\n')
-    in_code_block = False
-    current_language = ''
-
-    for line in lines:
-        trimmed_line = line.strip()
-
-        if trimmed_line.startswith('```'):
-            if not in_code_block:
-                current_language = trimmed_line.replace('```', '')
-                in_code_block = True
-            else:
-                in_code_block = False
-            current_chunk += ('\n' if current_chunk else '') + line
-            continue
-
-        if in_code_block:
-            if len(current_chunk) + len(line) + 1 > max_length:
-                current_chunk += '\n```'
-                chunks.append(current_chunk.strip())
-                current_chunk = f"```{current_language}\n{line}"
-            else:
-                current_chunk += ('\n' if current_chunk else '') + line
-        else:
-            if len(line) > max_length:
-                parts = [line[i:i+max_length] for i in range(0, len(line), max_length)]
-                for part in parts:
-                    if len(current_chunk) + len(part) + 1 > max_length:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = part
-                    else:
-                        current_chunk += ('\n' if current_chunk else '') + part
-            elif len(current_chunk) + len(line) + 1 > max_length:
-                chunks.append(current_chunk.strip())
-                current_chunk = line
-            else:
-                current_chunk += ('\n' if current_chunk else '') + line
+async def is_channel_active(channel_id):
+    active = active_cache.get(channel_id)
+    if active is None:
+        active = await state.get(f"active:{channel_id}") == '1'
+        if ACTIVE_CACHE_TTL > 0:
+            active_cache.set(channel_id, active)
+    return active
 
-    if current_chunk:
-        if in_code_block and not current_chunk.endswith('```'):
-            current_chunk += '\n```'
-        chunks.append(current_chunk.strip())
+async def set_channel_active(channel_id, active):
+    if active:
+        await state.set(f"active:{channel_id}", '1')
+    else:
+        await state.delete(f"active:{channel_id}")
+    if ACTIVE_CACHE_TTL > 0:
+        active_cache.set(channel_id, active)
 
-    return chunks
+async def acquire_cooldown(key, cooldown=COOLDOWN_TIME / 1000):
+    if await state.set_if_absent(f"cooldown:{key}", '1', cooldown):
+        return 0.0
+    return await state.ttl(f"cooldown:{key}") or 0.0
 
 intents = Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(command_prefix='!', intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+
+def prewarm_modules():
+    client.load()
+    types.load()
+    if IMAGE_STORE_FORMAT or IMAGE_EDIT_MAX_SIDE:
+        import PIL.Image
+
+async def prewarm():
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(prewarm_modules)
+        startup_times['prewarm'] = time.perf_counter() - started
+        print(f"Pemanasan modul selesai dalam {startup_times['prewarm']:.2f} detik")
+    except Exception as error:
+        print(f'Error di prewarm: {error}')
 
 @bot.event
 async def on_ready():
+    if 'ready' not in startup_times:
+        startup_times['ready'] = time.perf_counter() - STARTED_AT
+        print(f"Waktu sampai siap: {startup_times['ready']:.2f} detik")
+        if PREWARM:
+            run_in_background(prewarm())
     print(f'Bot {bot.user} siap!')
+    if SHARD_IDS is not None and 0 not in SHARD_IDS:
+        return
     try:
         synced = await bot.tree.sync()
         print(f"Synced {len(synced)} command(s)")
@@ -375,252 +1135,275 @@ async def on_ready():
 async def activate(interaction: Interaction):
     channel_id = str(interaction.channel_id)
     user_id = str(interaction.user.id)
-    now = asyncio.get_event_loop().time() * 1000
     
-    cooldown_key = f"{user_id}-activate"
-    cooldown_end_time = command_cooldowns.get(cooldown_key, 0)
+    remaining_time = await acquire_cooldown(f"{user_id}-activate")
     
-    if now < cooldown_end_time:
-        remaining_time = (cooldown_end_time - now) / 1000
+    if remaining_time > 0:
         await interaction.response.send_message(
             f"**Cooldown**\nSilakan tunggu {remaining_time:.1f} detik sebelum menggunakan perintah ini lagi.",
             ephemeral=True
         )
         return
     
-    command_cooldowns[cooldown_key] = now + COOLDOWN_TIME
-    channel_activity[channel_id] = True
+    await set_channel_active(channel_id, True)
     await interaction.response.send_message("**Status**\nBot diaktifkan di channel ini!")
 
 @bot.tree.command(name="deactivate", description="Menonaktifkan bot di channel ini")
 async def deactivate(interaction: Interaction):
     channel_id = str(interaction.channel_id)
     user_id = str(interaction.user.id)
-    now = asyncio.get_event_loop().time() * 1000
     
-    cooldown_key = f"{user_id}-deactivate"
-    cooldown_end_time = command_cooldowns.get(cooldown_key, 0)
+    remaining_time = await acquire_cooldown(f"{user_id}-deactivate")
     
-    if now < cooldown_end_time:
-        remaining_time = (cooldown_end_time - now) / 1000
+    if remaining_time > 0:
         await interaction.response.send_message(
             f"**Cooldown**\nSilakan tunggu {remaining_time:.1f} detik sebelum menggunakan perintah ini lagi.",
             ephemeral=True
         )
         return
     
-    command_cooldowns[cooldown_key] = now + COOLDOWN_TIME
-    channel_activity[channel_id] = False
+    await set_channel_active(channel_id, False)
     await interaction.response.send_message("**Status**\nBot dinonaktifkan di channel ini!")
 
-@bot.event
-async def on_message(message):
-    if message.author.bot:
-        return
+COMMAND_CONCURRENCY = parse_model_limits(os.getenv(
+    'COMMAND_CONCURRENCY',
+    'gambar=4,gambar_en=4,editgambar=2,editgambar_en=2,think=4'
+))
+COMMAND_COOLDOWNS = parse_model_limits(os.getenv('COMMAND_COOLDOWNS', ''))
+UNSUPPORTED_FORMAT_TEXT = '\nFormat file tidak didukung. Format yang didukung:\n- JPEG\n- PNG\n- GIF\n- PDF\n- MP4\n- MP3\n- WAV'
 
-    channel_id = str(message.channel.id)
-    is_bot_active = channel_activity.get(channel_id, False)
-    content = message.content.strip()
+async def send_cooldown(message, remaining_time):
+    await message.reply(f"**Cooldown**\nSilakan tunggu {remaining_time:.1f} detik sebelum menggunakan perintah ini lagi.")
 
-    if content.lower() == '!reset':
-        if channel_id in conversation_history:
-            conversation_history.pop(channel_id)
-            await message.channel.send('Riwayat percakapan di channel ini telah direset!')
-        else:
-            await message.channel.send('Tidak ada riwayat percakapan yang perlu dihapus')
-        return
-    
-    if content.lower() == '!resetgambar':
-        if channel_id in image_history:
-            image_history.pop(channel_id)
-            await message.channel.send('Riwayat gambar di channel ini telah direset!')
-        else:
-            await message.channel.send('Tidak ada riwayat gambar yang perlu dihapus')
-        return
+router = CommandRouter(metrics, acquire_cooldown, send_cooldown)
 
-    if content.lower().startswith('!gambar'):
-        async with message.channel.typing():
-            image_prompt = content.replace('!gambar', '', 1).strip()
-            
-            if not image_prompt:
-                await message.reply('**Error**\nGunakan format: !gambar [deskripsi gambar yang diinginkan]')
-                return
-            
-            img_buffer, response_text = await generate_image(channel_id, image_prompt, use_english=False)
-            
-            if img_buffer:
-                await message.channel.send(
-                    f"**{response_text}**\n", 
-                    file=File(fp=img_buffer, filename='generated_image.png')
-                )
-            else:
-                await message.channel.send(response_text)
-        return
-        
-    if content.lower().startswith('!gambar_en'):
-        async with message.channel.typing():
-            image_prompt = content.replace('!gambar_en', '', 1).strip()
-            
-            if not image_prompt:
+def command(name, exact=False):
+    key = name.lstrip('!')
+    return router.command(
+        name,
+        exact=exact,
+        concurrency=int(COMMAND_CONCURRENCY.get(key, 0)),
+        cooldown=COMMAND_COOLDOWNS.get(key, 0)
+    )
+
+@command('!reset', exact=True)
+async def reset_command(message, args):
+    live_chats.pop(str(message.channel.id))
+    if await conversation_history.reset(str(message.channel.id)):
+        await message.channel.send('Riwayat percakapan di channel ini telah direset!')
+    else:
+        await message.channel.send('Tidak ada riwayat percakapan yang perlu dihapus')
+
+@command('!statcache', exact=True)
+async def statcache_command(message, args):
+    await message.channel.send(cache_report())
+
+@command('!statantrian', exact=True)
+async def statantrian_command(message, args):
+    await message.channel.send(queue_report())
+
+@command('!resetgambar', exact=True)
+async def resetgambar_command(message, args):
+    if image_history.pop(str(message.channel.id)):
+        await message.channel.send('Riwayat gambar di channel ini telah direset!')
+    else:
+        await message.channel.send('Tidak ada riwayat gambar yang perlu dihapus')
+
+async def send_generated_image(message, image_prompt, use_english=False):
+    async with message.channel.typing():
+        if not image_prompt:
+            if use_english:
                 await message.reply('**Error**\nUse format: !gambar_en [desired image description]')
-                return
-            
-            img_buffer, response_text = await generate_image(channel_id, image_prompt, use_english=True)
-            
-            if img_buffer:
-                await message.channel.send(
-                    f"**{response_text}**\nBased on prompt: {image_prompt}", 
-                    file=File(fp=img_buffer, filename='generated_image.png')
-                )
             else:
-                await message.channel.send(response_text)
-        return
-    
-    if content.lower().startswith('!editgambar'):
-        async with message.channel.typing():
-            edit_prompt = content.replace('!editgambar', '', 1).strip()
-            attachment = message.attachments[0] if message.attachments else None
-            
-            if attachment:
-                if not attachment.content_type.startswith('image/'):
+                await message.reply('**Error**\nGunakan format: !gambar [deskripsi gambar yang diinginkan]')
+            return
+
+        img_buffer, response_text = await generate_image(str(message.channel.id), image_prompt, use_english=use_english, user_id=str(message.author.id))
+
+        if img_buffer:
+            caption = f"Based on prompt: {image_prompt}" if use_english else ""
+            await message.channel.send(
+                f"**{response_text}**\n{caption}",
+                file=File(fp=img_buffer, filename=image_filename('generated_image', img_buffer))
+            )
+        else:
+            await message.channel.send(response_text)
+
+@command('!gambar')
+async def gambar_command(message, args):
+    await send_generated_image(message, args)
+
+@command('!gambar_en')
+async def gambar_en_command(message, args):
+    await send_generated_image(message, args, use_english=True)
+
+async def send_edited_image(message, edit_prompt, use_english=False):
+    channel_id = str(message.channel.id)
+    if use_english:
+        usage_text = '**Error**\nUse format: !editgambar_en [edit description] with an attached image!'
+    else:
+        usage_text = '**Error**\nGunakan format: !editgambar [deskripsi edit] dengan melampirkan gambar!'
+
+    async with message.channel.typing():
+        attachment = message.attachments[0] if message.attachments else None
+
+        if attachment:
+            if not (attachment.content_type or '').startswith('image/'):
+                if use_english:
+                    await message.reply('**Error**\nOnly image files can be edited!')
+                else:
                     await message.reply('**Error**\nHanya file gambar yang dapat diedit!')
-                    return
-                
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: requests.get(attachment.url))
-                image_data = response.content
-            elif channel_id in image_history:
-                image_data = image_history[channel_id]
-            else:
-                await message.reply('**Error**\nGunakan format: !editgambar [deskripsi edit] dengan melampirkan gambar!')
                 return
-            
-            if not edit_prompt:
-                await message.reply('**Error**\nGunakan format: !editgambar [deskripsi edit] dengan melampirkan gambar!')
+            if await reject_large_attachment(message, attachment, use_english=use_english):
                 return
-            
-            edited_img_buffer, edit_response_text = await edit_image(channel_id, edit_prompt, image_data, use_english=False)
-            
-            if edited_img_buffer:
-                await message.channel.send(
-                    f"**{edit_response_text}**\n", 
-                    file=File(fp=edited_img_buffer, filename='edited_image.png')
-                )
-            else:
-                await message.channel.send(edit_response_text)
-        return
-    
-    if content.lower().startswith('!editgambar_en'):
-        async with message.channel.typing():
-            edit_prompt = content.replace('!editgambar_en', '', 1).strip()
-            attachment = message.attachments[0] if message.attachments else None
-            
-            if attachment:
-                if not attachment.content_type.startswith('image/'):
-                    await message.reply('**Error**\nOnly image files can be edited!')
-                    return
-                
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: requests.get(attachment.url))
-                image_data = response.content
-            elif channel_id in image_history:
-                image_data = image_history[channel_id]
+
+            if use_english:
+                error_text = '**Error**\nAn error occurred while editing the image: failed to download the attachment'
             else:
-                await message.reply('**Error**\nUse format: !editgambar_en [edit description] with an attached image!')
+                error_text = '**Error**\nTerjadi kesalahan saat mengedit gambar: gagal mengunduh lampiran'
+            image_data = await download_attachment(
+                message, lambda: download_bytes(attachment.url, max_bytes=MAX_ATTACHMENT_BYTES), error_text
+            )
+            if image_data is None:
                 return
-            
-            if not edit_prompt:
-                await message.reply('**Error**\nUse format: !editgambar_en [edit description] with an attached image!')
+        else:
+            image_data = await image_history.get(channel_id)
+            if image_data is None:
+                await message.reply(usage_text)
                 return
 
-            edited_img_buffer, edit_response_text = await edit_image(channel_id, edit_prompt, image_data, use_english=True)
-            
-            if edited_img_buffer:
-                await message.channel.send(
-                    f"**{edit_response_text}**\nBased on prompt: {edit_prompt}", 
-                    file=File(fp=edited_img_buffer, filename='edited_image.png')
-                )
-            else:
-                await message.channel.send(edit_response_text)
-        return
+        if not edit_prompt:
+            await message.reply(usage_text)
+            return
 
-    if content.lower().startswith('!think'):
-        async with message.channel.typing():
-            thinking_prompt = content.replace('!think', '', 1).strip()
-            attachment = message.attachments[0] if message.attachments else None
-            media_data = None
-
-            if attachment:
-                mime_type = attachment.content_type
-                if mime_type not in SUPPORTED_MIME_TYPES:
-                    await message.reply('\nFormat file tidak didukung. Format yang didukung:\n- JPEG\n- JPG\n- PNG\n- GIF\n- PDF\n- MP4\n- MP3\n- WAV')
-                    return
-
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: requests.get(attachment.url))
-                buffer = response.content
-                base64_data = base64.b64encode(buffer).decode('utf-8')
-                media_data = {'mime_type': mime_type, 'base64': base64_data}
-
-            ai_response = await generate_response(channel_id, thinking_prompt, media_data, None, True)
-            response_chunks = split_text(ai_response)
-            for chunk in response_chunks:
-                await message.channel.send(chunk)
-                await asyncio.sleep(1)
-        return
+        edited_img_buffer, edit_response_text = await edit_image(channel_id, edit_prompt, image_data, use_english=use_english, user_id=str(message.author.id))
 
-    if content.lower().startswith('!gift'):
-        async with message.channel.typing():
-            gift_prompt = content.replace('!gift', '', 1).strip()
-            ai_response = await generate_response(channel_id, gift_prompt)
-            response_chunks = split_text(ai_response)
-            for chunk in response_chunks:
-                await message.channel.send(chunk)
-                await asyncio.sleep(1)
-        return
+        if edited_img_buffer:
+            caption = f"Based on prompt: {edit_prompt}" if use_english else ""
+            await message.channel.send(
+                f"**{edit_response_text}**\n{caption}",
+                file=File(fp=edited_img_buffer, filename=image_filename('edited_image', edited_img_buffer))
+            )
+        else:
+            await message.channel.send(edit_response_text)
 
-    if is_bot_active or content.startswith('!chat') or content.startswith('!cari'):
-        prompt = content
-        search_query = None
-        youtube_url = extract_youtube_url(content)
+@command('!editgambar')
+async def editgambar_command(message, args):
+    await send_edited_image(message, args)
 
-        if content.startswith('!cari'):
-            search_query = content.replace('!cari', '', 1).strip()
-            prompt = f"Berikan jawaban berdasarkan pencarian untuk: {search_query}"
-        elif content.startswith('!chat'):
-            prompt = content.replace('!chat', '', 1).strip()
-        elif is_bot_active and not content.startswith('!'):
-            prompt = content
+@command('!editgambar_en')
+async def editgambar_en_command(message, args):
+    await send_edited_image(message, args, use_english=True)
 
+@command('!think')
+async def think_command(message, args):
+    async with message.channel.typing():
         attachment = message.attachments[0] if message.attachments else None
         media_data = None
 
         if attachment:
-            mime_type = attachment.content_type
-            if mime_type not in SUPPORTED_MIME_TYPES:
-                await message.reply('\nFormat file tidak didukung. Format yang didukung:\n- JPEG\n- PNG\n- GIF\n- PDF\n- MP4\n- MP3\n- WAV')
+            if attachment.content_type not in SUPPORTED_MIME_TYPES:
+                await message.reply(UNSUPPORTED_FORMAT_TEXT)
+                return
+            if await reject_large_attachment(message, attachment):
+                return
+
+            media_data = await download_attachment(message, lambda: download_media(attachment))
+            if media_data is None:
+                return
+
+        try:
+            await send_ai_response(message.channel, str(message.channel.id), args, media_data, None, True, user_id=str(message.author.id))
+        finally:
+            close_media(media_data)
+
+@command('!gift')
+async def gift_command(message, args):
+    async with message.channel.typing():
+        await send_ai_response(message.channel, str(message.channel.id), args, user_id=str(message.author.id))
+
+async def respond_to_message(message, prompt, search_query=None):
+    channel_id = str(message.channel.id)
+    user_id = str(message.author.id)
+    youtube_url = extract_youtube_url(message.content)
+    attachment = message.attachments[0] if message.attachments else None
+
+    if attachment:
+        if attachment.content_type not in SUPPORTED_MIME_TYPES:
+            await message.reply(UNSUPPORTED_FORMAT_TEXT)
+            return
+        if await reject_large_attachment(message, attachment):
+            return
+
+        async with message.channel.typing():
+            media_data = await download_attachment(message, lambda: download_media(attachment))
+            if media_data is None:
                 return
+            try:
+                await send_ai_response(message.channel, channel_id, prompt, media_data, search_query, youtube_url=youtube_url, user_id=user_id)
+            finally:
+                close_media(media_data)
+    else:
+        async with message.channel.typing():
+            await send_ai_response(message.channel, channel_id, prompt, None, search_query, youtube_url=youtube_url, user_id=user_id)
+
+@command('!chat')
+async def chat_command(message, args):
+    await respond_to_message(message, args)
+
+@command('!cari')
+async def cari_command(message, args):
+    await respond_to_message(message, f"Berikan jawaban berdasarkan pencarian untuk: {args}", args)
 
-            async with message.channel.typing():
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, lambda: requests.get(attachment.url))
-                buffer = response.content
-                base64_data = base64.b64encode(buffer).decode('utf-8')
-                media_data = {'mime_type': mime_type, 'base64': base64_data}
-
-                ai_response = await generate_response(channel_id, prompt, media_data, search_query, youtube_url=youtube_url)
-                response_chunks = split_text(ai_response)
-                for chunk in response_chunks:
-                    await message.channel.send(chunk)
-                    await asyncio.sleep(1)
+@bot.event
+async def on_message(message):
+    if message.author.bot:
+        return
+
+    content = message.content.strip()
+    command, args = router.match(content)
+    command_name = command.name if command else 'message'
+    metrics.inc('messages_total', command=command_name)
+    with metrics.span('on_message', command=command_name):
+        if command is not None:
+            await router.run(command, message, args)
         else:
-            async with message.channel.typing():
-                ai_response = await generate_response(channel_id, prompt, None, search_query, youtube_url=youtube_url)
-                response_chunks = split_text(ai_response)
-                for chunk in response_chunks:
-                    await message.channel.send(chunk)
-                    await asyncio.sleep(1)
+            await handle_message(message, content)
+
+async def handle_message(message, content):
+    if not await is_channel_active(str(message.channel.id)):
+        await bot.process_commands(message)
+        return
 
+    if COALESCE_WINDOW > 0 and not content.startswith('!') and not message.attachments:
+        queue_channel_message(message)
+        return
+
+    await respond_to_message(message, content)
     await bot.process_commands(message)
 
-bot.run(os.getenv('DISCORD_TOKEN'))
\ No newline at end of file
+async def main():
+    utils.setup_logging()
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await metrics.start_server(METRICS_PORT, METRICS_HOST)
+    if LOOP_LAG_INTERVAL > 0:
+        run_in_background(monitor_loop_lag())
+    async with bot:
+        try:
+            await bot.start(os.getenv('DISCORD_TOKEN'))
+        finally:
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            await close_http_session()
+            await state.close()
+            search_cache.close()
+            translation_cache.close()
+            page_cache.close()
+            image_history.close()
+
+startup_times['import'] = time.perf_counter() - STARTED_AT
+
+if __name__ == '__main__':
+    print(f"Waktu impor: {startup_times['import']:.2f} detik")
+    asyncio.run(main())
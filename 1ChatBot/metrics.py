@@ -0,0 +1,151 @@
+import asyncio
+import bisect
+import functools
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(key, extra=None):
+    pairs = list(key) + (extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Span:
+    __slots__ = ('metrics', 'stage', 'labels', 'key', 'started')
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+        self.key = None
+        self.started = 0.0
+
+    def __enter__(self):
+        self.key = label_key({'stage': self.stage, **self.labels})
+        inflight = self.metrics.inflight
+        inflight[self.key] = inflight.get(self.key, 0) + 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        elapsed = time.perf_counter() - self.started
+        self.metrics.inflight[self.key] -= 1
+        self.metrics.observe('stage_duration_seconds', elapsed, stage=self.stage, **self.labels)
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.metrics.inc('stage_errors_total', stage=self.stage, **self.labels)
+        return False
+
+
+class Metrics:
+    def __init__(self, namespace='chatbot'):
+        self.namespace = namespace
+        self.counters = {}
+        self.histograms = {}
+        self.inflight = {}
+        self.collectors = []
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, label_key(labels))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, label_key(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def span(self, stage, **labels):
+        return Span(self, stage, labels)
+
+    def timed(self, stage):
+        def decorator(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return await function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        families = {}
+
+        def add(name, kind, key, value):
+            families.setdefault(name, (kind, []))[1].append((key, value))
+
+        for (name, key), value in self.counters.items():
+            add(name, 'counter', key, value)
+        for key, value in self.inflight.items():
+            add('stage_inflight', 'gauge', key, value)
+        for collector in self.collectors:
+            try:
+                for name, kind, labels, value in collector():
+                    add(name, kind, label_key(labels), value)
+            except Exception as error:
+                print(f'Error di Metrics: {error}')
+
+        lines = []
+        for name, (kind, samples) in sorted(families.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {full_name} {kind}")
+            lines.extend(f"{full_name}{format_labels(key)} {value}" for key, value in samples)
+
+        histograms = {}
+        for (name, key), histogram in self.histograms.items():
+            histograms.setdefault(name, []).append((key, histogram))
+        for name, samples in sorted(histograms.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {full_name} histogram")
+            for key, histogram in samples:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{full_name}_bucket{format_labels(key, [('le', repr(bound))])} {cumulative}")
+                lines.append(f"{full_name}_bucket{format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{full_name}_sum{format_labels(key)} {histogram.sum}")
+                lines.append(f"{full_name}_count{format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    async def start_server(self, port, host='127.0.0.1'):
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import re
+
+HEAD_PATTERN = re.compile(r'\S+')
+
+
+class Command:
+    __slots__ = ('name', 'handler', 'exact', 'concurrency', 'cooldown', 'semaphore')
+
+    def __init__(self, name, handler, exact=False, concurrency=None, cooldown=0):
+        self.name = name
+        self.handler = handler
+        self.exact = exact
+        self.concurrency = concurrency
+        self.cooldown = cooldown
+        self.semaphore = None
+
+
+class CommandRouter:
+    def __init__(self, metrics=None, acquire_cooldown=None, on_cooldown=None):
+        self.metrics = metrics
+        self.acquire_cooldown = acquire_cooldown
+        self.on_cooldown = on_cooldown
+        self.commands = {}
+        self.pattern = None
+
+    def command(self, name, exact=False, concurrency=None, cooldown=0):
+        def decorator(handler):
+            self.commands[name.lower()] = Command(name.lower(), handler, exact, concurrency, cooldown)
+            self.pattern = None
+            return handler
+        return decorator
+
+    def compile(self):
+        names = sorted(self.commands, key=len, reverse=True)
+        alternatives = '|'.join(
+            re.escape(name) + (r'(?=\s*$)' if self.commands[name].exact else '')
+            for name in names
+        )
+        self.pattern = re.compile(f'(?:{alternatives})', re.IGNORECASE)
+
+    def match(self, content):
+        if not content.startswith('!'):
+            return None, content
+        head = HEAD_PATTERN.match(content)
+        command = self.commands.get(head.group(0).lower())
+        if command is not None:
+            args = content[head.end():].strip()
+            if not (command.exact and args):
+                return command, args
+        if self.pattern is None:
+            self.compile()
+        match = self.pattern.match(content)
+        if match is None:
+            return None, content
+        return self.commands[match.group(0).lower()], content[match.end():].strip()
+
+    async def run(self, command, message, args):
+        if command.cooldown and self.acquire_cooldown is not None:
+            remaining = await self.acquire_cooldown(f"{message.author.id}-{command.name}", command.cooldown)
+            if remaining > 0:
+                if self.metrics:
+                    self.metrics.inc('command_cooldowns_total', command=command.name)
+                if self.on_cooldown is not None:
+                    await self.on_cooldown(message, remaining)
+                return
+
+        span = self.metrics.span('command', command=command.name) if self.metrics else contextlib.nullcontext()
+        with span:
+            if not command.concurrency:
+                await command.handler(message, args)
+            else:
+                if command.semaphore is None:
+                    command.semaphore = asyncio.Semaphore(command.concurrency)
+                async with command.semaphore:
+                    await command.handler(message, args)
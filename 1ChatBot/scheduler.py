@@ -0,0 +1,234 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+
+PRIORITY_CHAT = 0
+PRIORITY_THINK = 1
+PRIORITY_IMAGE = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_CHAT: 'chat',
+    PRIORITY_THINK: 'think',
+    PRIORITY_IMAGE: 'image',
+    PRIORITY_BACKGROUND: 'background'
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    status = getattr(error, 'code', None) or getattr(error, 'status', None)
+    return status in RETRYABLE_STATUS
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount=1):
+        self.refill()
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def try_acquire(self, amount=1):
+        wait = self.wait_time(amount)
+        if wait == 0.0:
+            self.tokens -= amount
+        return wait
+
+    def charge(self, amount=1):
+        self.refill()
+        self.tokens -= amount
+
+
+class GeminiScheduler:
+    def __init__(self, concurrency=8, model_rpm=None, default_rpm=60, user_share=2,
+                 queue_timeout=30.0, max_retries=3, base_delay=1.0, max_delay=20.0):
+        self.concurrency = concurrency
+        self.model_rpm = model_rpm or {}
+        self.default_rpm = default_rpm
+        self.user_share = user_share
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.model_buckets = {}
+        self.queue = []
+        self.sequence = itertools.count()
+        self.running = 0
+        self.user_running = {}
+        self.wakeup = None
+        self.dispatcher = None
+        self.wait_samples = deque(maxlen=1000)
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'expired': 0, 'retries': 0, 'charged': 0}
+
+    def bucket(self, model):
+        if model not in self.model_buckets:
+            rpm = self.model_rpm.get(model, self.default_rpm)
+            self.model_buckets[model] = TokenBucket(rpm / 60, rpm)
+        return self.model_buckets[model]
+
+    def charge(self, model):
+        self.bucket(model).charge()
+        self.counters['charged'] += 1
+
+    async def submit(self, call, model, priority=PRIORITY_CHAT, user_id=None, timeout=None):
+        loop = asyncio.get_event_loop()
+        if self.wakeup is None:
+            self.wakeup = asyncio.Event()
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self._dispatch())
+
+        now = time.monotonic()
+        job = {
+            'call': call,
+            'model': model,
+            'priority': priority,
+            'user_id': user_id,
+            'enqueued': now,
+            'not_before': now,
+            'deadline': now + (self.queue_timeout if timeout is None else timeout),
+            'attempts': 0,
+            'task': None,
+            'future': loop.create_future()
+        }
+        job['future'].add_done_callback(lambda future: self._on_done(job))
+        self.counters['submitted'] += 1
+        self._push(job)
+        return await job['future']
+
+    def _push(self, job):
+        heapq.heappush(self.queue, (job['priority'], next(self.sequence), job))
+        self.wakeup.set()
+
+    def _on_done(self, job):
+        if job['future'].cancelled() and job['task'] is not None and not job['task'].done():
+            job['task'].cancel()
+
+    def _expire(self, job, now):
+        if now < job['deadline']:
+            return False
+        self.counters['expired'] += 1
+        job['future'].set_exception(asyncio.TimeoutError('Antrian Gemini melewati batas waktu'))
+        return True
+
+    def _next_job(self):
+        now = time.monotonic()
+        wait = None
+        if self.running >= self.concurrency:
+            for _, _, job in self.queue:
+                if job['future'].done() or self._expire(job, now):
+                    continue
+                until_deadline = job['deadline'] - now
+                wait = until_deadline if wait is None else min(wait, until_deadline)
+            return None, wait
+
+        skipped = []
+        selected = None
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            job = entry[-1]
+            if job['future'].done() or self._expire(job, now):
+                continue
+
+            until_deadline = job['deadline'] - now
+            delay = max(job['not_before'] - now, 0.0)
+            if not delay and self.user_running.get(job['user_id'], 0) >= self.user_share and job['user_id'] is not None:
+                skipped.append(entry)
+                wait = until_deadline if wait is None else min(wait, until_deadline)
+                continue
+            if not delay:
+                delay = self.bucket(job['model']).try_acquire()
+            if delay:
+                skipped.append(entry)
+                delay = min(delay, until_deadline)
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            selected = job
+            break
+
+        for entry in skipped:
+            heapq.heappush(self.queue, entry)
+        return selected, wait
+
+    async def _dispatch(self):
+        while True:
+            job, wait = self._next_job()
+            if job is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if job['attempts'] == 0:
+                self.wait_samples.append(time.monotonic() - job['enqueued'])
+            self.running += 1
+            self.user_running[job['user_id']] = self.user_running.get(job['user_id'], 0) + 1
+            job['task'] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job):
+        try:
+            result = await job['call']()
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:
+            if is_retryable(error) and job['attempts'] < self.max_retries and not job['future'].done():
+                retry_at = time.monotonic() + self.backoff(job['attempts'])
+                job['attempts'] += 1
+                job['not_before'] = retry_at
+                job['deadline'] = retry_at + self.queue_timeout
+                self.counters['retries'] += 1
+                self._push(job)
+            elif not job['future'].done():
+                self.counters['failed'] += 1
+                job['future'].set_exception(error)
+        else:
+            self.counters['completed'] += 1
+            if not job['future'].done():
+                job['future'].set_result(result)
+        finally:
+            self.running -= 1
+            remaining = self.user_running.get(job['user_id'], 1) - 1
+            if remaining > 0:
+                self.user_running[job['user_id']] = remaining
+            else:
+                self.user_running.pop(job['user_id'], None)
+            self.wakeup.set()
+
+    def backoff(self, attempts):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempts))
+
+    def depth(self):
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, job in self.queue:
+            if not job['future'].done():
+                depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return depth
+
+    def stats(self):
+        samples = sorted(self.wait_samples)
+        return {
+            'running': self.running,
+            'queued': sum(self.depth().values()),
+            'depth': self.depth(),
+            'wait_p50': samples[len(samples) // 2] if samples else 0.0,
+            'wait_p95': samples[int(len(samples) * 0.95)] if samples else 0.0,
+            'wait_max': samples[-1] if samples else 0.0,
+            **self.counters
+        }
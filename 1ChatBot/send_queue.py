@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+
+
+class ChannelSender:
+    def __init__(self, max_length=2000, burst=5, per=5.0, concurrency=10, metrics=None):
+        self.max_length = max_length
+        self.burst = burst
+        self.per = per
+        self.concurrency = concurrency
+        self.metrics = metrics
+        self.semaphore = None
+        self.queues = {}
+        self.workers = {}
+        self.buckets = {}
+        self.sent = 0
+        self.coalesced = 0
+
+    def enqueue(self, channel, content):
+        future = asyncio.get_event_loop().create_future()
+        self.queues.setdefault(channel.id, deque()).append((content, future))
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.create_task(self._drain(channel))
+        return future
+
+    def send(self, channel, chunks):
+        return [self.enqueue(channel, chunk) for chunk in chunks if chunk]
+
+    async def acquire(self, channel_id):
+        sent = self.buckets.get(channel_id)
+        if sent is None:
+            sent = self.buckets[channel_id] = deque(maxlen=self.burst)
+        now = time.monotonic()
+        slot = max(now, sent[0] + self.per) if len(sent) == self.burst else now
+        sent.append(slot)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _restamp(self, channel_id):
+        sent = self.buckets.get(channel_id)
+        if sent:
+            sent[-1] = max(sent[-1], time.monotonic())
+
+    def pending(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def _take(self, queue):
+        content, future = queue.popleft()
+        futures = [future]
+        while queue and len(content) + 1 + len(queue[0][0]) <= self.max_length:
+            next_content, next_future = queue.popleft()
+            content += '\n' + next_content
+            futures.append(next_future)
+            self.coalesced += 1
+        return content, futures
+
+    def _prune_buckets(self):
+        now = time.monotonic()
+        for channel_id, sent in list(self.buckets.items()):
+            if channel_id not in self.workers and sent[-1] + self.per <= now:
+                del self.buckets[channel_id]
+
+    async def _drain(self, channel):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        queue = self.queues[channel.id]
+        try:
+            while queue:
+                content, futures = self._take(queue)
+                await self.acquire(channel.id)
+                message = None
+                async with self.semaphore:
+                    self._restamp(channel.id)
+                    try:
+                        with self.metrics.span('discord_send') if self.metrics else contextlib.nullcontext():
+                            message = await channel.send(content)
+                        self.sent += 1
+                    except Exception as error:
+                        print(f'Error di ChannelSender: {error}')
+                for future in futures:
+                    if not future.done():
+                        future.set_result(message)
+        finally:
+            self.workers.pop(channel.id, None)
+            if not queue:
+                self.queues.pop(channel.id, None)
+            if len(self.buckets) > 1000:
+                self._prune_buckets()
@@ -0,0 +1,190 @@
+import asyncio
+import heapq
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MemoryBackend:
+    def __init__(self):
+        self.entries = {}
+        self.expiry = []
+
+    def _sweep(self):
+        now = time.monotonic()
+        while self.expiry and self.expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self.expiry)
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self.entries[key]
+
+    def _live(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.entries[key]
+            return None
+        return entry
+
+    async def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    async def set(self, key, value, ttl=None):
+        self._sweep()
+        expires_at = time.monotonic() + ttl if ttl else None
+        self.entries[key] = (value, expires_at)
+        if expires_at is not None:
+            heapq.heappush(self.expiry, (expires_at, key))
+
+    async def set_if_absent(self, key, value, ttl=None):
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def ttl(self, key):
+        entry = self._live(key)
+        if entry is None or entry[1] is None:
+            return None
+        return entry[1] - time.monotonic()
+
+    async def delete(self, key):
+        return self.entries.pop(key, None) is not None
+
+    async def close(self):
+        self.entries.clear()
+        self.expiry.clear()
+
+
+class SQLiteBackend:
+    def __init__(self, path, sweep_interval=60.0):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.swept_at = 0.0
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.db = None
+
+    def _connect(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS state ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS state_expires_at ON state (expires_at)')
+        self._sweep(time.time())
+        self.db.commit()
+
+    def _sweep(self, now):
+        if now - self.swept_at >= self.sweep_interval:
+            self.db.execute('DELETE FROM state WHERE expires_at <= ?', (now,))
+            self.swept_at = now
+
+    def _call(self, func, *args):
+        if self.db is None:
+            self._connect()
+        return func(*args)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, self._call, func, *args)
+
+    def _get(self, key):
+        row = self.db.execute(
+            'SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key, value, ttl):
+        now = time.time()
+        self._sweep(now)
+        self.db.execute(
+            'INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, value, now + ttl if ttl else None)
+        )
+        self.db.commit()
+
+    def _set_if_absent(self, key, value, ttl):
+        now = time.time()
+        self._sweep(now)
+        cursor = self.db.execute(
+            'INSERT INTO state (key, value, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at '
+            'WHERE state.expires_at IS NOT NULL AND state.expires_at <= ?',
+            (key, value, now + ttl if ttl else None, now)
+        )
+        self.db.commit()
+        return cursor.rowcount > 0
+
+    def _ttl(self, key):
+        row = self.db.execute('SELECT expires_at FROM state WHERE key = ?', (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def _delete(self, key):
+        cursor = self.db.execute('DELETE FROM state WHERE key = ?', (key,))
+        self.db.commit()
+        return cursor.rowcount > 0
+
+    async def get(self, key):
+        return await self.run(self._get, key)
+
+    async def set(self, key, value, ttl=None):
+        await self.run(self._set, key, value, ttl)
+
+    async def set_if_absent(self, key, value, ttl=None):
+        return await self.run(self._set_if_absent, key, value, ttl)
+
+    async def ttl(self, key):
+        return await self.run(self._ttl, key)
+
+    async def delete(self, key):
+        return await self.run(self._delete, key)
+
+    async def close(self):
+        self.executor.shutdown(wait=True)
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+class RedisBackend:
+    def __init__(self, url):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError('Paket redis belum terpasang, jalankan: pip install redis')
+        self.redis = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key):
+        return await self.redis.get(key)
+
+    async def set(self, key, value, ttl=None):
+        await self.redis.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def set_if_absent(self, key, value, ttl=None):
+        return bool(await self.redis.set(key, value, nx=True, px=int(ttl * 1000) if ttl else None))
+
+    async def ttl(self, key):
+        remaining = await self.redis.pttl(key)
+        return remaining / 1000 if remaining > 0 else None
+
+    async def delete(self, key):
+        return await self.redis.delete(key) > 0
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_backend(url=None):
+    if not url or url == 'memory':
+        return MemoryBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f'STATE_BACKEND tidak dikenali: {url}')
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'shared'))
+
+
+@pytest.fixture(scope='session')
+def bot():
+    os.environ.setdefault('CONVERSATION_DB', '')
+    os.environ.setdefault('IMAGE_SPILL_DIR', '')
+    os.environ.setdefault('METRICS_PORT', '0')
+    import main
+    return main
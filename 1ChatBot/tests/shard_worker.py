@@ -0,0 +1,37 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from bench.fakes import FakeGateway, FakeGenAI
+
+CHANNEL_ID = 77
+
+
+async def run(action, start_at):
+    gateway = FakeGateway(main).install(FakeGenAI())
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    result = {'spill_dir': main.IMAGE_SPILL_DIR}
+    if action == 'activate':
+        await main.set_channel_active(str(CHANNEL_ID), True)
+        await main.conversation_history.append_turn(str(CHANNEL_ID), 'halo', 'hai juga')
+    elif action == 'cooldown':
+        result['acquired'] = await main.acquire_cooldown('gambar:1') == 0.0
+    elif action == 'reply':
+        result['active'] = await main.is_channel_active(str(CHANNEL_ID))
+        _, turns = await main.conversation_history.get_context(str(CHANNEL_ID))
+        result['turns'] = [turn['user'] for turn in turns]
+        await gateway.dispatch(gateway.message(CHANNEL_ID, 1, 'apa kabar?'))
+        await gateway.settle()
+        result['replies'] = [message.content for message in gateway.channel(CHANNEL_ID).sent]
+    await main.state.close()
+    main.image_history.close()
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    asyncio.run(run(sys.argv[1], float(sys.argv[2])))
@@ -0,0 +1,71 @@
+import asyncio
+import sqlite3
+import time
+
+from cache import TTLCache
+
+
+def rows(path, table):
+    with sqlite3.connect(path) as db:
+        return sorted(key for (key,) in db.execute(f'SELECT key FROM {table}'))
+
+
+def test_get_async_loads_from_disk(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = TTLCache(4, 60, path=path, table='items')
+    cache.set('a', {'value': 1})
+    cache.close()
+
+    cache = TTLCache(4, 60, path=path, table='items')
+    assert cache.get('a') is None
+    assert asyncio.run(cache.get_async('a')) == {'value': 1}
+    assert cache.get('a') == {'value': 1}
+    cache.close()
+
+
+def test_evicted_rows_are_deleted(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = TTLCache(2, 60, path=path, table='items')
+    for key in 'abc':
+        cache.set(key, key)
+    cache.close()
+    assert rows(path, 'items') == ['b', 'c']
+
+
+def test_expired_rows_are_deleted(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = TTLCache(4, 60, path=path, table='items')
+    cache.set('a', 'a', ttl=0.01)
+    cache.set('b', 'b')
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    cache.close()
+    assert rows(path, 'items') == ['b']
+
+
+def test_get_async_returns_entry_too_heavy_to_keep(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = TTLCache(4, 60, path=path, table='items')
+    cache.set('big', 'x' * 10, weight=10)
+    cache.close()
+
+    cache = TTLCache(4, 60, max_weight=5, path=path, table='items')
+    assert asyncio.run(cache.get_async('big')) == 'x' * 10
+    assert 'big' not in cache
+    cache.close()
+
+
+def test_memory_cache_without_path():
+    cache = TTLCache(2, 60, max_weight=10)
+    cache.set('a', 1, weight=6)
+    cache.set('b', 2, weight=6)
+    assert cache.get('a') is None
+    assert asyncio.run(cache.get_async('b')) == 2
+    assert cache.stats()['evictions'] == 1
+
+
+def test_memory_cache_accepts_unserializable_values():
+    cache = TTLCache(2, 60)
+    value = object()
+    cache.set('a', value)
+    assert cache.get('a') is value
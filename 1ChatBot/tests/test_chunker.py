@@ -0,0 +1,60 @@
+import random
+
+from bench import baseline
+from chunker import TextChunker, split_text
+
+LINE_KINDS = ['', ' ', 'kata', 'baris pendek', '```', '```python', '  ```js  ', '- poin', '# judul']
+
+
+def random_text(rng):
+    lines = []
+    for _ in range(rng.randint(0, 30)):
+        choice = rng.random()
+        if choice < 0.4:
+            lines.append(rng.choice(LINE_KINDS))
+        elif choice < 0.8:
+            lines.append(''.join(rng.choice('ab cd\t') for _ in range(rng.randint(1, 40))))
+        else:
+            lines.append('x' * rng.randint(40, 200))
+    return '\n'.join(lines)
+
+
+def random_pieces(rng, text):
+    pieces = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 25)
+        pieces.append(text[position:position + size])
+        position += size
+    return pieces
+
+
+def test_split_text_matches_baseline():
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = random_text(rng)
+        max_length = rng.randint(8, 80)
+        assert split_text(text, max_length) == baseline.split_text(text, max_length), (text, max_length)
+
+
+def test_incremental_feed_matches_whole_text():
+    rng = random.Random(4321)
+    for _ in range(5000):
+        text = random_text(rng)
+        max_length = rng.randint(8, 80)
+        chunker = TextChunker(max_length)
+        chunks = []
+        for piece in random_pieces(rng, text):
+            chunks.extend(chunker.feed(piece))
+            assert len(chunker.preview()) <= max_length
+        chunks.extend(chunker.close())
+        assert chunks == baseline.split_text(text, max_length), (text, max_length)
+
+
+def test_code_fence_is_closed_across_chunks():
+    text = '```python\n' + '\n'.join(f"print({index})" for index in range(50)) + '\n```'
+    chunks = split_text(text, 100)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith('```')
+        assert chunk.endswith('```')
@@ -0,0 +1,91 @@
+import asyncio
+
+from bench.fakes import FakeGateway, FakeGenAI, Latency
+
+
+def coalesce_setup(bot, monkeypatch, latency, reply_chars=60, stream_scale=0.1):
+    genai = FakeGenAI(latency=latency, reply_chars=reply_chars, stream_chunk=60, stream_scale=stream_scale)
+    gateway = FakeGateway(bot).install(genai)
+    monkeypatch.setattr(bot, 'STREAM_RESPONSES', True)
+    monkeypatch.setattr(bot, 'STREAM_EDIT_INTERVAL', 0)
+    monkeypatch.setattr(bot, 'COALESCE_WINDOW', 0.05)
+    monkeypatch.setattr(bot, 'run_in_background', lambda coro: coro.close())
+    monkeypatch.setattr(bot, 'coalesce_stats', {'messages': 0, 'turns': 0, 'superseded': 0})
+    return genai, gateway
+
+
+def test_burst_is_coalesced_into_one_turn(bot, monkeypatch):
+    genai, gateway = coalesce_setup(bot, monkeypatch, Latency(0.01))
+
+    async def scenario():
+        await bot.set_channel_active('9401', True)
+        for content in ('halo', 'aku mau tanya', 'soal python'):
+            await gateway.dispatch(gateway.message(9401, 1, content))
+        await gateway.settle(5)
+
+    gateway.run(scenario())
+    assert genai.calls['send_message_stream'] == 1
+    assert genai.prompts == ['halo\naku mau tanya\nsoal python']
+    assert bot.coalesce_stats == {'messages': 3, 'turns': 1, 'superseded': 0}
+    assert '9401' not in bot.channel_batches
+
+
+def test_superseded_turn_is_cancelled_and_merged(bot, monkeypatch):
+    genai, gateway = coalesce_setup(bot, monkeypatch, Latency(0.2))
+
+    async def scenario():
+        await bot.set_channel_active('9402', True)
+        await gateway.dispatch(gateway.message(9402, 1, 'pertama'))
+        await asyncio.sleep(0.1)
+        await gateway.dispatch(gateway.message(9402, 1, 'kedua'))
+        await gateway.settle(5)
+
+    gateway.run(scenario())
+    assert genai.calls['send_message_stream'] == 2
+    assert genai.prompts == ['pertama\nkedua']
+    assert len(gateway.channel(9402).sent) == 1
+    assert 'pertama' in gateway.channel(9402).sent[0].content
+    assert bot.coalesce_stats == {'messages': 2, 'turns': 2, 'superseded': 1}
+
+
+def test_one_turn_in_flight_per_channel(bot, monkeypatch):
+    genai, gateway = coalesce_setup(bot, monkeypatch, Latency(0.02), reply_chars=120, stream_scale=10)
+
+    async def scenario():
+        await bot.set_channel_active('9403', True)
+        await gateway.dispatch(gateway.message(9403, 1, 'pertama'))
+        await asyncio.sleep(0.1)
+        assert bot.channel_batches['9403']['turns'][0]['state'].get('replying')
+        await gateway.dispatch(gateway.message(9403, 1, 'kedua'))
+        await asyncio.sleep(0.1)
+        assert len(bot.channel_batches['9403']['turns']) == 2
+        await gateway.dispatch(gateway.message(9403, 1, 'ketiga'))
+        await gateway.settle(5)
+
+    gateway.run(scenario())
+    assert genai.max_active_streams == 1
+    assert genai.prompts == ['pertama', 'kedua\nketiga']
+    assert bot.coalesce_stats == {'messages': 3, 'turns': 2, 'superseded': 1}
+
+
+def test_turn_cancelled_before_submission_is_not_counted(bot, monkeypatch):
+    genai, gateway = coalesce_setup(bot, monkeypatch, Latency(0.01))
+    build_contents = bot.build_contents
+
+    async def slow_build_contents(prompt, *args, **kwargs):
+        await asyncio.sleep(0.2)
+        return await build_contents(prompt, *args, **kwargs)
+
+    monkeypatch.setattr(bot, 'build_contents', slow_build_contents)
+
+    async def scenario():
+        await bot.set_channel_active('9404', True)
+        await gateway.dispatch(gateway.message(9404, 1, 'cari'))
+        await asyncio.sleep(0.1)
+        await gateway.dispatch(gateway.message(9404, 1, 'berita hari ini'))
+        await gateway.settle(5)
+
+    gateway.run(scenario())
+    assert genai.calls['send_message_stream'] == 1
+    assert genai.prompts == ['cari\nberita hari ini']
+    assert bot.coalesce_stats == {'messages': 2, 'turns': 1, 'superseded': 1}
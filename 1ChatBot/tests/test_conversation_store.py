@@ -0,0 +1,62 @@
+import asyncio
+
+from conversation_store import ConversationStore, estimate_tokens
+
+
+async def summarizer(summary, turns):
+    return (summary + ' ' + ' '.join(turn['user'] for turn in turns)).strip()
+
+
+def test_summary_waits_for_pending_threshold():
+    store = ConversationStore(max_turns=2, token_budget=10000, summary_min_turns=3, summary_min_tokens=10000)
+
+    async def scenario():
+        results = [await store.append_turn('1', f"pesan {index}", 'balasan') for index in range(5)]
+        return results
+
+    assert asyncio.run(scenario()) == [False, False, False, False, True]
+
+
+def test_summary_triggers_on_pending_tokens():
+    store = ConversationStore(max_turns=1, token_budget=10000, summary_min_turns=10, summary_min_tokens=50)
+
+    async def scenario():
+        first = await store.append_turn('1', 'pendek', 'balasan')
+        second = await store.append_turn('1', 'x' * 400, 'balasan')
+        third = await store.append_turn('1', 'lagi', 'balasan')
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (False, False, True)
+
+
+def test_summarize_folds_pending_turns():
+    store = ConversationStore(max_turns=1, summary_min_turns=1)
+
+    async def scenario():
+        await store.append_turn('1', 'satu', 'a')
+        assert await store.append_turn('1', 'dua', 'b')
+        await store.summarize('1', summarizer)
+        return await store.get_context('1')
+
+    summary, turns = asyncio.run(scenario())
+    assert summary == 'satu'
+    assert [turn['user'] for turn in turns] == ['dua']
+
+
+def test_trim_counts_dropped_pending_turns(capsys):
+    store = ConversationStore(max_turns=1, token_budget=10000, summary_min_turns=100, summary_min_tokens=10 ** 9)
+
+    async def scenario():
+        for index in range(7):
+            await store.append_turn('1', f"pesan {index}", 'balasan')
+        return await store.get('1')
+
+    session = asyncio.run(scenario())
+    assert len(session['pending']) == 4
+    assert store.dropped_turns == 2
+    assert 'dibuang' in capsys.readouterr().out
+
+
+def test_token_estimate():
+    assert estimate_tokens('') == 1
+    assert estimate_tokens('abcdefgh') == 2
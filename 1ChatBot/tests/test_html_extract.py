@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from bench import baseline
+from bench.bench_extract import generate_page
+from html_extract import TextExtractor
+
+
+def extract(html, chunk_size=None, max_chars=5000):
+    extractor = TextExtractor(max_chars)
+    step = chunk_size or len(html) or 1
+    for offset in range(0, len(html), step):
+        extractor.feed(html[offset:offset + step])
+    extractor.close()
+    return extractor.text()
+
+
+def test_collects_content_tags_and_skips_scripts():
+    html = (
+        "<html><head><script>var p = '<p>bukan</p>';</script><style>p {}</style></head><body>"
+        "<h1> Judul </h1><div>menu</div><p>Satu <b>tebal</b> &amp; dua</p><h3>Sub</h3><p>Tiga</p></body></html>"
+    )
+    assert extract(html) == "Judul\nSatu tebal & dua\nSub\nTiga\n"
+
+
+def test_unclosed_paragraphs_are_split():
+    assert extract("<p>satu<p>dua<h2>tiga") == "satu\ndua\ntiga\n"
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+def test_chunked_feed_matches_whole_document(chunk_size):
+    html = generate_page(random.Random(chunk_size), 40, script_kb=1, nav_links=10)
+    assert extract(html, chunk_size) == extract(html)
+
+
+def test_budget_stops_collection():
+    extractor = TextExtractor(100)
+    extractor.feed(''.join(f"<p>{'kata ' * 10}</p>" for _ in range(50)))
+    assert extractor.done
+    extractor.close()
+    assert len(extractor.text()) == 100
+
+
+def test_matches_beautifulsoup_on_generated_pages():
+    pytest.importorskip('bs4')
+    rng = random.Random(3)
+    for _ in range(5):
+        html = generate_page(rng, 80, script_kb=2, nav_links=20)
+        assert extract(html) == baseline.parse_html(html)
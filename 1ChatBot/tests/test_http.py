@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from bench.fakes import FakeAttachment, FakeGateway, FakeGenAI, StubServer
+
+
+def blob_server(size):
+    server = StubServer()
+
+    async def blob(request):
+        return web.Response(body=b'a' * size)
+
+    async def chunked(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(size // 1024):
+            await response.write(b'b' * 1024)
+        await response.write_eof()
+        return response
+
+    server.route('GET', '/blob', blob)
+    server.route('GET', '/chunked', chunked)
+    return server
+
+
+def run(bot, server, scenario):
+    async def wrapper():
+        async with server:
+            try:
+                return await scenario()
+            finally:
+                await bot.close_http_session()
+
+    return asyncio.run(wrapper())
+
+
+def test_pooled_session_reuses_connections(bot):
+    server = blob_server(4096)
+
+    async def scenario():
+        results = []
+        for _ in range(5):
+            results += await asyncio.gather(*(bot.download_bytes(server.link('/blob')) for _ in range(20)))
+        return results
+
+    results = run(bot, server, scenario)
+    assert len(results) == 100 and all(len(data) == 4096 for data in results)
+    assert server.hits['/blob'] == 100
+    assert len(server.peers) <= bot.HTTP_POOL_PER_HOST
+
+
+@pytest.mark.parametrize('path', ['/blob', '/chunked'])
+def test_download_limit_is_enforced(bot, path):
+    server = blob_server(64 * 1024)
+
+    async def scenario():
+        return await bot.download_bytes(server.link(path), max_bytes=16 * 1024)
+
+    with pytest.raises(ValueError):
+        run(bot, server, scenario)
+
+
+def test_large_attachments_are_spooled(bot, monkeypatch):
+    monkeypatch.setattr(bot, 'MEDIA_SPOOL_THRESHOLD', 1024)
+    server = blob_server(8 * 1024)
+
+    async def scenario():
+        attachment = type('Attachment', (), {'url': server.link('/chunked'), 'content_type': 'application/pdf', 'size': 8 * 1024})()
+        media = await bot.download_media(attachment)
+        try:
+            return media['size'], media['file'].read()
+        finally:
+            bot.close_media(media)
+
+    size, data = run(bot, server, scenario)
+    assert size == 8 * 1024 and data == b'b' * 8 * 1024
+
+
+async def large_body(request):
+    return web.Response(body=b'a' * 4096)
+
+
+@pytest.mark.parametrize('content, path, size', [
+    ('!chat jelaskan ini', '/broken', 64),
+    ('!think jelaskan ini', '/broken', 64),
+    ('!editgambar jadi biru', '/broken', 64),
+    ('!chat jelaskan ini', '/large', 64),
+])
+def test_failed_attachment_download_is_reported(bot, monkeypatch, content, path, size):
+    monkeypatch.setattr(bot, 'MAX_ATTACHMENT_BYTES', 1024)
+    genai = FakeGenAI()
+    gateway = FakeGateway(bot).install(genai)
+    server = StubServer()
+    server.page('/broken', 'rusak', status=500)
+    server.route('GET', '/large', large_body)
+
+    async def scenario():
+        async with server:
+            attachment = FakeAttachment(server.link(path), 'image/png', size)
+            try:
+                await gateway.dispatch(gateway.message(9301, 1, content, [attachment]))
+            finally:
+                await bot.close_http_session()
+
+    gateway.run(scenario())
+    sent = gateway.channel(9301).sent
+    assert len(sent) == 1 and sent[0].content.startswith('**Error**')
+    assert genai.calls['generate_content'] == 0 and genai.calls['chats_create'] == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from bench.fakes import FakeGateway, FakeGenAI, Latency
+
+
+@pytest.fixture
+def image_bot(bot, monkeypatch):
+    bot.enrichment_cache.clear()
+    monkeypatch.setattr(bot.gemini_scheduler, 'default_rpm', 60000)
+    monkeypatch.setattr(bot.gemini_scheduler, 'model_rpm', {})
+    bot.gemini_scheduler.model_buckets.clear()
+    yield bot
+    bot.enrichment_cache.clear()
+
+
+def enrich_calls(genai):
+    return genai.calls['generate_content'] - genai.calls['image_started']
+
+
+def test_concurrent_enrichment_is_shared(image_bot):
+    genai = FakeGenAI(Latency(0.05))
+    gateway = FakeGateway(image_bot).install(genai)
+
+    async def scenario():
+        first = await asyncio.gather(*(image_bot.enrich_prompt('Kucing  di bulan') for _ in range(5)))
+        second = await image_bot.enrich_prompt('kucing di bulan')
+        return first, second
+
+    first, second = gateway.run(scenario())
+    assert enrich_calls(genai) == 1
+    assert len(set(first)) == 1 and second == first[0]
+    assert not image_bot.enrichment_tasks
+
+
+@pytest.mark.parametrize('mode, budget, rendered', [
+    ('', 1.0, 'enriched'),
+    ('keep', 1.0, 'raw'),
+    ('budget', 1.0, 'enriched'),
+    ('budget', 0.01, 'raw'),
+])
+def test_speculation_modes(image_bot, monkeypatch, mode, budget, rendered):
+    monkeypatch.setattr(image_bot, 'IMAGE_SPECULATION', mode)
+    monkeypatch.setattr(image_bot, 'ENRICH_BUDGET', budget)
+    genai = FakeGenAI(Latency(0.05), image_scale=4)
+    gateway = FakeGateway(image_bot).install(genai)
+
+    async def scenario():
+        image, _ = await image_bot.generate_image('9101', 'naga di gunung')
+        await asyncio.gather(*image_bot.background_tasks)
+        return image
+
+    assert gateway.run(scenario()) is not None
+    assert enrich_calls(genai) == 1
+    assert image_bot.enrichment_cache.get(image_bot.enrichment_key('naga di gunung')) is not None
+    cancelled = mode == 'budget' and rendered == 'enriched'
+    assert genai.calls['image_cancelled'] == int(cancelled)
+    assert genai.calls['image_started'] == 1 + int(cancelled)
+
+
+def test_cached_enrichment_skips_speculation(image_bot, monkeypatch):
+    monkeypatch.setattr(image_bot, 'IMAGE_SPECULATION', 'budget')
+    image_bot.enrichment_cache.set(image_bot.enrichment_key('taman bunga'), 'taman bunga yang indah')
+    genai = FakeGenAI()
+    gateway = FakeGateway(image_bot).install(genai)
+
+    gateway.run(image_bot.generate_image('9102', 'taman bunga'))
+    assert enrich_calls(genai) == 0 and genai.calls['image_started'] == 1
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+from image_store import ImageStore
+
+
+def test_spilled_images_round_trip(tmp_path):
+    async def scenario():
+        store = ImageStore(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=100)
+        await store.put('a', b'a' * 8)
+        await store.put('b', b'b' * 8)
+        assert os.path.exists(tmp_path / 'a.img')
+        assert store.stats()['disk_entries'] == 1
+        assert await store.get('a') == b'a' * 8
+        assert await store.get('b') == b'b' * 8
+        store.close()
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.stats()['spills'] == 3
+
+
+def test_pop_removes_spilled_file(tmp_path):
+    async def scenario():
+        store = ImageStore(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=100)
+        await store.put('a', b'a' * 8)
+        await store.put('b', b'b' * 8)
+        assert store.pop('a')
+        assert not store.pop('a')
+        store.close()
+
+    asyncio.run(scenario())
+    assert not os.path.exists(tmp_path / 'a.img')
+
+
+def test_disk_budget_evicts_oldest(tmp_path):
+    async def scenario():
+        store = ImageStore(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=20)
+        for key in 'abcd':
+            await store.put(key, key.encode() * 8)
+        store.close()
+        return store
+
+    store = asyncio.run(scenario())
+    assert sorted(os.listdir(tmp_path)) == ['b.img', 'c.img']
+    assert 'a' not in store and 'd' in store
+
+
+def test_missing_spill_file_is_forgotten(tmp_path):
+    async def scenario():
+        store = ImageStore(max_bytes=10, spill_dir=str(tmp_path), max_disk_bytes=100)
+        await store.put('a', b'a' * 8)
+        await store.put('b', b'b' * 8)
+        os.remove(tmp_path / 'a.img')
+        assert await store.get('a') is None
+        assert 'a' not in store
+        store.close()
+
+    asyncio.run(scenario())
+
+
+def test_spill_dir_is_indexed_lazily(tmp_path):
+    spill_dir = tmp_path / 'spill'
+    store = ImageStore(max_bytes=10, spill_dir=str(spill_dir), max_disk_bytes=100)
+    assert not spill_dir.exists()
+
+    spill_dir.mkdir()
+    (spill_dir / 'old.img').write_bytes(b'lama')
+    assert asyncio.run(store.get('old')) == b'lama'
+    store.close()
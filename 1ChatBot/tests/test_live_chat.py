@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from bench.fakes import FakeGateway, FakeGenAI
+
+
+def test_live_chat_drops_attachment_parts_after_follow_up(bot, monkeypatch):
+    genai = FakeGenAI(reply_chars=50)
+    gateway = FakeGateway(bot).install(genai)
+    monkeypatch.setattr(bot, 'STREAM_RESPONSES', True)
+    monkeypatch.setattr(bot, 'STREAM_EDIT_INTERVAL', 0)
+    image_part = SimpleNamespace(text=None, inline_data=b'gambar')
+
+    async def build_contents(prompt, media_data=None, search_query=None, youtube_url=None):
+        return [prompt, image_part] if media_data else [prompt]
+
+    monkeypatch.setattr(bot, 'build_contents', build_contents)
+    channel = gateway.channel(9001)
+
+    async def scenario():
+        await bot.stream_response(channel, '9001', 'lihat gambar ini', media_data={'mime_type': 'image/png'})
+        await bot.stream_response(channel, '9001', 'apa warnanya?')
+        followed_up = bot.live_chats.get('9001')[0].get_history()
+        chat = await bot.get_chat('9001')
+        return followed_up, chat.get_history()
+
+    followed_up, history = gateway.run(scenario())
+    assert followed_up[0].parts[1] is image_part
+    assert genai.calls['chats_create'] == 2
+    assert len(history[0].parts) == 1
+    assert [content.parts[0].text for content in history if content.role == 'user'] == ['lihat gambar ini', 'apa warnanya?']
+
+
+def test_live_chat_rebuilt_after_trim_and_reset(bot, monkeypatch):
+    genai = FakeGenAI(reply_chars=50)
+    gateway = FakeGateway(bot).install(genai)
+    monkeypatch.setattr(bot.conversation_history, 'max_turns', 2)
+    monkeypatch.setattr(bot, 'run_in_background', lambda coro: coro.close())
+
+    async def scenario():
+        for index in range(3):
+            await bot.generate_response('9002', f"pesan {index}")
+        chat = await bot.get_chat('9002')
+        kept = [content.parts[0].text for content in chat.get_history() if content.role == 'user']
+        bot.live_chats.pop('9002')
+        await bot.conversation_history.reset('9002')
+        fresh = await bot.get_chat('9002')
+        return kept, fresh.get_history()
+
+    kept, fresh = gateway.run(scenario())
+    assert kept == ['pesan 1', 'pesan 2']
+    assert list(fresh) == []
+    assert genai.calls['chats_create'] == 3
@@ -0,0 +1,19 @@
+from bench import loadtest
+from bench.fakes import FakeGateway
+
+
+def test_loadtest_smoke(bot):
+    args = loadtest.build_parser().parse_args([
+        '--messages', '30', '--rate', '0', '--model-latency', '0.01', '--model-jitter', '0',
+        '--http-latency', '0', '--discord-latency', '0', '--channels', '5', '--active-channels', '2',
+        '--timeout', '20', '--reply-chars', '300'
+    ])
+    report = FakeGateway(bot).run(loadtest.run(args, bot))
+    assert report['timeouts'] == 0
+    assert report['exceptions'] == 0
+    assert report['error_replies'] == 0
+    assert report['latency']['all']['count'] == 30
+    assert report['replies'] >= 20
+    assert report['model_calls']['send_message_stream'] + report['model_calls'].get('send_message', 0) > 0
+    assert report['http_requests']['/customsearch'] >= 1
+    assert report['max_rss_bytes'] is None or report['max_rss_bytes'] > 0
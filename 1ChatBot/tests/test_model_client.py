@@ -0,0 +1,129 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from bench.fakes import FakeAPIError, FakeGenAI, Latency, fake_response
+from model_client import GenerativeModelClient, ModelClient
+from scheduler import GeminiScheduler
+
+
+class ScriptedLatency(Latency):
+    """Gives each successive call its own delay and outcome."""
+
+    def __init__(self, script):
+        super().__init__()
+        self.script = list(script)
+        self.cancelled = 0
+
+    async def wait(self, scale=1.0, fail=True):
+        delay, error = self.script.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if error:
+            raise FakeAPIError(error)
+
+
+def generate(script, hedge_after=0.05, deadline=5.0, on_hedge=None):
+    latency = ScriptedLatency(script)
+    genai = FakeGenAI(latency=latency, reply_chars=40)
+    model_client = ModelClient(genai, deadline=deadline, hedge_after=hedge_after, on_hedge=on_hedge)
+
+    async def scenario():
+        started = time.perf_counter()
+        try:
+            return await model_client.generate('gemini-2.0-flash', ['halo']), time.perf_counter() - started
+        finally:
+            await asyncio.sleep(0.01)
+
+    return genai, latency, model_client, scenario
+
+
+def test_hedge_wins_and_cancels_primary():
+    charged = []
+    genai, latency, model_client, scenario = generate([(1.0, None), (0.01, None)], on_hedge=charged.append)
+    response, elapsed = asyncio.run(scenario())
+    assert response.text.startswith('Jawaban')
+    assert elapsed < 0.5
+    assert genai.calls['generate_content'] == 2
+    assert model_client.stats()['hedges'] == 1
+    assert model_client.stats()['hedge_wins'] == 1
+    assert latency.cancelled == 1
+    assert charged == ['gemini-2.0-flash']
+
+
+def test_hedge_loses_and_is_cancelled():
+    genai, latency, model_client, scenario = generate([(0.1, None), (1.0, None)])
+    response, elapsed = asyncio.run(scenario())
+    assert response.text.startswith('Jawaban')
+    assert elapsed < 0.5
+    assert model_client.stats()['hedges'] == 1
+    assert model_client.stats()['hedge_wins'] == 0
+    assert latency.cancelled == 1
+
+
+def test_failed_primary_falls_back_to_hedge():
+    genai, latency, model_client, scenario = generate([(0.08, 503), (0.1, None)])
+    response, _ = asyncio.run(scenario())
+    assert response.text.startswith('Jawaban')
+    assert model_client.stats()['hedge_wins'] == 1
+    assert model_client.stats()['errors'] == 0
+
+
+def test_both_calls_failing_raises():
+    genai, latency, model_client, scenario = generate([(0.08, 503), (0.02, 500)])
+    with pytest.raises(FakeAPIError):
+        asyncio.run(scenario())
+    assert genai.calls['generate_content'] == 2
+    assert model_client.stats()['errors'] == 1
+    assert model_client.stats()['calls'] == 1
+
+
+def test_deadline_cancels_call():
+    genai, latency, model_client, scenario = generate([(1.0, None)], hedge_after=0, deadline=0.05)
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+    assert time.perf_counter() - started < 0.5
+    assert latency.cancelled == 1
+    assert model_client.stats()['errors'] == 1
+
+
+def test_usage_is_recorded_without_metrics():
+    genai, latency, model_client, scenario = generate([(0.0, None)], hedge_after=0)
+    asyncio.run(scenario())
+    stats = model_client.stats()
+    assert stats['calls'] == 1
+    assert stats['prompt_tokens'] == 10
+    assert stats['total_tokens'] == stats['prompt_tokens'] + stats['output_tokens']
+
+
+def test_hedge_is_charged_to_scheduler_bucket():
+    scheduler = GeminiScheduler(model_rpm={'gemini-2.0-flash': 60})
+    genai, latency, model_client, scenario = generate([(1.0, None), (0.01, None)], on_hedge=scheduler.charge)
+    asyncio.run(scenario())
+    assert scheduler.stats()['charged'] == 1
+    assert scheduler.bucket('gemini-2.0-flash').tokens == pytest.approx(59, abs=0.1)
+
+
+def test_generative_model_adapter():
+    prompts = []
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+
+        async def generate_content_async(self, contents, generation_config=None):
+            prompts.append((self.name, contents))
+            return fake_response('はい')
+
+    sdk = SimpleNamespace(GenerativeModel=FakeModel)
+    model_client = ModelClient(GenerativeModelClient(sdk), deadline=1.0)
+    response = asyncio.run(model_client.generate('gemini-2.0-flash', 'こんにちは'))
+    assert response.text == 'はい'
+    assert prompts == [('gemini-2.0-flash', 'こんにちは')]
+    assert model_client.stats()['total_tokens'] > 0
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+from bench import baseline
+from router import CommandRouter
+
+MAIN_COMMANDS = ['!reset', '!statcache', '!statantrian', '!resetgambar', '!gambar', '!gambar_en', '!editgambar',
+                 '!editgambar_en', '!think', '!gift', '!chat', '!cari']
+
+
+def make_router(**kwargs):
+    router = CommandRouter(**kwargs)
+    calls = []
+    for name, exact in [('!reset', True), ('!gambar', False), ('!gambar_en', False), ('!chat', False)]:
+        async def handler(message, args, name=name):
+            calls.append((name, args))
+        router.command(name, exact=exact)(handler)
+    return router, calls
+
+
+def test_longest_prefix_wins():
+    router, _ = make_router()
+    assert router.match('!gambar kucing')[0].name == '!gambar'
+    command, args = router.match('!gambar_en  a cat ')
+    assert command.name == '!gambar_en' and args == 'a cat'
+    assert router.match('!GAMBAR_EN cat')[0].name == '!gambar_en'
+    command, args = router.match('!gambarkucing\ttidur')
+    assert command.name == '!gambar' and args == 'kucing\ttidur'
+    command, args = router.match('!chat\nbaris dua')
+    assert command.name == '!chat' and args == 'baris dua'
+
+
+def test_exact_commands_and_plain_messages():
+    router, _ = make_router()
+    assert router.match('!reset')[0].name == '!reset'
+    assert router.match('!RESET  ')[0].name == '!reset'
+    assert router.match('!reset semua') == (None, '!reset semua')
+    assert router.match('halo !chat') == (None, 'halo !chat')
+    assert router.match('!tidakada') == (None, '!tidakada')
+
+
+def test_commands_registered_after_compile_are_matched():
+    router, _ = make_router()
+    assert router.match('!think soal') == (None, '!think soal')
+
+    async def think(message, args):
+        pass
+
+    router.command('!think')(think)
+    assert router.match('!think soal')[0].name == '!think'
+
+
+def test_main_router_matches_old_chain(bot):
+    assert sorted(bot.router.commands) == sorted(MAIN_COMMANDS)
+    samples = ['!reset', '!statcache', '!statantrian', '!resetgambar', '!gambar kucing', '!editgambar jadi biru',
+               '!think kenapa', '!gift untuk ibu', '!chat halo', '!cari berita', '!Gift kado', 'halo semua', '!reset x']
+    for content in samples:
+        command, _ = bot.router.match(content)
+        assert (command.name if command else None) == baseline.route_message(content), content
+    assert bot.router.match('!gambar_en a cat')[0].name == '!gambar_en'
+    assert baseline.route_message('!gambar_en a cat') == '!gambar'
+
+
+def test_cooldown_and_concurrency():
+    seen = set()
+    notified = []
+
+    async def acquire_cooldown(key, cooldown):
+        if key in seen:
+            return cooldown
+        seen.add(key)
+        return 0.0
+
+    async def on_cooldown(message, remaining):
+        notified.append(remaining)
+
+    router = CommandRouter(acquire_cooldown=acquire_cooldown, on_cooldown=on_cooldown)
+    active = {'now': 0, 'max': 0}
+
+    async def slow(message, args):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.01)
+        active['now'] -= 1
+
+    router.command('!lambat', concurrency=2)(slow)
+    router.command('!jeda', cooldown=3)(slow)
+
+    async def scenario():
+        messages = [SimpleNamespace(author=SimpleNamespace(id=index)) for index in range(6)]
+        command, args = router.match('!lambat')
+        await asyncio.gather(*(router.run(command, message, args) for message in messages))
+        command, args = router.match('!jeda')
+        await router.run(command, messages[0], args)
+        await router.run(command, messages[0], args)
+
+    asyncio.run(scenario())
+    assert active['max'] == 2
+    assert notified == [3]
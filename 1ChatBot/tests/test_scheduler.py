@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from bench.fakes import FakeAPIError
+from scheduler import GeminiScheduler, PRIORITY_BACKGROUND, PRIORITY_CHAT, PRIORITY_IMAGE, PRIORITY_THINK
+
+
+def job(log, name, delay=0.0, results=None):
+    async def call():
+        log.append(('start', name))
+        await asyncio.sleep(delay)
+        log.append(('end', name))
+        if results:
+            outcome = results.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+        return name
+    return call
+
+
+def test_priority_order():
+    scheduler = GeminiScheduler(concurrency=1, default_rpm=6000)
+    log = []
+
+    async def scenario():
+        blocker = asyncio.create_task(scheduler.submit(job(log, 'blocker', 0.05), 'model'))
+        await asyncio.sleep(0.01)
+        queued = [
+            scheduler.submit(job(log, name), 'model', priority)
+            for name, priority in (
+                ('background', PRIORITY_BACKGROUND),
+                ('image', PRIORITY_IMAGE),
+                ('chat', PRIORITY_CHAT),
+                ('think', PRIORITY_THINK)
+            )
+        ]
+        return await asyncio.gather(blocker, *queued)
+
+    assert asyncio.run(scenario()) == ['blocker', 'background', 'image', 'chat', 'think']
+    started = [name for kind, name in log if kind == 'start']
+    assert started == ['blocker', 'chat', 'think', 'image', 'background']
+
+
+def test_user_share_lets_other_users_through():
+    scheduler = GeminiScheduler(concurrency=4, default_rpm=6000, user_share=1)
+    log = []
+
+    async def scenario():
+        heavy = [scheduler.submit(job(log, f'a{index}', 0.05), 'model', user_id='a') for index in range(3)]
+        await asyncio.sleep(0.01)
+        light = scheduler.submit(job(log, 'b0', 0.01), 'model', user_id='b')
+        await asyncio.gather(*heavy, light)
+
+    asyncio.run(scenario())
+    running = 0
+    peak = 0
+    for kind, name in log:
+        if name.startswith('a'):
+            running += 1 if kind == 'start' else -1
+            peak = max(peak, running)
+    assert peak == 1
+    assert log.index(('end', 'b0')) < log.index(('end', 'a0'))
+
+
+@pytest.mark.parametrize('concurrency, user_share', [(1, 8), (8, 1)])
+def test_queued_job_expires_while_held_back(concurrency, user_share):
+    scheduler = GeminiScheduler(concurrency=concurrency, default_rpm=6000, user_share=user_share, queue_timeout=0.2)
+    log = []
+
+    async def scenario():
+        blocker = asyncio.create_task(scheduler.submit(job(log, 'blocker', 1.0), 'model', user_id='a'))
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.submit(job(log, 'late'), 'model', user_id='a')
+        elapsed = time.perf_counter() - started
+        blocker.cancel()
+        await asyncio.gather(blocker, return_exceptions=True)
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    assert 0.15 < elapsed < 0.5
+    assert ('start', 'late') not in log
+    assert scheduler.stats()['expired'] == 1
+
+
+def test_rate_limited_call_is_retried():
+    scheduler = GeminiScheduler(default_rpm=6000, base_delay=0.01, max_delay=0.02)
+    log = []
+    results = [FakeAPIError(429), 'ok']
+
+    assert asyncio.run(scheduler.submit(job(log, 'flaky', results=results), 'model')) == 'flaky'
+    assert log.count(('start', 'flaky')) == 2
+    assert scheduler.stats()['retries'] == 1
+    assert scheduler.stats()['completed'] == 1
+
+
+def test_non_retryable_error_is_raised():
+    scheduler = GeminiScheduler(default_rpm=6000, base_delay=0.01)
+    log = []
+
+    with pytest.raises(FakeAPIError):
+        asyncio.run(scheduler.submit(job(log, 'bad', results=[FakeAPIError(400)]), 'model'))
+    assert log.count(('start', 'bad')) == 1
+    assert scheduler.stats()['failed'] == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+from bench.fakes import StubServer, html_page
+
+
+def run_fetch(bot, monkeypatch, pages, top_k=3, deadline=0.5):
+    monkeypatch.setattr(bot, 'SEARCH_FETCH_TOP_K', top_k)
+    monkeypatch.setattr(bot, 'SEARCH_FETCH_DEADLINE', deadline)
+    bot.page_cache.clear()
+    server = StubServer()
+    for path, text, delay, status in pages:
+        server.page(path, html_page(path, [text]), delay, status)
+
+    async def scenario():
+        async with server:
+            items = [{'title': path, 'snippet': '', 'link': server.link(path)} for path, *_ in pages]
+            try:
+                return await bot.fetch_search_contents(items)
+            finally:
+                await bot.close_http_session()
+
+    return asyncio.run(scenario()), server
+
+
+def test_slow_pages_are_dropped_at_deadline(bot, monkeypatch):
+    pages = [('/fast', 'isi cepat', 0.0, 200), ('/slow', 'isi lambat', 1.0, 200), ('/quick', 'isi singkat', 0.05, 200)]
+    content, server = run_fetch(bot, monkeypatch, pages, deadline=0.3)
+    assert 'isi cepat' in content
+    assert 'isi singkat' in content
+    assert 'isi lambat' not in content
+    assert server.hits == {'/fast': 1, '/slow': 1, '/quick': 1}
+
+
+def test_failed_pages_are_skipped(bot, monkeypatch):
+    pages = [('/ok', 'isi halaman', 0.0, 200), ('/broken', 'galat', 0.0, 500)]
+    content, _ = run_fetch(bot, monkeypatch, pages)
+    assert 'isi halaman' in content
+    assert 'galat' not in content
+
+
+def test_top_k_zero_fetches_nothing(bot, monkeypatch):
+    content, server = run_fetch(bot, monkeypatch, [('/page', 'isi', 0.0, 200)], top_k=0)
+    assert 'Tidak ada konten' in content
+    assert server.hits == {}
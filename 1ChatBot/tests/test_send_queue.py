@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+from send_queue import ChannelSender
+
+
+class RecordingChannel:
+    def __init__(self, channel_id, delay=0.0, failures=0):
+        self.id = channel_id
+        self.delay = delay
+        self.failures = failures
+        self.sent = []
+        self.active = 0
+        self.max_active = 0
+
+    async def send(self, content):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError('gagal kirim')
+            self.sent.append((time.monotonic(), content))
+            return content
+        finally:
+            self.active -= 1
+
+
+def test_small_chunks_are_coalesced_in_order():
+    async def scenario():
+        sender = ChannelSender(max_length=50, burst=100, per=1.0)
+        channel = RecordingChannel(1)
+        chunks = [f"baris {index}" for index in range(20)]
+        results = await asyncio.gather(*sender.send(channel, chunks))
+        return sender, channel, chunks, results
+
+    sender, channel, chunks, results = asyncio.run(scenario())
+    contents = [content for _, content in channel.sent]
+    assert '\n'.join(contents) == '\n'.join(chunks)
+    assert all(len(content) <= 50 for content in contents)
+    assert len(contents) < len(chunks)
+    assert sender.sent == len(contents) and sender.coalesced == len(chunks) - len(contents)
+    assert all(result in contents for result in results)
+    assert sender.pending() == 0 and not sender.workers
+
+
+def test_sends_stay_within_the_channel_window():
+    async def scenario():
+        sender = ChannelSender(max_length=10, burst=3, per=0.2)
+        channel = RecordingChannel(1)
+        started = time.monotonic()
+        await asyncio.gather(*sender.send(channel, ['x' * 10] * 9))
+        return started, [sent_at for sent_at, _ in channel.sent]
+
+    started, sent_at = asyncio.run(scenario())
+    assert len(sent_at) == 9
+    assert sent_at[2] - started < 0.05
+    for index in range(3, 9):
+        assert sent_at[index] - sent_at[index - 3] >= 0.2 - 0.005
+    assert sent_at[-1] - started < 0.7
+
+
+def test_concurrency_is_capped_across_channels():
+    async def scenario():
+        sender = ChannelSender(max_length=10, burst=10, per=1.0, concurrency=2)
+        channels = [RecordingChannel(channel_id, delay=0.02) for channel_id in range(6)]
+        active = {'now': 0, 'max': 0}
+
+        for channel in channels:
+            send = channel.send
+
+            async def tracked(content, send=send):
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+                try:
+                    return await send(content)
+                finally:
+                    active['now'] -= 1
+
+            channel.send = tracked
+        await asyncio.gather(*(future for channel in channels for future in sender.send(channel, ['x' * 10] * 3)))
+        return channels, active['max']
+
+    channels, max_active = asyncio.run(scenario())
+    assert max_active == 2
+    assert all(len(channel.sent) == 3 for channel in channels)
+
+
+def test_failed_send_does_not_stall_the_queue():
+    async def scenario():
+        sender = ChannelSender(max_length=10, burst=10, per=1.0)
+        channel = RecordingChannel(1, failures=1)
+        results = await asyncio.gather(*sender.send(channel, ['satu', 'dua' * 4, 'tiga' * 3]))
+        return channel, results
+
+    channel, results = asyncio.run(scenario())
+    assert results[0] is None
+    assert [content for _, content in channel.sent] == ['dua' * 4, 'tiga' * 3]
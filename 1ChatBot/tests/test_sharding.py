@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shard_worker.py')
+
+
+def spawn(tmp_path, shard_id, action, start_at=0.0):
+    env = dict(
+        os.environ,
+        STATE_BACKEND=f"sqlite:///{tmp_path / 'state.sqlite3'}",
+        SHARD_COUNT='4',
+        SHARD_IDS=str(shard_id),
+        IMAGE_SPILL_DIR=str(tmp_path / 'image_cache'),
+        ACTIVE_CACHE_TTL='0',
+        COALESCE_WINDOW='0',
+        STREAM_RESPONSES='0',
+        METRICS_PORT='0',
+        PREWARM='0'
+    )
+    return subprocess.Popen([sys.executable, WORKER, action, str(start_at)], env=env, stdout=subprocess.PIPE, text=True)
+
+
+def result(process):
+    output, _ = process.communicate(timeout=60)
+    assert process.returncode == 0
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_shards_share_state_through_backend(tmp_path):
+    result(spawn(tmp_path, 0, 'activate'))
+
+    start_at = time.time() + 3
+    racers = [spawn(tmp_path, shard_id, 'cooldown', start_at) for shard_id in range(4)]
+    outcomes = [result(process) for process in racers]
+    assert sum(outcome['acquired'] for outcome in outcomes) == 1
+    assert len({outcome['spill_dir'] for outcome in outcomes}) == 4
+
+    reply = result(spawn(tmp_path, 1, 'reply'))
+    assert reply['active'] is True
+    assert reply['turns'] == ['halo']
+    assert reply['replies'] and 'apa kabar?' in reply['replies'][0]
+
+
+def test_active_status_is_cached_locally(bot, monkeypatch):
+    calls = []
+    original = bot.state.get
+
+    async def counted(key):
+        calls.append(key)
+        return await original(key)
+
+    monkeypatch.setattr(bot, 'ACTIVE_CACHE_TTL', 60)
+    monkeypatch.setattr(bot.state, 'get', counted)
+    bot.active_cache.clear()
+
+    async def scenario():
+        await bot.set_channel_active('501', True)
+        assert await bot.is_channel_active('501')
+        assert not await bot.is_channel_active('502')
+        assert not await bot.is_channel_active('502')
+        await bot.set_channel_active('501', False)
+        assert not await bot.is_channel_active('501')
+
+    asyncio.run(scenario())
+    assert calls == ['active:502']
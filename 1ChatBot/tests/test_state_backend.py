@@ -0,0 +1,60 @@
+import asyncio
+import sqlite3
+
+from state_backend import MemoryBackend, SQLiteBackend, create_backend
+
+
+def exercise(backend):
+    async def scenario():
+        assert await backend.get('a') is None
+        await backend.set('a', '1')
+        assert await backend.get('a') == '1'
+        assert await backend.set_if_absent('lock', '1', 60)
+        assert not await backend.set_if_absent('lock', '1', 60)
+        assert 0 < await backend.ttl('lock') <= 60
+        assert await backend.delete('a')
+        assert not await backend.delete('a')
+        await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend():
+    exercise(MemoryBackend())
+
+
+def test_sqlite_backend_connects_on_first_use(tmp_path):
+    path = tmp_path / 'state.sqlite3'
+    backend = create_backend(f"sqlite:///{path}")
+    assert isinstance(backend, SQLiteBackend)
+    assert not path.exists()
+    exercise(backend)
+    assert path.exists()
+
+
+def expire_cooldowns(backend):
+    async def scenario():
+        for user_id in range(50):
+            assert await backend.set_if_absent(f"cooldown:{user_id}-activate", '1', 0.05)
+        await backend.set('session:1', '{}')
+        await asyncio.sleep(0.1)
+        assert await backend.set_if_absent('cooldown:99-activate', '1', 60)
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_sweeps_expired_cooldowns():
+    backend = MemoryBackend()
+    expire_cooldowns(backend)
+    assert sorted(backend.entries) == ['cooldown:99-activate', 'session:1']
+    assert len(backend.expiry) == 1
+
+
+def test_sqlite_backend_sweeps_expired_cooldowns(tmp_path):
+    path = tmp_path / 'state.sqlite3'
+    backend = SQLiteBackend(str(path), sweep_interval=0.05)
+    expire_cooldowns(backend)
+    asyncio.run(backend.close())
+    with sqlite3.connect(path) as db:
+        keys = sorted(row[0] for row in db.execute('SELECT key FROM state'))
+    assert keys == ['cooldown:99-activate', 'session:1']
@@ -0,0 +1,72 @@
+import asyncio
+
+from bench.fakes import FakeGateway, FakeGenAI, Latency
+from scheduler import GeminiScheduler
+
+
+def streaming_setup(bot, monkeypatch, latency, concurrency=8):
+    genai = FakeGenAI(latency=latency, reply_chars=300, stream_chunk=60, stream_scale=1.0)
+    gateway = FakeGateway(bot).install(genai)
+    monkeypatch.setattr(bot, 'STREAM_EDIT_INTERVAL', 0)
+    monkeypatch.setattr(bot, 'gemini_scheduler', GeminiScheduler(concurrency, default_rpm=6000, model_rpm={}))
+    monkeypatch.setattr(bot, 'run_in_background', lambda coro: coro.close())
+    return genai, gateway
+
+
+def test_stream_holds_scheduler_slot(bot, monkeypatch):
+    genai, gateway = streaming_setup(bot, monkeypatch, Latency(0.02), concurrency=1)
+
+    async def scenario():
+        await asyncio.gather(*(
+            bot.stream_response(gateway.channel(channel_id), str(channel_id), f"halo {channel_id}")
+            for channel_id in (9101, 9102, 9103)
+        ))
+
+    gateway.run(scenario())
+    assert genai.calls['send_message_stream'] == 3
+    assert genai.max_active_streams == 1
+    assert bot.gemini_scheduler.stats()['completed'] == 3
+    for channel_id in (9101, 9102, 9103):
+        assert f"halo {channel_id}" in ''.join(message.content for message in gateway.channel(channel_id).sent)
+
+
+def test_stream_retries_before_first_chunk(bot, monkeypatch):
+    genai, gateway = streaming_setup(bot, monkeypatch, Latency(0.0, error_rate=1.0, seed=1))
+    bot.gemini_scheduler.base_delay = 0.01
+
+    async def scenario():
+        async def recover():
+            await asyncio.sleep(0.02)
+            genai.latency.error_rate = 0.0
+
+        await asyncio.gather(recover(), bot.stream_response(gateway.channel(9104), '9104', 'coba lagi'))
+
+    gateway.run(scenario())
+    assert bot.gemini_scheduler.stats()['retries'] >= 1
+    assert 'coba lagi' in ''.join(message.content for message in gateway.channel(9104).sent)
+
+
+def test_stream_deadline_and_usage(bot, monkeypatch):
+    genai, gateway = streaming_setup(bot, monkeypatch, Latency(0.01))
+
+    async def scenario():
+        await bot.stream_response(gateway.channel(9105), '9105', 'hitung token')
+        bot.model_client.deadline = 0.03
+        genai.latency.mean = 0.02
+        await bot.stream_response(gateway.channel(9106), '9106', 'terlalu lambat')
+
+    monkeypatch.setattr(bot.model_client, 'deadline', bot.model_client.deadline)
+    gateway.run(scenario())
+    rendered = bot.metrics.render()
+    assert 'model_tokens_total{kind="total",model="gemini-2.0-flash"}' in rendered
+    assert 'Terjadi kesalahan' in gateway.channel(9106).sent[-1].content
+    assert genai.calls['send_message_stream'] == 2
+
+
+def test_empty_stream_sends_error(bot, monkeypatch):
+    genai, gateway = streaming_setup(bot, monkeypatch, Latency(0.01))
+    genai.reply_chars = 0
+
+    gateway.run(bot.stream_response(gateway.channel(9107), '9107', 'diam saja'))
+    assert genai.calls['send_message_stream'] == 1
+    assert [message.content for message in gateway.channel(9107).sent] == [bot.RESPONSE_ERROR_TEXT]
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from bench.fakes import StubServer
+
+
+@pytest.fixture
+def translate_bot(bot, monkeypatch):
+    monkeypatch.setattr(bot, 'GOOGLE_API_KEY', 'test')
+    monkeypatch.setattr(bot, 'TRANSLATE_URL', bot.TRANSLATE_URL)
+    bot.translation_cache.clear()
+    yield bot
+    bot.translation_cache.clear()
+
+
+def run(bot, server, scenario):
+    async def wrapper():
+        async with server:
+            bot.TRANSLATE_URL = server.link('/translate')
+            try:
+                return await scenario()
+            finally:
+                await bot.close_http_session()
+
+    return asyncio.run(wrapper())
+
+
+def test_concurrent_texts_share_one_request(translate_bot):
+    server = StubServer()
+    server.translation(delay=0.01)
+    texts = [f"kalimat {index % 10}" for index in range(30)]
+
+    async def scenario():
+        first = await asyncio.gather(*(translate_bot.translate_text(text) for text in texts))
+        second = await asyncio.gather(*(translate_bot.translate_text(text) for text in texts[:10]))
+        return first, second
+
+    first, second = run(translate_bot, server, scenario)
+    assert first == [f"[en] {text}" for text in texts]
+    assert second == first[:10]
+    assert server.payloads['/translate'] == [sorted(set(texts), key=texts.index)]
+
+
+def test_batches_are_split_by_size_and_language(translate_bot, monkeypatch):
+    monkeypatch.setattr(translate_bot.translator, 'max_batch', 4)
+    server = StubServer()
+    server.translation()
+
+    async def scenario():
+        english = [translate_bot.translate_text(f"teks {index}") for index in range(10)]
+        indonesian = [translate_bot.translate_text(f"text {index}", 'id') for index in range(3)]
+        return await asyncio.gather(*english, *indonesian)
+
+    results = run(translate_bot, server, scenario)
+    assert results[:10] == [f"[en] teks {index}" for index in range(10)]
+    assert results[10:] == [f"[id] text {index}" for index in range(3)]
+    assert sorted(len(batch) for batch in server.payloads['/translate']) == [2, 3, 4, 4]
+
+
+def test_failed_batch_falls_back_to_the_original_text(translate_bot):
+    server = StubServer()
+    server.translation(status=500)
+
+    async def scenario():
+        return await asyncio.gather(*(translate_bot.translate_text(f"teks {index}") for index in range(3)))
+
+    assert run(translate_bot, server, scenario) == [f"teks {index}" for index in range(3)]
+    assert translate_bot.translation_cache.stats()['size'] == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+
+class BatchTranslator:
+    def __init__(self, translate_batch, cache, window=0.01, max_batch=128):
+        self.translate_batch = translate_batch
+        self.cache = cache
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = {}
+        self.timers = {}
+        self.tasks = set()
+        self.batches = 0
+        self.batched_texts = 0
+
+    async def translate(self, text, target_language='en'):
+        cache_key = f"{target_language}:{text}"
+        translated_text = await self.cache.get_async(cache_key)
+        if translated_text is not None:
+            return translated_text
+
+        batch = self.pending.setdefault(target_language, {})
+        future = batch.get(text)
+        if future is None:
+            future = batch[text] = asyncio.get_event_loop().create_future()
+            if len(batch) >= self.max_batch:
+                self._flush(target_language)
+            elif target_language not in self.timers:
+                self.timers[target_language] = asyncio.get_event_loop().call_later(
+                    self.window, self._flush, target_language
+                )
+        return await asyncio.shield(future)
+
+    def _flush(self, target_language):
+        timer = self.timers.pop(target_language, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending.pop(target_language, None)
+        if batch:
+            task = asyncio.create_task(self._send(target_language, batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _send(self, target_language, batch):
+        texts = list(batch)
+        self.batches += 1
+        self.batched_texts += len(texts)
+        try:
+            translations = await self.translate_batch(texts, target_language)
+            if len(translations) != len(texts):
+                raise ValueError('Jumlah hasil terjemahan tidak sesuai')
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+                    future.exception()
+            return
+
+        for text, translated_text in zip(texts, translations):
+            self.cache.set(f"{target_language}:{text}", translated_text)
+            if not batch[text].done():
+                batch[text].set_result(translated_text)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'texts': self.batched_texts,
+            'batch_size': self.batched_texts / self.batches if self.batches else 0.0,
+            'pending': sum(len(batch) for batch in self.pending.values())
+        }
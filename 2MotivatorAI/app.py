@@ -1,4 +1,5 @@
 import os
+import sys
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 
 import discord
@@ -6,6 +7,11 @@ from discord.ext import commands
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import asyncio
 from google import genai
+from emotion_service import EmotionService
+from onnx_backend import load_onnx_backend
+from prefilter import EmotionGate
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from model_client import ModelClient
 
 intents = discord.Intents.default()
 intents.messages = True
@@ -20,6 +26,44 @@ model = AutoModelForSequenceClassification.from_pretrained(pretrained)
 tokenizer = AutoTokenizer.from_pretrained(pretrained)
 emotion_classifier = pipeline("text-classification", model=model, tokenizer=tokenizer)
 
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "16"))
+EMOTION_BATCH_WAIT = float(os.getenv("EMOTION_BATCH_WAIT", "0.02"))
+
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "torch")
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "onnx_model")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+ONNX_PARITY_TOLERANCE = float(os.getenv("ONNX_PARITY_TOLERANCE", "0.02"))
+ONNX_PARITY_SAMPLES = os.getenv("ONNX_PARITY_SAMPLES")
+
+emotion_backend = emotion_classifier
+if EMOTION_BACKEND == "onnx":
+    onnx_classifier = load_onnx_backend(
+        model, tokenizer, emotion_classifier, ONNX_CACHE_DIR,
+        ONNX_THREADS, ONNX_PARITY_TOLERANCE, ONNX_PARITY_SAMPLES
+    )
+    if onnx_classifier is not None:
+        emotion_backend = onnx_classifier
+        del model, emotion_classifier
+
+def classify_batch(texts):
+    return emotion_backend(texts, batch_size=len(texts), truncation=True)
+
+emotion_service = EmotionService(classify_batch, EMOTION_BATCH_SIZE, EMOTION_BATCH_WAIT)
+
+TRIGGER_EMOTIONS = ["sad", "fear", "anger"]
+PREFILTER_MIN_LETTERS = int(os.getenv("PREFILTER_MIN_LETTERS", "8"))
+PREFILTER_LEXICON = os.getenv("PREFILTER_LEXICON", "0") == "1"
+PREFILTER_AUDIT_RATE = float(os.getenv("PREFILTER_AUDIT_RATE", "0.05"))
+EMOTION_CACHE_SIZE = int(os.getenv("EMOTION_CACHE_SIZE", "2048"))
+
+def is_trigger(result):
+    return label_index.get(result['label'], result['label']) in TRIGGER_EMOTIONS and result['score'] > 0.5
+
+emotion_gate = EmotionGate(
+    emotion_service.submit, is_trigger, PREFILTER_MIN_LETTERS,
+    use_lexicon=PREFILTER_LEXICON, cache_size=EMOTION_CACHE_SIZE, audit_rate=PREFILTER_AUDIT_RATE
+)
+
 label_index = {
     'Anger': 'anger',
     'Fear': 'fear',
@@ -30,9 +74,12 @@ label_index = {
 }
 
 GEMINI_API_KEY = "Your_API_Key"
+GEMINI_TIMEOUT = 30
+MODEL_HEDGE_AFTER = float(os.getenv("MODEL_HEDGE_AFTER", "0"))
 client = genai.Client(api_key=GEMINI_API_KEY)
+model_client = ModelClient(client, deadline=GEMINI_TIMEOUT, hedge_after=MODEL_HEDGE_AFTER)
 
-def generate_motivational_message(emotion, user_message=None):
+async def generate_motivational_message(emotion, user_message=None):
     if user_message:
         user_msg_text = f"dengan pesan: \"{user_message}\" "
     else:
@@ -42,10 +89,7 @@ def generate_motivational_message(emotion, user_message=None):
         f"{user_msg_text}untuk seseorang yang sedang merasa {emotion}. Sertakan pesan positif yang memotivasi "
         f"untuk terus berjuang dan percaya pada diri sendiri. Hanya boleh menggunakan maksimal 5 kalimat."
     )
-    response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=[prompt],
-    )
+    response = await model_client.generate("gemini-2.0-flash", [prompt])
     return response.text
 
 @bot.event
@@ -64,14 +108,11 @@ async def on_message(message):
 
     if channel_auto_response.get(message.channel.id, False):
         print(f"Pesan diterima dari {message.author} di channel {message.channel.id}: {message.content}")
-        analysis = emotion_classifier(message.content)
-        result = analysis[0]
-        print("Hasil analisis:", result)
-        emotion = label_index.get(result['label'], result['label'])
-        score = result['score']
-        if emotion in ["sad", "fear", "anger"] and score > 0.5:
-            loop = asyncio.get_event_loop()
-            motivational_text = await loop.run_in_executor(None, generate_motivational_message, emotion, message.content)
+        result = await emotion_gate.classify(message.content)
+        print("Hasil analisis:", result if result is not None else "dilewati pre-filter")
+        if result is not None and is_trigger(result):
+            emotion = label_index.get(result['label'], result['label'])
+            motivational_text = await generate_motivational_message(emotion, message.content)
             await message.channel.send(motivational_text)
 
     await bot.process_commands(message)
@@ -79,10 +120,27 @@ async def on_message(message):
 @bot.tree.command(name="motivate", description="Memanggil pesan motivasi manual")
 async def motivate(interaction: discord.Interaction):
     await interaction.response.defer()
-    loop = asyncio.get_event_loop()
-    motivational_text = await loop.run_in_executor(None, generate_motivational_message, "sad", "")
+    motivational_text = await generate_motivational_message("sad", "")
     await interaction.followup.send(motivational_text)
 
+@bot.tree.command(name="statfilter", description="Statistik pre-filter dan cache klasifikasi emosi")
+async def statfilter(interaction: discord.Interaction):
+    stats = emotion_gate.stats()
+    await interaction.response.send_message(
+        f"Pesan: {stats['messages']}, diklasifikasi: {stats['classified']}, cache hit: {stats['cache_hits']}\n"
+        f"Dilewati: {stats['skip_short']} pendek, {stats['skip_lexicon']} leksikon ({stats['skip_rate']:.0%})\n"
+        f"Audit: {stats['audited']} pesan, {stats['false_negatives']} terlewat ({stats['false_negative_rate']:.0%})"
+    )
+
+@bot.tree.command(name="statmodel", description="Statistik panggilan model Gemini")
+async def statmodel(interaction: discord.Interaction):
+    stats = model_client.stats()
+    await interaction.response.send_message(
+        f"Panggilan: {stats['calls']}, gagal: {stats['errors']}, hedge: {stats['hedges']} ({stats['hedge_wins']} menang)\n"
+        f"Latensi p50: {stats['latency_p50']:.2f}s, p95: {stats['latency_p95']:.2f}s\n"
+        f"Token: {stats['prompt_tokens']} prompt, {stats['output_tokens']} output, {stats['total_tokens']} total"
+    )
+
 @bot.tree.command(name="activate", description="Aktifkan fitur auto-response di channel ini")
 async def activate(interaction: discord.Interaction):
     channel_auto_response[interaction.channel.id] = True
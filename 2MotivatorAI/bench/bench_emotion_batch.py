@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import random
+import time
+
+from emotion_service import EmotionService
+
+TEXTS = ['aku sedih banget hari ini', 'capek sama kerjaan', 'senang sekali bisa lulus', 'takut gagal ujian besok',
+         'kesal sama macet', 'makasih ya sudah bantu', 'rindu rumah', 'lagi santai nonton film']
+
+
+class SimulatedModel:
+    """Batch cost = fixed overhead + per-text cost; sleeps off the GIL the way a torch forward pass does."""
+
+    def __init__(self, overhead, per_text):
+        self.overhead = overhead
+        self.per_text = per_text
+
+    def __call__(self, texts, batch_size=None, truncation=True):
+        if isinstance(texts, str):
+            texts = [texts]
+        time.sleep(self.overhead + self.per_text * len(texts))
+        return [{'label': 'Sadness', 'score': 0.9} for _ in texts]
+
+
+def load_model():
+    from transformers import pipeline
+
+    return pipeline('text-classification', model='thoriqfy/indobert-emotion-classification')
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+async def replay(classify_one, arrivals):
+    latencies = []
+    lags = []
+    loop = asyncio.get_running_loop()
+
+    async def heartbeat():
+        while True:
+            expected = loop.time() + 0.01
+            await asyncio.sleep(0.01)
+            lags.append(max(0.0, loop.time() - expected))
+
+    async def one(text, delay):
+        await asyncio.sleep(delay)
+        await classify_one(text)
+        latencies.append(time.perf_counter() - started - delay)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text, delay) for text, delay in arrivals))
+    elapsed = time.perf_counter() - started
+    beat.cancel()
+    return elapsed, latencies, lags
+
+
+def report(name, arrivals, elapsed, latencies, lags, extra=''):
+    print(
+        f"{name:<14} {len(arrivals) / elapsed:6.1f} pesan/s p50={percentile(latencies, 0.5) * 1000:7.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:7.1f}ms lag maks={max(lags, default=0.0) * 1000:6.1f}ms {extra}"
+    )
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Bandingkan klasifikasi per pesan di event loop dengan EmotionService.')
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=60.0, help='pesan per detik (kedatangan Poisson)')
+    parser.add_argument('--overhead', type=float, default=0.02, help='biaya tetap per panggilan model (detik)')
+    parser.add_argument('--per-text', type=float, default=0.004, help='biaya tambahan per teks dalam batch (detik)')
+    parser.add_argument('--batch-sizes', default='1,8,16,32')
+    parser.add_argument('--max-wait', type=float, default=0.02)
+    parser.add_argument('--model', action='store_true', help='pakai pipeline IndoBERT asli (butuh transformers)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.model:
+        try:
+            model = load_model()
+        except ImportError as error:
+            print(f"transformers tidak tersedia ({error}), memakai model simulasi")
+            model = SimulatedModel(args.overhead, args.per_text)
+    else:
+        model = SimulatedModel(args.overhead, args.per_text)
+
+    rng = random.Random(args.seed)
+    arrivals = []
+    at = 0.0
+    for _ in range(args.messages):
+        at += rng.expovariate(args.rate)
+        arrivals.append((rng.choice(TEXTS), at))
+
+    async def inline(text):
+        return model(text)[0]
+
+    report('inline (lama)', arrivals, *asyncio.run(replay(inline, arrivals)))
+    for max_batch in (int(size) for size in args.batch_sizes.split(',')):
+        service = EmotionService(lambda texts: model(texts, batch_size=len(texts), truncation=True), max_batch, args.max_wait)
+        try:
+            result = asyncio.run(replay(service.submit, arrivals))
+        finally:
+            service.close()
+        report(f"batch={max_batch}", arrivals, *result, extra=f"rata-rata batch={service.texts / service.batches:.1f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,176 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from onnx_backend import PARITY_SAMPLES
+
+PRETRAINED = 'thoriqfy/indobert-emotion-classification'
+LABELS = ['Anger', 'Fear', 'Joy', 'Love', 'Sadness', 'Neutral']
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else 0
+
+
+def random_model_dir(path):
+    """Save a randomly initialised model with IndoBERT-base's shape, for machines without Hub access."""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    os.makedirs(path, exist_ok=True)
+    words = sorted({word.strip('.,!?').lower() for text, _ in PARITY_SAMPLES for word in text.split()})
+    letters = [chr(code) for code in range(ord('a'), ord('z') + 1)]
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', *'.,!?-', *letters, *(f"##{letter}" for letter in letters), *words]
+    with open(os.path.join(path, 'vocab.txt'), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(vocab))
+    BertTokenizerFast(os.path.join(path, 'vocab.txt')).save_pretrained(path)
+    config = BertConfig(
+        vocab_size=50000, num_labels=len(LABELS),
+        id2label=dict(enumerate(LABELS)), label2id={label: index for index, label in enumerate(LABELS)}
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(path)
+    return path
+
+
+def load_torch(source):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    model = AutoModelForSequenceClassification.from_pretrained(source)
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    return model, tokenizer, pipeline('text-classification', model=model, tokenizer=tokenizer)
+
+
+def load_onnx(source, onnx_path, threads):
+    from transformers import AutoConfig, AutoTokenizer
+    from onnx_backend import OnnxClassifier
+
+    config = AutoConfig.from_pretrained(source)
+    return OnnxClassifier(onnx_path, AutoTokenizer.from_pretrained(source), config.id2label, threads)
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def measure(args):
+    """Child process: load one backend, then time single-message and batched calls."""
+    import onnxruntime  # noqa: F401
+    import torch
+    import transformers
+
+    from onnx_backend import OnnxClassifier  # noqa: F401
+
+    torch.set_num_threads(args.threads or torch.get_num_threads())
+    transformers.AutoTokenizer, transformers.AutoModelForSequenceClassification, transformers.pipeline
+    texts = [text for text, _ in PARITY_SAMPLES]
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    if args.backend == 'torch':
+        classifier = load_torch(args.source)[2]
+    else:
+        classifier = load_onnx(args.source, args.onnx_path, args.threads)
+    load_seconds = time.perf_counter() - started
+    for text in texts:
+        classifier(text, truncation=True)
+    gc.collect()
+    loaded = rss_bytes()
+
+    single = []
+    for index in range(args.runs):
+        started = time.perf_counter()
+        classifier(texts[index % len(texts)], truncation=True)
+        single.append(time.perf_counter() - started)
+    batch = (texts * (args.batch_size // len(texts) + 1))[:args.batch_size]
+    started = time.perf_counter()
+    for _ in range(max(1, args.runs // 10)):
+        labels = classifier(batch, batch_size=len(batch), truncation=True)
+    batch_seconds = (time.perf_counter() - started) / max(1, args.runs // 10)
+    print(json.dumps({
+        'load_seconds': load_seconds,
+        'model_rss_bytes': loaded - before,
+        'rss_bytes': rss_bytes(),
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None,
+        'p50': percentile(single, 0.5),
+        'p95': percentile(single, 0.95),
+        'batch_per_text': batch_seconds / len(batch),
+        'labels': [result['label'] for result in labels[:len(texts)]]
+    }))
+
+
+def spawn(args, backend):
+    command = [
+        sys.executable, '-m', 'bench.bench_onnx', '--child', backend, '--source', args.source,
+        '--onnx-path', args.onnx_path, '--runs', str(args.runs), '--batch-size', str(args.batch_size),
+        '--threads', str(args.threads)
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Bandingkan latensi dan memori pipeline PyTorch dengan ONNX int8.')
+    parser.add_argument('--model', default=PRETRAINED, help='nama model di Hub atau direktori lokal')
+    parser.add_argument('--random-init', action='store_true',
+                        help='pakai model acak berbentuk IndoBERT-base (tanpa akses Hub; akurasi tidak bermakna)')
+    parser.add_argument('--cache-dir', help='direktori cache ekspor ONNX (default: direktori sementara)')
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--threads', type=int, default=0)
+    parser.add_argument('--child', choices=('torch', 'onnx'), help=argparse.SUPPRESS)
+    parser.add_argument('--source', help=argparse.SUPPRESS)
+    parser.add_argument('--onnx-path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.backend = args.child
+        measure(args)
+        return
+
+    try:
+        import onnxruntime  # noqa: F401
+        import torch  # noqa: F401
+        import transformers  # noqa: F401
+        from onnx_backend import export_quantized
+    except ImportError as error:
+        print(f"Benchmark dilewati: {error}. Pasang torch, transformers, onnx dan onnxruntime.")
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench-onnx-')
+    args.source = random_model_dir(os.path.join(workdir, 'model')) if args.random_init else args.model
+    try:
+        model, tokenizer, _ = load_torch(args.source)
+    except OSError as error:
+        print(f"Model tidak bisa dimuat ({error}). Jalankan dengan --random-init bila tidak ada akses ke Hub.")
+        return
+    args.onnx_path = export_quantized(model, tokenizer, args.cache_dir or os.path.join(workdir, 'onnx'))
+    del model, tokenizer
+    print(f"model: {args.source}; ONNX int8 {os.path.getsize(args.onnx_path) / 1e6:.0f} MB")
+
+    results = {backend: spawn(args, backend) for backend in ('torch', 'onnx')}
+    for backend, result in results.items():
+        print(
+            f"{backend:<6} muat={result['load_seconds']:.1f}s RSS model={result['model_rss_bytes'] / 1e6:6.0f} MB "
+            f"RSS total={result['rss_bytes'] / 1e6:6.0f} MB p50={result['p50'] * 1000:6.1f}ms "
+            f"p95={result['p95'] * 1000:6.1f}ms batch {args.batch_size}={result['batch_per_text'] * 1000:5.1f}ms/teks"
+        )
+    agreement = sum(a == b for a, b in zip(results['torch']['labels'], results['onnx']['labels'])) / len(PARITY_SAMPLES)
+    print(f"kesesuaian label ONNX vs PyTorch pada {len(PARITY_SAMPLES)} sampel: {agreement:.0%}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from prefilter import EmotionGate
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prefilter_corpus.jsonl')
+
+
+def load_corpus(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def model_labels(texts):
+    from transformers import pipeline
+
+    classifier = pipeline('text-classification', model='thoriqfy/indobert-emotion-classification')
+    results = classifier(texts, batch_size=32, truncation=True)
+    return [result['label'].lower() in ('sadness', 'fear', 'anger', 'sad') and result['score'] > 0.5 for result in results]
+
+
+async def evaluate(corpus, use_lexicon, min_letters, repeats):
+    truth = {item['text']: item['trigger'] for item in corpus}
+
+    async def classify(text):
+        return {'trigger': truth[text]}
+
+    gate = EmotionGate(classify, lambda result: result['trigger'], min_letters, use_lexicon=use_lexicon)
+    missed = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for item in corpus:
+            result = await gate.classify(item['text'])
+            if result is None and item['trigger']:
+                missed += 1
+    elapsed = time.perf_counter() - started
+    stats = gate.stats()
+    triggers = sum(item['trigger'] for item in corpus) * repeats
+    return {
+        'skip_rate': stats['skip_rate'],
+        'classifier_calls': stats['classified'],
+        'false_negative_rate': missed / triggers if triggers else 0.0,
+        'per_message_us': elapsed / stats['messages'] * 1e6
+    }
+
+
+async def run(args):
+    corpus = load_corpus(args.corpus)
+    if args.model:
+        for item, label in zip(corpus, model_labels([item['text'] for item in corpus])):
+            item['trigger'] = label
+    print(f"korpus: {len(corpus)} pesan, {sum(item['trigger'] for item in corpus)} pemicu")
+    for use_lexicon in (False, True):
+        result = await evaluate(corpus, use_lexicon, args.min_letters, args.repeats)
+        print(
+            f"leksikon={'on ' if use_lexicon else 'off'} skip={result['skip_rate']:.1%} "
+            f"false_negative={result['false_negative_rate']:.1%} "
+            f"panggilan_model={result['classifier_calls']} {result['per_message_us']:.1f}us/pesan"
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ukur tingkat lewati dan false negative pre-filter emosi.')
+    parser.add_argument('--corpus', default=CORPUS, help='JSONL berisi {"text", "trigger"} per baris')
+    parser.add_argument('--model', action='store_true', help='Beri label korpus dengan model emosi asli')
+    parser.add_argument('--min-letters', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,69 @@
+import asyncio
+import queue
+import threading
+import time
+
+
+def resolve(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class EmotionService:
+    def __init__(self, classify, max_batch=16, max_wait=0.02):
+        self.classify = classify
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+        self.thread = threading.Thread(target=self._worker, name='emotion-classifier', daemon=True)
+        self.thread.start()
+
+    async def submit(self, text):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.put((text, future, loop))
+        return await future
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = self._collect(item)
+            self.batches += 1
+            self.texts += len(batch)
+            try:
+                results = self.classify([text for text, _, _ in batch])
+            except Exception as error:
+                for _, future, loop in batch:
+                    loop.call_soon_threadsafe(resolve, future, None, error)
+                continue
+            for (_, future, loop), result in zip(batch, results):
+                loop.call_soon_threadsafe(resolve, future, result)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,136 @@
+import inspect
+import json
+import os
+
+import numpy as np
+
+PARITY_SAMPLES = [
+    ("Aku marah banget sama kamu, kenapa kamu bohong terus?", "Anger"),
+    ("Kesal sekali, dari tadi antriannya tidak maju-maju!", "Anger"),
+    ("Aku takut besok ujian, belum belajar sama sekali.", "Fear"),
+    ("Ngeri banget dengar suara aneh di luar rumah malam ini.", "Fear"),
+    ("Senang sekali hari ini aku lulus ujian!", "Joy"),
+    ("Yeay akhirnya liburan juga, seru banget!", "Joy"),
+    ("Aku sayang banget sama keluargaku.", "Love"),
+    ("Terima kasih sudah selalu ada buat aku, cintaku.", "Love"),
+    ("Aku sedih karena kucingku mati kemarin.", "Sadness"),
+    ("Rasanya hampa sekali setelah dia pergi.", "Sadness"),
+    ("Besok rapat dimulai jam sembilan pagi.", "Neutral"),
+    ("Tolong kirimkan dokumennya lewat email ya.", "Neutral"),
+]
+
+
+def load_samples(path=None):
+    if not path:
+        return PARITY_SAMPLES
+    samples = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                item = json.loads(line)
+                samples.append((item['text'], item['label']))
+    return samples
+
+
+def logits_module(model):
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    return LogitsOnly().eval()
+
+
+def export_quantized(model, tokenizer, cache_dir):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(cache_dir, exist_ok=True)
+    float_path = os.path.join(cache_dir, 'model.onnx')
+    quantized_path = os.path.join(cache_dir, 'model.int8.onnx')
+    if os.path.exists(quantized_path):
+        return quantized_path
+
+    inputs = tokenizer(["contoh kalimat"], return_tensors='pt')
+    options = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        options['dynamo'] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            logits_module(model),
+            (inputs['input_ids'], inputs['attention_mask']),
+            float_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=14,
+            **options
+        )
+    quantize_dynamic(float_path, quantized_path, weight_type=QuantType.QInt8)
+    os.remove(float_path)
+    return quantized_path
+
+
+class OnnxClassifier:
+    def __init__(self, path, tokenizer, id2label, threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [item.name for item in self.session.get_inputs()]
+        self.tokenizer = tokenizer
+        self.id2label = id2label
+
+    def __call__(self, texts, batch_size=None, truncation=True):
+        if isinstance(texts, str):
+            texts = [texts]
+        encoded = self.tokenizer(texts, padding=True, truncation=truncation, return_tensors='np')
+        feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        indices = probabilities.argmax(axis=1)
+        return [
+            {'label': self.id2label[int(index)], 'score': float(probabilities[row, index])}
+            for row, index in enumerate(indices)
+        ]
+
+
+def accuracy(classifier, samples):
+    results = classifier([text for text, _ in samples], batch_size=len(samples), truncation=True)
+    return sum(result['label'] == label for result, (_, label) in zip(results, samples)) / len(samples), results
+
+
+def load_onnx_backend(model, tokenizer, reference, cache_dir, threads=0, tolerance=0.02, samples_path=None):
+    try:
+        path = export_quantized(model, tokenizer, cache_dir)
+        classifier = OnnxClassifier(path, tokenizer, model.config.id2label, threads)
+        samples = load_samples(samples_path)
+        reference_accuracy, reference_results = accuracy(reference, samples)
+        onnx_accuracy, onnx_results = accuracy(classifier, samples)
+    except Exception as error:
+        print(f"Backend ONNX gagal dimuat, kembali ke PyTorch: {error}")
+        return None
+
+    agreement = sum(a['label'] == b['label'] for a, b in zip(reference_results, onnx_results)) / len(samples)
+    print(
+        f"Paritas ONNX int8: akurasi {onnx_accuracy:.2%} vs PyTorch {reference_accuracy:.2%}, "
+        f"kesesuaian label {agreement:.2%} pada {len(samples)} sampel"
+    )
+    if onnx_accuracy < reference_accuracy - tolerance:
+        print("Akurasi ONNX int8 turun melebihi toleransi, kembali ke PyTorch.")
+        return None
+    return classifier
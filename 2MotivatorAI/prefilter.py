@@ -0,0 +1,98 @@
+import asyncio
+import random
+import re
+from collections import OrderedDict
+
+NOISE_PATTERN = re.compile(r'https?://\S+|<a?:\w+:\d+>|<[@#][!&]?\d+>')
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+NEGATIVE_LEXICON = {
+    'sedih', 'nangis', 'menangis', 'tangis', 'galau', 'kecewa', 'hampa', 'sepi', 'kesepian', 'sendirian',
+    'hancur', 'patah', 'gagal', 'putus', 'kehilangan', 'rindu', 'kangen', 'capek', 'cape', 'lelah', 'letih',
+    'menyerah', 'depresi', 'stres', 'stress', 'sakit', 'terluka', 'menyesal', 'nyesel', 'sia', 'mati',
+    'takut', 'ketakutan', 'cemas', 'khawatir', 'kuatir', 'gelisah', 'panik', 'ngeri', 'seram', 'serem',
+    'was', 'gugup', 'deg', 'trauma', 'insecure', 'overthinking', 'bingung', 'tertekan',
+    'marah', 'kesal', 'kesel', 'emosi', 'benci', 'muak', 'jengkel', 'sebal', 'sebel', 'bete', 'dongkol',
+    'geram', 'murka', 'anjir', 'anjing', 'bangsat', 'sialan', 'sial', 'brengsek', 'goblok', 'bodoh', 'tolol',
+    'nyebelin', 'ngeselin', 'ga', 'gak', 'nggak', 'tidak', 'bukan', 'jangan', 'susah', 'berat', 'buruk',
+    'down', 'sad', 'bad', 'hurt', 'lonely', 'tired', 'upset', 'angry', 'scared', 'mood', 'badmood', 'drop'
+}
+
+
+def normalize_text(text):
+    return ' '.join(text.lower().split())
+
+
+class EmotionGate:
+    def __init__(self, classify, is_trigger, min_letters=8, min_words=2, use_lexicon=False,
+                 cache_size=2048, audit_rate=0.0):
+        self.classify_text = classify
+        self.is_trigger = is_trigger
+        self.min_letters = min_letters
+        self.min_words = min_words
+        self.use_lexicon = use_lexicon
+        self.cache_size = cache_size
+        self.audit_rate = audit_rate
+        self.cache = OrderedDict()
+        self.audit_tasks = set()
+        self.counters = {
+            'messages': 0, 'classified': 0, 'cache_hits': 0,
+            'skip_short': 0, 'skip_lexicon': 0, 'audited': 0, 'false_negatives': 0
+        }
+
+    def skip_reason(self, text):
+        words = WORD_PATTERN.findall(NOISE_PATTERN.sub(' ', text))
+        if len(words) < self.min_words or sum(len(word) for word in words) < self.min_letters:
+            return 'short'
+        if self.use_lexicon and not any(word in NEGATIVE_LEXICON for word in words):
+            return 'lexicon'
+        return None
+
+    async def classify(self, text):
+        self.counters['messages'] += 1
+        key = normalize_text(text)
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.counters['cache_hits'] += 1
+            return result
+
+        reason = self.skip_reason(key)
+        if reason is not None:
+            self.counters[f'skip_{reason}'] += 1
+            if self.audit_rate and random.random() < self.audit_rate:
+                task = asyncio.create_task(self.audit(key, text))
+                self.audit_tasks.add(task)
+                task.add_done_callback(self.audit_tasks.discard)
+            return None
+
+        result = await self.classify_text(text)
+        self.counters['classified'] += 1
+        self.remember(key, result)
+        return result
+
+    def remember(self, key, result):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def audit(self, key, text):
+        try:
+            result = await self.classify_text(text)
+        except Exception as error:
+            print(f"Error saat audit pre-filter: {error}")
+            return
+        self.counters['audited'] += 1
+        self.remember(key, result)
+        if self.is_trigger(result):
+            self.counters['false_negatives'] += 1
+
+    def stats(self):
+        counters = self.counters
+        skipped = counters['skip_short'] + counters['skip_lexicon']
+        return {
+            **counters,
+            'skip_rate': skipped / counters['messages'] if counters['messages'] else 0.0,
+            'false_negative_rate': counters['false_negatives'] / counters['audited'] if counters['audited'] else 0.0
+        }
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from emotion_service import EmotionService
+
+
+class FakeClassifier:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.threads = set()
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('model gagal')
+        return [{'label': text.upper(), 'score': 0.9} for text in texts]
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def factory(classify, **kwargs):
+        service = EmotionService(classify, **kwargs)
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        service.close()
+
+
+def test_concurrent_messages_share_batches(make_service):
+    classifier = FakeClassifier(delay=0.02)
+    service = make_service(classifier, max_batch=8, max_wait=0.05)
+    texts = [f"pesan {index}" for index in range(20)]
+
+    async def scenario():
+        return await asyncio.gather(*(service.submit(text) for text in texts))
+
+    results = asyncio.run(scenario())
+    assert [result['label'] for result in results] == [text.upper() for text in texts]
+    assert all(len(batch) <= 8 for batch in classifier.batches)
+    assert len(classifier.batches) <= 4
+    assert service.batches == len(classifier.batches) and service.texts == 20
+    assert classifier.threads == {'emotion-classifier'}
+
+
+def test_lone_message_waits_at_most_max_wait(make_service):
+    service = make_service(FakeClassifier(), max_batch=16, max_wait=0.05)
+
+    async def scenario():
+        started = time.monotonic()
+        await service.submit('sendirian')
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_errors_reach_every_caller_in_the_batch(make_service):
+    service = make_service(FakeClassifier(fail=True), max_batch=4, max_wait=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(service.submit(f"teks {index}") for index in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_event_loop_keeps_running_while_the_model_is_busy(make_service):
+    service = make_service(FakeClassifier(delay=0.2), max_batch=4, max_wait=0.0)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(heartbeat())
+        await service.submit('lambat')
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 10
+
+
+def test_close_stops_the_worker():
+    service = EmotionService(FakeClassifier())
+    service.close()
+    assert not service.thread.is_alive()
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import onnx_backend
+from onnx_backend import PARITY_SAMPLES, OnnxClassifier, load_onnx_backend
+
+LABELS = ['Anger', 'Fear', 'Joy', 'Love', 'Sadness', 'Neutral']
+
+
+class FakeTokenizer:
+    def __call__(self, texts, padding=True, truncation=True, return_tensors='np'):
+        return {
+            'input_ids': np.ones((len(texts), 4), dtype=np.int32),
+            'attention_mask': np.ones((len(texts), 4), dtype=np.int32),
+            'token_type_ids': np.zeros((len(texts), 4), dtype=np.int32)
+        }
+
+
+class FakeSession:
+    def __init__(self, logits):
+        self.logits = np.array(logits, dtype=np.float32)
+        self.feeds = None
+
+    def run(self, outputs, feeds):
+        self.feeds = feeds
+        return [self.logits[:len(feeds['input_ids'])]]
+
+
+def fake_classifier(logits):
+    classifier = object.__new__(OnnxClassifier)
+    classifier.session = FakeSession(logits)
+    classifier.input_names = ['input_ids', 'attention_mask']
+    classifier.tokenizer = FakeTokenizer()
+    classifier.id2label = dict(enumerate(LABELS))
+    return classifier
+
+
+def label_classifier(labels):
+    def classify(texts, batch_size=None, truncation=True):
+        return [{'label': label, 'score': 0.9} for label in labels[:len(texts)]]
+    return classify
+
+
+def test_classifier_applies_softmax_and_maps_labels():
+    classifier = fake_classifier([[0, 0, 5, 0, 0, 0], [1000, 0, 0, 0, 0, 1001]])
+    results = classifier(['senang', 'biasa saja'])
+    assert [result['label'] for result in results] == ['Joy', 'Neutral']
+    assert results[0]['score'] == pytest.approx(np.exp(5) / (np.exp(5) + 5))
+    assert results[1]['score'] == pytest.approx(1 / (1 + np.exp(-1)))
+    assert set(classifier.session.feeds) == {'input_ids', 'attention_mask'}
+    assert all(feed.dtype == np.int64 for feed in classifier.session.feeds.values())
+    assert classifier('satu teks')[0]['label'] == 'Joy'
+
+
+def test_parity_gate(monkeypatch, tmp_path):
+    expected = [label for _, label in PARITY_SAMPLES]
+    model = type('Model', (), {'config': type('Config', (), {'id2label': dict(enumerate(LABELS))})()})()
+    monkeypatch.setattr(onnx_backend, 'export_quantized', lambda model, tokenizer, cache_dir: 'model.int8.onnx')
+
+    monkeypatch.setattr(onnx_backend, 'OnnxClassifier', lambda *args: label_classifier(expected))
+    assert load_onnx_backend(model, None, label_classifier(expected), str(tmp_path)) is not None
+
+    degraded = ['Neutral'] * len(expected)
+    monkeypatch.setattr(onnx_backend, 'OnnxClassifier', lambda *args: label_classifier(degraded))
+    assert load_onnx_backend(model, None, label_classifier(expected), str(tmp_path)) is None
+
+
+def test_export_failure_falls_back(monkeypatch, tmp_path):
+    def broken_export(model, tokenizer, cache_dir):
+        raise RuntimeError('ekspor gagal')
+
+    monkeypatch.setattr(onnx_backend, 'export_quantized', broken_export)
+    assert load_onnx_backend(object(), None, label_classifier([]), str(tmp_path)) is None
+
+
+def test_export_and_load_a_small_model(tmp_path):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('onnx')
+    pytest.importorskip('torch')
+    transformers = pytest.importorskip('transformers')
+
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', *(chr(code) for code in range(97, 123)),
+             *(f"##{chr(code)}" for code in range(97, 123))]
+    (tmp_path / 'vocab.txt').write_text('\n'.join(vocab))
+    tokenizer = transformers.BertTokenizerFast(str(tmp_path / 'vocab.txt'))
+    config = transformers.BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=64, num_labels=len(LABELS), id2label=dict(enumerate(LABELS))
+    )
+    model = transformers.BertForSequenceClassification(config).eval()
+    reference = transformers.pipeline('text-classification', model=model, tokenizer=tokenizer)
+
+    classifier = load_onnx_backend(model, tokenizer, reference, str(tmp_path / 'onnx'), tolerance=1.0)
+    assert classifier is not None
+    assert os.listdir(tmp_path / 'onnx') == ['model.int8.onnx']
+    texts = [text for text, _ in PARITY_SAMPLES[:4]]
+    assert [result['label'] for result in classifier(texts)] == [result['label'] for result in reference(texts)]
@@ -0,0 +1,60 @@
+import asyncio
+
+from prefilter import EmotionGate, normalize_text
+
+
+def make_gate(**kwargs):
+    calls = []
+
+    async def classify(text):
+        calls.append(text)
+        return {'label': 'sadness', 'score': 0.9}
+
+    return EmotionGate(classify, lambda result: result['label'] == 'sadness', **kwargs), calls
+
+
+def test_lexicon_is_off_by_default():
+    gate, calls = make_gate()
+    assert asyncio.run(gate.classify('aku down banget')) == {'label': 'sadness', 'score': 0.9}
+    assert calls == ['aku down banget']
+
+
+def test_short_and_noise_messages_are_skipped():
+    gate, calls = make_gate()
+
+    async def scenario():
+        return [await gate.classify(text) for text in ('ok', 'https://example.com/a', '<:pepe:123> wkwk')]
+
+    assert asyncio.run(scenario()) == [None, None, None]
+    assert calls == []
+    assert gate.stats()['skip_short'] == 3
+
+
+def test_repeated_messages_hit_the_cache():
+    gate, calls = make_gate()
+
+    async def scenario():
+        await gate.classify('Hari ini  berat banget')
+        await gate.classify('hari ini berat banget')
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    assert gate.stats()['cache_hits'] == 1
+
+
+def test_audit_counts_lexicon_false_negatives():
+    gate, calls = make_gate(use_lexicon=True, audit_rate=1.0)
+
+    async def scenario():
+        assert await gate.classify('kok hidup gini amat ya') is None
+        await asyncio.gather(*gate.audit_tasks)
+
+    asyncio.run(scenario())
+    stats = gate.stats()
+    assert stats['skip_lexicon'] == 1
+    assert stats['false_negatives'] == 1
+    assert stats['false_negative_rate'] == 1.0
+
+
+def test_normalize_text():
+    assert normalize_text('  Aku   SEDIH ') == 'aku sedih'
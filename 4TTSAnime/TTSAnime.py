@@ -10,6 +10,8 @@ from deep_translator import GoogleTranslator
 from tools.i18n.i18n import I18nAuto
 from GPT_SoVITS.inference_webui import change_gpt_weights, change_sovits_weights, get_tts_wav
 from dotenv import load_dotenv
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from model_client import ModelClient, GenerativeModelClient
 
 load_dotenv()
 
@@ -70,7 +72,10 @@ def generate_audio(text):
         return None, None
 
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel('gemini-2.0-flash')
+GEMINI_MODEL = 'gemini-2.0-flash'
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+MODEL_HEDGE_AFTER = float(os.getenv("MODEL_HEDGE_AFTER", "0"))
+model_client = ModelClient(GenerativeModelClient(genai), deadline=GEMINI_TIMEOUT, hedge_after=MODEL_HEDGE_AFTER)
 translator = GoogleTranslator(source='ja', target='en')
 
 async def generate_response_with_history(channel, user_message):
@@ -89,9 +94,9 @@ async def generate_response_with_history(channel, user_message):
             "会話履歴:\n" + "\n".join(history) + f"\n\n最新のメッセージ: {user_message}"
         )
 
-        response = model.generate_content(prompt)
+        response = await model_client.generate(GEMINI_MODEL, prompt)
         japanese_response = response.text.strip()
-        english_response = translator.translate(japanese_response)
+        english_response = await asyncio.to_thread(translator.translate, japanese_response)
         return japanese_response, english_response
     except Exception as e:
         print(f"Error generating response: {e}")
@@ -156,6 +161,15 @@ async def chat(ctx, *, text: str):
             os.remove(temp_file)
         await wait_message.delete()
 
+@bot.command()
+async def statmodel(ctx):
+    stats = model_client.stats()
+    await ctx.send(
+        f"Panggilan: {stats['calls']}, gagal: {stats['errors']}, hedge: {stats['hedges']} ({stats['hedge_wins']} menang)\n"
+        f"Latensi p50: {stats['latency_p50']:.2f}s, p95: {stats['latency_p95']:.2f}s\n"
+        f"Token: {stats['prompt_tokens']} prompt, {stats['output_tokens']} output, {stats['total_tokens']} total"
+    )
+
 @bot.command()
 async def audio(ctx, *, text: str):
     if not text:
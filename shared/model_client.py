@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+
+
+class StreamInterrupted(Exception):
+    pass
+
+
+class GenerativeModelClient:
+    """Adapter exposing google.generativeai as the client.aio.models surface ModelClient calls."""
+
+    def __init__(self, sdk):
+        self.sdk = sdk
+        self.models = {}
+        self.aio = SimpleNamespace(models=self)
+
+    async def generate_content(self, model, contents, config=None):
+        if model not in self.models:
+            self.models[model] = self.sdk.GenerativeModel(model)
+        return await self.models[model].generate_content_async(contents, generation_config=config)
+
+
+class ModelClient:
+    def __init__(self, client, metrics=None, deadline=60.0, hedge_after=0.0, on_hedge=None):
+        self.client = client
+        self.metrics = metrics
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.on_hedge = on_hedge
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.calls = 0
+        self.errors = 0
+        self.tokens = Counter()
+        self.latency_samples = deque(maxlen=1000)
+
+    def record_usage(self, model, response):
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        for kind, field in (('prompt', 'prompt_token_count'), ('output', 'candidates_token_count'), ('total', 'total_token_count')):
+            count = getattr(usage, field, None)
+            if count:
+                self.tokens[kind] += count
+                if self.metrics is not None:
+                    self.metrics.inc('model_tokens_total', count, model=model, kind=kind)
+
+    @contextlib.contextmanager
+    def measure(self, model):
+        span = self.metrics.span('model_call', model=model) if self.metrics else contextlib.nullcontext()
+        started = time.perf_counter()
+        self.calls += 1
+        try:
+            with span:
+                yield
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            self.latency_samples.append(time.perf_counter() - started)
+
+    async def _race(self, model, call, hedge_after):
+        primary = asyncio.create_task(call())
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        if self.on_hedge is not None:
+            self.on_hedge(model)
+        hedge = asyncio.create_task(call())
+        tasks = {primary, hedge}
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    async def call(self, model, call, deadline=None, hedge=False):
+        deadline = self.deadline if deadline is None else deadline
+        hedge_after = self.hedge_after if hedge else 0
+        with self.measure(model):
+            if hedge_after:
+                response = await asyncio.wait_for(self._race(model, call, hedge_after), deadline or None)
+            else:
+                response = await asyncio.wait_for(call(), deadline or None)
+        self.record_usage(model, response)
+        return response
+
+    async def stream(self, model, call, on_chunk, deadline=None):
+        deadline = self.deadline if deadline is None else deadline
+        response = None
+        with self.measure(model):
+            try:
+                async with asyncio.timeout(deadline or None):
+                    async for response in await call():
+                        on_chunk(response)
+            except Exception as error:
+                if response is not None:
+                    raise StreamInterrupted(f'Stream Gemini terputus: {error}') from error
+                raise
+        self.record_usage(model, response)
+        return response
+
+    async def generate(self, model, contents, config=None, deadline=None, hedge=True):
+        return await self.call(
+            model,
+            lambda: self.client.aio.models.generate_content(model=model, contents=contents, config=config),
+            deadline,
+            hedge
+        )
+
+    def stats(self):
+        samples = sorted(self.latency_samples)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'latency_p50': samples[len(samples) // 2] if samples else 0.0,
+            'latency_p95': samples[int(len(samples) * 0.95)] if samples else 0.0,
+            'prompt_tokens': self.tokens['prompt'],
+            'output_tokens': self.tokens['output'],
+            'total_tokens': self.tokens['total']
+        }